@@ -1,13 +1,18 @@
-import google.generativeai as genai
 import os
 import json
 from schemas import RecipeCreate, IngredientCreate, StepCreate
 from models import RecipeType, IngredientType, StepType
+from metrics import observe_ai_call
+
+def _genai():
+    # google.generativeai pulls in gRPC and protobuf, load it on the first AI call only
+    import google.generativeai as genai
+    return genai
 
 def configure_genai(api_key: str = None):
     key = api_key
     if key:
-        genai.configure(api_key=key)
+        _genai().configure(api_key=key)
     return key
 
 async def parse_recipe_from_text(text: str, source_url: str = None, language: str = "en", api_key: str = None) -> dict:
@@ -19,7 +24,7 @@ async def parse_recipe_from_text(text: str, source_url: str = None, language: st
     if not key:
         raise Exception("GEMINI_API_KEY is not set")
 
-    model = genai.GenerativeModel('gemini-flash-latest')
+    model = _genai().GenerativeModel('gemini-flash-latest')
 
     prompt = f"""
     You are a professional baker and recipe parser. Extract a structured recipe from the following text.
@@ -81,7 +86,8 @@ async def parse_recipe_from_text(text: str, source_url: str = None, language: st
     """
 
     try:
-        response = model.generate_content(prompt)
+        with observe_ai_call("parse_text"):
+            response = model.generate_content(prompt)
         from logger import logger
         logger.debug(f"Gemini Response: {response.text}") # DEBUG
         
@@ -123,7 +129,7 @@ async def translate_ingredient(name: str, api_key: str = None) -> dict:
         # Fallback if no key
         return {"en": name, "de": name}
 
-    model = genai.GenerativeModel('gemini-flash-latest')
+    model = _genai().GenerativeModel('gemini-flash-latest')
     
     prompt = f"""
     Translate the ingredient "{name}" to English and German.
@@ -136,7 +142,8 @@ async def translate_ingredient(name: str, api_key: str = None) -> dict:
     """
     
     try:
-        response = model.generate_content(prompt)
+        with observe_ai_call("translate"):
+            response = model.generate_content(prompt)
         cleaned_text = response.text.replace("```json", "").replace("```", "").strip()
         return json.loads(cleaned_text)
     except Exception as e:
@@ -160,9 +167,9 @@ async def parse_recipe_from_image(image_path: str, language: str = "en", api_key
 
     # Upload the file to Gemini
     try:
-        sample_file = genai.upload_file(path=image_path, display_name="Recipe Image")
+        sample_file = _genai().upload_file(path=image_path, display_name="Recipe Image")
         
-        model = genai.GenerativeModel('gemini-flash-latest') # Use flash for speed and multimodal
+        model = _genai().GenerativeModel('gemini-flash-latest') # Use flash for speed and multimodal
         
         prompt = f"""
         You are a professional baker and recipe parser. Extract a structured recipe from this image.
@@ -208,7 +215,8 @@ async def parse_recipe_from_image(image_path: str, language: str = "en", api_key
         - EXTRACT TEMPERATURES: If an ingredient has a temperature, extract it into the "temperature" field.
         """
 
-        response = model.generate_content([sample_file, prompt])
+        with observe_ai_call("parse_image"):
+            response = model.generate_content([sample_file, prompt])
         
         # Cleanup file from Gemini immediately
         try:
@@ -0,0 +1,213 @@
+"""bring_legacy_schema_up_to_date
+
+Revision ID: a4e2c7d9b1f3
+Revises: 75d883dd6bb0
+Create Date: 2026-10-18 12:00:00.000000
+
+Until now every worker ran create_all() on import and added columns with ad-hoc ALTER TABLEs
+on startup. This revision takes over both: it creates missing tables and adds missing columns
+(as of this revision, so later migrations can rely on it), and is a no-op on current databases.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import models
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e2c7d9b1f3'
+down_revision: Union[str, None] = '75d883dd6bb0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _schema() -> sa.MetaData:
+    # Frozen copy of models.py at this revision
+    metadata = sa.MetaData()
+    GUID = models.GUID
+    sa.Table(
+        'roles', metadata,
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('name', sa.String(), unique=True, index=True),
+        sa.Column('permissions', sa.JSON()),
+    )
+    sa.Table(
+        'users', metadata,
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('username', sa.String(), unique=True, index=True),
+        sa.Column('hashed_password', sa.String()),
+        sa.Column('token_version', sa.Integer()),
+        sa.Column('session_duration_minutes', sa.Integer()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('role', sa.Enum('admin', 'user', name='userrole')),
+        sa.Column('email', sa.String(), unique=True, nullable=True),
+        sa.Column('is_verified', sa.Boolean()),
+        sa.Column('language', sa.String()),
+        sa.Column('role_id', sa.String(), sa.ForeignKey('roles.id'), nullable=True),
+        sa.Column('api_key', sa.String(), unique=True, nullable=True, index=True),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    sa.Table(
+        'recipes', metadata,
+        sa.Column('id', GUID(), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id')),
+        sa.Column('title', sa.String(), index=True),
+        sa.Column('source_url', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('created_type', sa.Enum('manual', 'ai_import', name='recipetype')),
+        sa.Column('type', sa.Enum('baking', 'cooking', name='recipecategory')),
+        sa.Column('is_public', sa.Boolean()),
+        sa.Column('yield_amount', sa.Integer()),
+        sa.Column('weight_per_piece', sa.Integer(), nullable=True),
+        sa.Column('reference_temperature', sa.Float()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    sa.Table(
+        'import_jobs', metadata,
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id')),
+        sa.Column('status', sa.Enum('pending', 'processing', 'completed', 'failed', name='importjobstatus')),
+        sa.Column('recipe_id', GUID(), sa.ForeignKey('recipes.id'), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    sa.Table(
+        'user_sessions', metadata,
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id')),
+        sa.Column('ip_address', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('last_used_at', sa.DateTime()),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('is_active', sa.Boolean()),
+    )
+    sa.Table(
+        'chapters', metadata,
+        sa.Column('id', GUID(), primary_key=True),
+        sa.Column('recipe_id', GUID(), sa.ForeignKey('recipes.id')),
+        sa.Column('name', sa.String()),
+        sa.Column('order_index', sa.Integer()),
+    )
+    sa.Table(
+        'ingredients', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('chapter_id', GUID(), sa.ForeignKey('chapters.id')),
+        sa.Column('name', sa.JSON()),
+        sa.Column('amount', sa.Float()),
+        sa.Column('unit', sa.String()),
+        sa.Column('temperature', sa.Float(), nullable=True),
+        sa.Column('type', sa.Enum('flour', 'liquid', 'starter', 'salt', 'add_in', 'other', name='ingredienttype')),
+        sa.Column('linked_recipe_id', GUID(), sa.ForeignKey('recipes.id'), nullable=True),
+    )
+    sa.Table(
+        'steps', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('chapter_id', GUID(), sa.ForeignKey('chapters.id')),
+        sa.Column('order_index', sa.Integer()),
+        sa.Column('description', sa.Text()),
+        sa.Column('duration_min', sa.Integer()),
+        sa.Column('type', sa.Enum('active', 'passive', 'baking', name='steptype')),
+        sa.Column('temperature', sa.Integer(), nullable=True),
+    )
+    for name, score in (('favorites', False), ('ratings', True)):
+        sa.Table(
+            name, metadata,
+            sa.Column('user_id', sa.String(), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('recipe_id', GUID(), sa.ForeignKey('recipes.id'), primary_key=True),
+            *([sa.Column('score', sa.Integer())] if score else []),
+            sa.Column('created_at', sa.DateTime()),
+        )
+    sa.Table(
+        'schedules', metadata,
+        sa.Column('id', GUID(), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id')),
+        sa.Column('recipe_id', GUID(), sa.ForeignKey('recipes.id')),
+        sa.Column('target_time', sa.DateTime()),
+        sa.Column('start_time', sa.DateTime()),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('event_type', sa.String()),
+        sa.Column('recurrence_rule', sa.String(), nullable=True),
+        sa.Column('real_temperature', sa.Float(), nullable=True),
+    )
+    sa.Table(
+        'units', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('name', sa.JSON(), nullable=False),
+        sa.Column('description', sa.JSON(), nullable=True),
+    )
+    sa.Table(
+        'ingredient_items', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('name', sa.JSON(), nullable=False),
+        sa.Column('default_unit_id', sa.Integer(), sa.ForeignKey('units.id'), nullable=True),
+        sa.Column('is_verified', sa.Boolean()),
+    )
+    sa.Table(
+        'system_settings', metadata,
+        sa.Column('key', sa.String(), primary_key=True, index=True),
+        sa.Column('value', sa.String(), nullable=False),
+    )
+    sa.Table(
+        'verification_tokens', metadata,
+        sa.Column('token', sa.String(), primary_key=True, index=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id')),
+        sa.Column('expires_at', sa.DateTime()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    return metadata
+
+
+# Values for rows that predate an added column, as the old startup migrations set them.
+# Existing users count as verified: they registered before email verification existed.
+BACKFILL = {
+    ('users', 'token_version'): 1,
+    ('users', 'session_duration_minutes'): 60,
+    ('users', 'is_active'): True,
+    ('users', 'is_verified'): True,
+    ('users', 'language'): 'en',
+    ('users', 'created_at'): sa.func.current_timestamp(),
+    ('recipes', 'reference_temperature'): 20.0,
+    ('schedules', 'event_type'): 'baking',
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    metadata = _schema()
+    existing = set(inspector.get_table_names())
+
+    missing = [table for table in metadata.sorted_tables if table.name not in existing]
+    if missing:
+        metadata.create_all(bind, tables=missing)
+
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column['name']: column for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            # Added nullable and without foreign keys (SQLite can't add constraints to a table);
+            # a unique index stands in for a unique constraint
+            if isinstance(column.type, sa.Enum):
+                column.type.create(bind, checkfirst=True)
+            op.add_column(table.name, sa.Column(column.name, column.type, nullable=True))
+            if column.unique or column.index:
+                op.create_index(f'ix_{table.name}_{column.name}', table.name, [column.name], unique=bool(column.unique))
+            value = BACKFILL.get((table.name, column.name))
+            if value is not None:
+                op.execute(sa.table(table.name, sa.column(column.name)).update().values({column.name: value}))
+
+        # ingredients.amount used to be an Integer
+        if table.name == 'ingredients' and bind.dialect.name == 'postgresql' and isinstance(present['amount']['type'], sa.Integer):
+            op.alter_column('ingredients', 'amount', type_=sa.Float(), postgresql_using='amount::double precision')
+
+
+def downgrade() -> None:
+    # Nothing to undo: the tables and columns belong to the schema before this revision too
+    pass
@@ -0,0 +1,34 @@
+"""add_versions_for_etags
+
+Revision ID: b7f1e3a9c2d4
+Revises: a4e2c7d9b1f3
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f1e3a9c2d4'
+down_revision: Union[str, None] = 'a4e2c7d9b1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('recipes', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.drop_column('version')
@@ -1,11 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import functools
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from database import get_db
+from logger import update_log_context
 import models
 import os
 
@@ -16,15 +16,20 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@functools.lru_cache(maxsize=None)
+def pwd_context():
+    # passlib and jose are loaded on first use, most worker imports never need them
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -34,12 +39,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=15)
     
     to_encode.update({"exp": expire})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
     return user
 
 async def get_current_user_and_session(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -56,7 +64,8 @@ async def get_current_user_and_session(token: str = Depends(oauth2_scheme), db:
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.username == username).first()
+    # Load the role with the user, permission checks need it on most requests
+    user = db.query(models.User).options(joinedload(models.User.role_rel)).filter(models.User.username == username).first()
     if user is None:
         raise credentials_exception
         
@@ -67,6 +76,8 @@ async def get_current_user_and_session(token: str = Depends(oauth2_scheme), db:
     if user.token_version != token_version:
         raise credentials_exception
 
+    update_log_context(user_id=user.id)
+
     # Check specific session (granular revoke)
     if session_id:
         session = db.query(models.UserSession).filter(models.UserSession.id == session_id).first()
@@ -132,6 +143,7 @@ async def get_current_user_with_api_key(
         if user:
             if not user.is_active:
                 raise HTTPException(status_code=400, detail="Inactive user")
+            update_log_context(user_id=user.id)
             return user
         else:
              # If API key is provided but invalid, fail immediately? 
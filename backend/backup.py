@@ -3,126 +3,475 @@ import shutil
 import zipfile
 import datetime
 import subprocess
+import tempfile
+import sqlite3
+from contextlib import contextmanager
+from sqlalchemy import text
 from database import engine, DATABASE_URL
 from logger import logger
 
 BACKUP_DIR = "backups"
 STATIC_UPLOADS_DIR = "static/uploads"
 
-def create_backup():
+CHUNK_SIZE = 256 * 1024
+
+# Parallel jobs for pg_dump/pg_restore. With more than one job the dump uses the
+# directory format (-Fd) and is packaged as database.dir/ inside the archive.
+BACKUP_PG_JOBS = int(os.getenv("BACKUP_PG_JOBS", "1"))
+
+# SQLite online backup: pages copied per step; writers can proceed between steps
+SQLITE_BACKUP_PAGES = 1024
+SQLITE_BACKUP_SLEEP = 0.005
+
+
+class _ChunkBuffer:
     """
-    Creates a backup of the database and static uploads.
-    Returns the path to the generated ZIP file.
+    Write-only file object that collects zip output until the generator hands it to the client.
+    zipfile detects that it cannot seek and writes data descriptors instead.
     """
-    os.makedirs(BACKUP_DIR, exist_ok=True)
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def backup_filename():
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"backup_{timestamp}"
-    temp_dir = os.path.join(BACKUP_DIR, backup_filename)
-    os.makedirs(temp_dir, exist_ok=True)
+    return f"backup_{timestamp}.zip"
+
+
+def _copy_into_zip(zipf, buffer, arcname, source, compress_type=zipfile.ZIP_DEFLATED, on_read=None):
+    info = zipfile.ZipInfo(arcname, date_time=datetime.datetime.now().timetuple()[:6])
+    info.compress_type = compress_type
+    with zipf.open(info, "w", force_zip64=True) as entry:
+        yield from buffer.drain()
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            entry.write(chunk)
+            if on_read:
+                on_read(len(chunk))
+            yield from buffer.drain()
+
+
+def check_backup_tools():
+    if "postgresql" in DATABASE_URL and not shutil.which("pg_dump"):
+        raise Exception("pg_dump not found")
+
+
+def _log_progress(percent, message):
+    logger.info(f"Restore {percent}%: {message}")
+
+
+def dump_postgres_directory(target_dir, jobs=None):
+    """
+    Dumps the database in directory format with parallel jobs (pg_dump -Fd -j N).
+    """
+    jobs = jobs or BACKUP_PG_JOBS
+    result = subprocess.run(
+        ["pg_dump", "-Fd", "-j", str(jobs), "-Z", "6", "-f", target_dir, DATABASE_URL],
+        capture_output=True,
+        env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        logger.error(f"pg_dump failed: {result.stderr.decode(errors='replace')}")
+        raise Exception("Database backup failed")
 
+
+def sqlite_online_backup(db_path, target_path):
+    """
+    Copies a live SQLite database with the sqlite3 backup API in small steps,
+    so writers are only blocked for the duration of a single step.
+    """
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(target_path)
     try:
+        source.backup(target, pages=SQLITE_BACKUP_PAGES, sleep=SQLITE_BACKUP_SLEEP)
+    finally:
+        target.close()
+        source.close()
+
+
+def restore_sqlite(backup_db_path, db_path):
+    """
+    Replaces the live SQLite database with the backup in a single backup-API step,
+    after checking the backup and disposing our connection pool. Other connections
+    see either the old or the new database, and the WAL stays consistent.
+    """
+    check = sqlite3.connect(backup_db_path)
+    try:
+        result = check.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        check.close()
+    if result != "ok":
+        raise Exception(f"Backup database is corrupt: {result}")
+
+    engine.dispose()
+    source = sqlite3.connect(backup_db_path)
+    target = sqlite3.connect(db_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    engine.dispose()
+
+
+@contextmanager
+def open_database_dump():
+    """
+    Yields (archive name, readable binary stream) for a dump of the current database,
+    or (None, None) if the database type is not supported. Raises if the dump fails.
+    """
+    db_url = DATABASE_URL
+    if "sqlite" in db_url:
+        db_path = db_url.replace("sqlite:///", "")
+        if not os.path.exists(db_path):
+            logger.warning(f"SQLite database file not found at {db_path}")
+            yield None, None
+            return
+        # Consistent copy (including the WAL) via the online backup API, never the live file
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        fd, snapshot_path = tempfile.mkstemp(prefix="sqlite_", suffix=".db", dir=BACKUP_DIR)
+        os.close(fd)
+        try:
+            sqlite_online_backup(db_path, snapshot_path)
+            with open(snapshot_path, "rb") as source:
+                yield "database.db", source
+        finally:
+            os.remove(snapshot_path)
+    elif "postgresql" in db_url:
+        # pg_dump can take a connection string; its stdout is consumed directly. stderr goes
+        # to a temp file: a pipe nobody reads until stdout ends would block pg_dump once full.
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                ["pg_dump", db_url],
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                env=os.environ.copy()
+            )
+            try:
+                yield "database.sql", process.stdout
+            finally:
+                process.stdout.close()
+                process.wait()
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode(errors="replace")
+        if process.returncode != 0:
+            logger.error(f"pg_dump failed: {stderr}")
+            raise Exception("Database backup failed")
+    else:
+        logger.warning("Unsupported database type for backup")
+        yield None, None
+
+
+def iter_upload_files():
+    """
+    Yields (path relative to the uploads dir, absolute path) for every stored upload.
+    """
+    if not os.path.exists(STATIC_UPLOADS_DIR):
+        return
+    for root, dirs, files in os.walk(STATIC_UPLOADS_DIR):
+        for file in sorted(files):
+            if file.endswith(".tmp"):
+                continue
+            file_path = os.path.join(root, file)
+            yield os.path.relpath(file_path, STATIC_UPLOADS_DIR), file_path
+
+
+def estimate_backup_size():
+    """
+    Approximate number of input bytes stream_backup() will read, for progress reporting.
+    """
+    total = 0
+    if "sqlite" in DATABASE_URL:
+        db_path = DATABASE_URL.replace("sqlite:///", "")
+        if os.path.exists(db_path):
+            total += os.path.getsize(db_path)
+    elif "postgresql" in DATABASE_URL:
+        with engine.connect() as conn:
+            total += conn.execute(text("SELECT pg_database_size(current_database())")).scalar() or 0
+    for rel_path, file_path in iter_upload_files():
+        try:
+            total += os.path.getsize(file_path)
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def stream_backup(on_read=None):
+    """
+    Generates a ZIP backup of the database and static uploads as a stream of chunks.
+    The database dump is piped from pg_dump (or read from the SQLite file) and uploads are
+    read in place, so nothing is staged on disk and the first bytes are available immediately.
+    on_read(n) is called with the number of input bytes consumed, for progress reporting.
+    """
+    check_backup_tools()
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
         # 1. Backup Database
-        db_url = DATABASE_URL
-        if "sqlite" in db_url:
-            # SQLite: Copy file
-            db_path = db_url.replace("sqlite:///", "")
-            if os.path.exists(db_path):
-                shutil.copy2(db_path, os.path.join(temp_dir, "database.db"))
-            else:
-                logger.warning(f"SQLite database file not found at {db_path}")
-        elif "postgresql" in db_url:
-            # PostgreSQL: pg_dump
-            # Assumes pg_dump is in PATH and credentials are in URL or env
-            # We need to parse the URL to get params or pass the URL to psql if possible
-            # pg_dump can take a connection string
-            dump_path = os.path.join(temp_dir, "database.sql")
+        if "postgresql" in DATABASE_URL and BACKUP_PG_JOBS > 1:
+            # Directory format can't be piped, so it is dumped to a temp dir first
+            os.makedirs(BACKUP_DIR, exist_ok=True)
+            dump_root = tempfile.mkdtemp(prefix="dump_", dir=BACKUP_DIR)
             try:
-                subprocess.run(
-                    ["pg_dump", db_url, "-f", dump_path],
-                    check=True,
-                    env=os.environ.copy()
-                )
-            except subprocess.CalledProcessError as e:
-                logger.error(f"pg_dump failed: {e}")
-                raise Exception("Database backup failed")
+                dump_dir = os.path.join(dump_root, "database.dir")
+                dump_postgres_directory(dump_dir)
+                for file in sorted(os.listdir(dump_dir)):
+                    with open(os.path.join(dump_dir, file), "rb") as source:
+                        # Table data is already gzip-compressed by pg_dump
+                        yield from _copy_into_zip(zipf, buffer, f"database.dir/{file}", source, zipfile.ZIP_STORED, on_read)
+            finally:
+                shutil.rmtree(dump_root, ignore_errors=True)
         else:
-            logger.warning("Unsupported database type for backup")
+            with open_database_dump() as (name, source):
+                if source is not None:
+                    yield from _copy_into_zip(zipf, buffer, name, source, on_read=on_read)
+
+        # 2. Backup Uploads (images are already compressed, store them as-is)
+        zipf.writestr("uploads/", b"")
+        for rel_path, file_path in iter_upload_files():
+            try:
+                with open(file_path, "rb") as source:
+                    yield from _copy_into_zip(zipf, buffer, os.path.join("uploads", rel_path), source, zipfile.ZIP_STORED, on_read)
+            except FileNotFoundError:
+                # Removed by the upload GC while the backup was running
+                continue
+
+    # Central directory
+    yield from buffer.drain()
+
+
+def create_backup():
+    """
+    Creates a backup of the database and static uploads.
+    Returns the path to the generated ZIP file.
+    """
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    zip_path = os.path.join(BACKUP_DIR, backup_filename())
+    try:
+        with open(zip_path, "wb") as f:
+            for chunk in stream_backup():
+                f.write(chunk)
+    except Exception:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        raise
+    return zip_path
+
+def terminate_connections():
+    """
+    Closes our pooled connections and terminates every other session on the database,
+    so the restore is not blocked by open transactions or locks.
+    """
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        ))
+        conn.commit()
 
-        # 2. Backup Uploads
-        uploads_backup_path = os.path.join(temp_dir, "uploads")
-        if os.path.exists(STATIC_UPLOADS_DIR):
-            shutil.copytree(STATIC_UPLOADS_DIR, uploads_backup_path)
+
+def reset_postgres_schema():
+    terminate_connections()
+    with engine.connect() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        conn.commit()
+    engine.dispose()
+
+
+def _run_restore_command(cmd, on_line=None):
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=os.environ.copy()
+    )
+    errors = []
+    for line in process.stderr:
+        line = line.rstrip()
+        if "error" in line.lower():
+            errors.append(line)
+        if on_line:
+            on_line(line)
+    process.wait()
+    if process.returncode != 0:
+        logger.error(f"{cmd[0]} failed: {' | '.join(errors[-5:])}")
+        raise Exception("Database restore failed")
+
+
+def restore_postgres_directory(dump_dir, jobs=None, progress=None):
+    """
+    Restores a directory-format dump in a controlled order: schema (pre-data) single-threaded,
+    then table data and indexes/constraints (post-data) with parallel jobs.
+    """
+    jobs = jobs or BACKUP_PG_JOBS
+    progress = progress or _log_progress
+
+    # The listing also validates the dump (its TOC): nothing is dropped unless it is readable
+    # and has table data. The number of TABLE DATA entries is used for progress reporting.
+    listing = subprocess.run(["pg_restore", "-l", dump_dir], capture_output=True, text=True)
+    if listing.returncode != 0:
+        logger.error(f"pg_restore -l failed: {listing.stderr.strip()}")
+        raise Exception("Backup database dump is unreadable")
+    total_tables = sum(1 for line in listing.stdout.splitlines() if " TABLE DATA " in line)
+    if not total_tables:
+        raise Exception("Backup database dump contains no table data")
+
+    progress(10, "Dropping existing schema")
+    reset_postgres_schema()
+
+    base_cmd = ["pg_restore", "--verbose", "--no-owner", "--exit-on-error", "-d", DATABASE_URL]
+    progress(20, "Restoring schema")
+    _run_restore_command(base_cmd + ["--section=pre-data", dump_dir])
+
+    restored = {"tables": 0}
+
+    def on_data_line(line):
+        if "processing data for table" in line:
+            restored["tables"] += 1
+            percent = 30 + int(50 * min(restored["tables"], total_tables) / total_tables)
+            progress(percent, line.split("processing data for table", 1)[1].strip())
+
+    progress(30, f"Restoring data ({jobs} jobs)")
+    _run_restore_command(base_cmd + ["--section=data", "-j", str(jobs), dump_dir], on_data_line)
+
+    progress(80, f"Restoring indexes and constraints ({jobs} jobs)")
+    _run_restore_command(base_cmd + ["--section=post-data", "-j", str(jobs), dump_dir])
+
+
+def _archive_members(zipf):
+    """
+    Validates the member names of a backup archive before anything is extracted.
+    Returns (database members, upload members); raises on unsafe paths or a missing database.
+    """
+    database, uploads = [], []
+    for info in zipf.infolist():
+        name = info.filename
+        parts = name.split("/")
+        if name.startswith("/") or "\\" in name or ".." in parts:
+            raise Exception(f"Unsafe path in backup archive: {name}")
+        if info.is_dir():
+            continue
+        if name in ("database.db", "database.sql") or name.startswith("database.dir/"):
+            database.append(info)
+        elif name.startswith("uploads/"):
+            uploads.append(info)
         else:
-            os.makedirs(uploads_backup_path) # Create empty if not exists
+            logger.warning(f"Ignoring unknown backup member {name}")
+    if not database:
+        raise Exception("No database found in backup")
+    return database, uploads
 
-        # 3. Create ZIP
-        zip_path = os.path.join(BACKUP_DIR, f"{backup_filename}.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, temp_dir)
-                    zipf.write(file_path, arcname)
 
-        return zip_path
+def _extract_member(zipf, info, target_path, on_read=None):
+    """
+    Streams one member to disk. zipfile checks the CRC-32 when the member is read to
+    the end and raises BadZipFile on a mismatch.
+    """
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with zipf.open(info) as source, open(target_path, "wb") as target:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            target.write(chunk)
+            if on_read:
+                on_read(len(chunk))
 
-    finally:
-        # Cleanup temp dir
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
 
-def restore_backup(zip_path):
+def restore_backup(zip_path, progress=None):
     """
     Restores the database and uploads from a ZIP backup.
     WARNING: This overwrites existing data.
+    Every member is extracted and checksum-verified before the database is touched;
+    uploads are staged next to static/uploads and swapped in at the end.
+    progress(percent, message) is called as the restore advances.
     """
+    progress = progress or _log_progress
     temp_dir = os.path.join(BACKUP_DIR, "restore_temp")
-    if os.path.exists(temp_dir):
-        shutil.rmtree(temp_dir)
+    uploads_staging = f"{STATIC_UPLOADS_DIR}.restore"
+    uploads_old = f"{STATIC_UPLOADS_DIR}.old"
+    for path in (temp_dir, uploads_staging):
+        if os.path.exists(path):
+            shutil.rmtree(path)
     os.makedirs(temp_dir, exist_ok=True)
 
     try:
-        # 1. Extract ZIP
+        # 1. Verify and extract (0-40%)
+        progress(0, "Verifying archive")
         with zipfile.ZipFile(zip_path, 'r') as zipf:
-            zipf.extractall(temp_dir)
+            database_members, upload_members = _archive_members(zipf)
+            has_uploads = "uploads/" in zipf.namelist() or bool(upload_members)
+            total = max(1, sum(info.file_size for info in database_members + upload_members))
+            extracted = {"bytes": 0, "percent": 0}
+
+            def on_read(n):
+                extracted["bytes"] += n
+                percent = 40 * extracted["bytes"] // total
+                if percent != extracted["percent"]:
+                    extracted["percent"] = percent
+                    progress(percent, "Extracting archive")
+
+            for info in database_members:
+                _extract_member(zipf, info, os.path.join(temp_dir, info.filename), on_read)
+            os.makedirs(uploads_staging, exist_ok=True)
+            for info in upload_members:
+                _extract_member(zipf, info, os.path.join(uploads_staging, info.filename[len("uploads/"):]), on_read)
+
+        # 2. Restore Database (40-90%)
+        def db_progress(percent, message):
+            progress(40 + percent * 50 // 100, message)
 
-        # 2. Restore Database
         db_url = DATABASE_URL
         if "sqlite" in db_url:
             db_path = db_url.replace("sqlite:///", "")
             backup_db_path = os.path.join(temp_dir, "database.db")
             if os.path.exists(backup_db_path):
-                # Close connections? SQLite might be locked.
-                # In a simple app, we might just overwrite.
-                shutil.copy2(backup_db_path, db_path)
+                progress(40, "Restoring database")
+                restore_sqlite(backup_db_path, db_path)
             else:
                 raise Exception("No database.db found in backup")
         elif "postgresql" in db_url:
+            backup_dir_path = os.path.join(temp_dir, "database.dir")
             backup_sql_path = os.path.join(temp_dir, "database.sql")
-            if os.path.exists(backup_sql_path):
-                # Drop and Re-create schema? Or just psql < file
-                # Usually psql with clean option in dump is best, but here we just run it.
-                # WARNING: This might fail if connections are open.
-                try:
-                    subprocess.run(
-                        ["psql", db_url, "-f", backup_sql_path],
-                        check=True,
-                        env=os.environ.copy()
-                    )
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"psql restore failed: {e}")
-                    raise Exception("Database restore failed")
+            if os.path.isdir(backup_dir_path):
+                restore_postgres_directory(backup_dir_path, progress=db_progress)
+            elif os.path.exists(backup_sql_path):
+                # Plain SQL dump: start from an empty schema, replay single-threaded
+                db_progress(10, "Dropping existing schema")
+                reset_postgres_schema()
+                db_progress(20, "Restoring database.sql")
+                _run_restore_command(["psql", "-v", "ON_ERROR_STOP=1", "-q", db_url, "-f", backup_sql_path])
             else:
-                raise Exception("No database.sql found in backup")
+                raise Exception("No database.sql or database.dir found in backup")
+
+        # An older backup may predate the current schema
+        progress(88, "Upgrading database schema")
+        from bootstrap import bootstrap
+        bootstrap()
 
-        # 3. Restore Uploads
-        backup_uploads_path = os.path.join(temp_dir, "uploads")
-        if os.path.exists(backup_uploads_path):
+        # 3. Restore Uploads (swap the staged directory in)
+        progress(90, "Restoring uploads")
+        if has_uploads:
+            if os.path.exists(uploads_old):
+                shutil.rmtree(uploads_old)
             if os.path.exists(STATIC_UPLOADS_DIR):
-                shutil.rmtree(STATIC_UPLOADS_DIR)
-            shutil.copytree(backup_uploads_path, STATIC_UPLOADS_DIR)
+                os.replace(STATIC_UPLOADS_DIR, uploads_old)
+            os.replace(uploads_staging, STATIC_UPLOADS_DIR)
+            shutil.rmtree(uploads_old, ignore_errors=True)
+        progress(100, "Restore completed")
 
     finally:
         # Cleanup
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
+        for path in (temp_dir, uploads_staging):
+            if os.path.exists(path):
+                shutil.rmtree(path)
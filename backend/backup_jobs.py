@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import time
+import fcntl
+import hashlib
+import secrets
+import datetime
+from typing import List, Optional
+from backup import BACKUP_DIR, stream_backup, backup_filename, estimate_backup_size, restore_backup, check_backup_tools
+from logger import logger
+from metrics import tracked_task
+
+# Backup and restore run as background jobs. Job state lives in JSON files, so every
+# worker can report it and it survives the restore of the database itself.
+JOBS_DIR = os.path.join(BACKUP_DIR, "jobs")
+BACKUP_JOB_RETENTION_HOURS = int(os.getenv("BACKUP_JOB_RETENTION_HOURS", "24"))  # finished archives are kept this long
+
+ACTIVE_STATUSES = ("pending", "running")
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _now() -> str:
+    return datetime.datetime.utcnow().isoformat() + "Z"
+
+
+def _job_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _write_job(job: dict):
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    tmp_path = f"{_job_path(job['id'])}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(job, f)
+    os.replace(tmp_path, _job_path(job["id"]))
+
+
+def acquire_job_lock():
+    """
+    Takes the exclusive job lock (only one backup or restore at a time) and returns the
+    lock file, which must be passed to release_job_lock(). Raises BlockingIOError if busy.
+    """
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    lock_file = open(os.path.join(JOBS_DIR, ".lock"), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        raise
+    return lock_file
+
+
+def release_job_lock(lock_file):
+    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    lock_file.close()
+
+
+def _lock_is_free() -> bool:
+    try:
+        release_job_lock(acquire_job_lock())
+        return True
+    except BlockingIOError:
+        return False
+
+
+def create_job(kind: str, **fields) -> dict:
+    now = _now()
+    job = {
+        "id": secrets.token_hex(16),
+        "kind": kind,
+        "status": "pending",
+        "progress": 0,
+        "message": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    job.update(fields)
+    _write_job(job)
+    return job
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    if not _JOB_ID_RE.match(job_id):
+        return None
+    try:
+        with open(_job_path(job_id)) as f:
+            job = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    # A job still marked active while nobody holds the lock died with its worker
+    if job["status"] in ACTIVE_STATUSES and _lock_is_free():
+        job = update_job(job_id, status="failed", error="Interrupted (worker stopped)")
+    return job
+
+
+def update_job(job_id: str, **fields) -> dict:
+    with open(_job_path(job_id)) as f:
+        job = json.load(f)
+    job.update(fields)
+    job["updated_at"] = _now()
+    _write_job(job)
+    return job
+
+
+def list_jobs() -> List[dict]:
+    """
+    Returns all jobs, newest first.
+    """
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    jobs = []
+    for name in os.listdir(JOBS_DIR):
+        if name.endswith(".json"):
+            job = get_job(name[:-len(".json")])
+            if job:
+                jobs.append(job)
+    return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+
+def archive_path(job: dict) -> Optional[str]:
+    if job.get("kind") != "backup" or job.get("status") != "completed" or not job.get("file"):
+        return None
+    path = os.path.join(BACKUP_DIR, job["file"])
+    return path if os.path.exists(path) else None
+
+
+class _ProgressReporter:
+    """
+    Writes progress to the job file, but only when the percentage changes.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.percent = -1
+
+    def __call__(self, percent: int, message: Optional[str] = None):
+        percent = max(0, min(100, int(percent)))
+        if percent == self.percent and message is None:
+            return
+        self.percent = percent
+        fields = {"progress": percent}
+        if message:
+            fields["message"] = message
+        update_job(self.job_id, **fields)
+
+
+@tracked_task("backup_job")
+def run_backup_job(job_id: str, lock_file):
+    """
+    Writes a backup archive to BACKUP_DIR and records its size and sha256 on the job.
+    Runs in the background with the job lock held; releases it when done.
+    """
+    report = _ProgressReporter(job_id)
+    zip_path = os.path.join(BACKUP_DIR, backup_filename())
+    tmp_path = f"{zip_path}.partial"
+    try:
+        update_job(job_id, status="running", message="Preparing backup")
+        check_backup_tools()
+        total = max(1, estimate_backup_size())
+        done = {"bytes": 0}
+
+        def on_read(n):
+            done["bytes"] += n
+            # The estimate is approximate, 100% is only reported once the file is complete
+            report(min(99, 100 * done["bytes"] // total), "Writing archive")
+
+        hasher = hashlib.sha256()
+        with open(tmp_path, "wb") as f:
+            for chunk in stream_backup(on_read):
+                hasher.update(chunk)
+                f.write(chunk)
+        os.replace(tmp_path, zip_path)
+
+        update_job(
+            job_id,
+            status="completed",
+            progress=100,
+            message="Backup completed",
+            file=os.path.basename(zip_path),
+            size=os.path.getsize(zip_path),
+            sha256=hasher.hexdigest(),
+            download_token=secrets.token_urlsafe(32),
+        )
+        logger.info(f"Backup job {job_id} completed: {os.path.basename(zip_path)}")
+    except Exception as e:
+        logger.error(f"Backup job {job_id} failed: {e}")
+        update_job(job_id, status="failed", error=str(e))
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    finally:
+        release_job_lock(lock_file)
+
+
+@tracked_task("restore_job")
+def run_restore_job(job_id: str, zip_path: str, lock_file):
+    """
+    Restores the uploaded archive. Runs in the background with the job lock held;
+    removes the archive and releases the lock when done.
+    """
+    report = _ProgressReporter(job_id)
+    try:
+        update_job(job_id, status="running")
+        restore_backup(zip_path, progress=report)
+        update_job(job_id, status="completed", progress=100, message="Restore completed")
+        logger.info(f"Restore job {job_id} completed")
+    except Exception as e:
+        logger.error(f"Restore job {job_id} failed: {e}")
+        update_job(job_id, status="failed", error=str(e))
+    finally:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        release_job_lock(lock_file)
+
+
+def restore_upload_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.zip")
+
+
+def cleanup_jobs(max_age_hours: Optional[int] = None) -> int:
+    """
+    Deletes finished jobs older than the retention period together with their archives.
+    """
+    if max_age_hours is None:
+        max_age_hours = BACKUP_JOB_RETENTION_HOURS
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for job in list_jobs():
+        if job["status"] in ACTIVE_STATUSES:
+            continue
+        updated = datetime.datetime.fromisoformat(job["updated_at"].rstrip("Z")).replace(tzinfo=datetime.timezone.utc)
+        if updated.timestamp() > cutoff:
+            continue
+        path = archive_path(job)
+        if path:
+            os.remove(path)
+        os.remove(_job_path(job["id"]))
+        removed += 1
+    return removed
@@ -0,0 +1,344 @@
+import os
+import json
+import gzip
+import shutil
+import hashlib
+import zipfile
+import datetime
+from contextlib import contextmanager
+from typing import List, Optional
+from backup import open_database_dump, iter_upload_files, check_backup_tools, _ChunkBuffer, _copy_into_zip, CHUNK_SIZE
+from backup_jobs import acquire_job_lock, release_job_lock
+from logger import logger
+
+# Local backup repository: one manifest + DB dump per snapshot, uploads stored once as
+# content-addressed blobs shared by all snapshots
+BACKUP_REPO_DIR = os.getenv("BACKUP_REPO_DIR", os.path.join("backups", "repository"))
+BACKUP_INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", "24"))  # 0 disables the scheduler
+
+# Retention: number of daily / weekly / monthly snapshots to keep
+BACKUP_KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", "7"))
+BACKUP_KEEP_WEEKLY = int(os.getenv("BACKUP_KEEP_WEEKLY", "4"))
+BACKUP_KEEP_MONTHLY = int(os.getenv("BACKUP_KEEP_MONTHLY", "6"))
+
+MANIFEST_VERSION = 1
+
+
+def _snapshots_dir():
+    return os.path.join(BACKUP_REPO_DIR, "snapshots")
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(BACKUP_REPO_DIR, "blobs", digest[:2], digest)
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+@contextmanager
+def repository_lock():
+    """
+    Holds the backup job lock while writing to or pruning the repository, so snapshots never
+    run at the same time as each other or as a backup or restore job.
+    Raises BlockingIOError if another process holds it.
+    """
+    lock_file = acquire_job_lock()
+    try:
+        yield
+    finally:
+        release_job_lock(lock_file)
+
+
+def _store_blob(file_path: str) -> Optional[dict]:
+    """
+    Hashes an upload in place and copies it into the blob store only if no blob with the
+    same content exists yet. Returns {"sha256", "size", "new"} or None if the file
+    disappeared meanwhile.
+    """
+    try:
+        digest = _file_sha256(file_path)
+        size = os.path.getsize(file_path)
+    except FileNotFoundError:
+        return None
+    if os.path.exists(_blob_path(digest)):
+        return {"sha256": digest, "size": size, "new": False}
+
+    # Hashed again while copying: the blob is stored under the digest of what was copied
+    hasher = hashlib.sha256()
+    tmp_path = os.path.join(BACKUP_REPO_DIR, "blobs", f".incoming-{os.getpid()}")
+    os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+    size = 0
+    try:
+        with open(file_path, "rb") as src, open(tmp_path, "wb") as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+    except FileNotFoundError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+    digest = hasher.hexdigest()
+    blob_path = _blob_path(digest)
+    if os.path.exists(blob_path):
+        os.remove(tmp_path)
+        return {"sha256": digest, "size": size, "new": False}
+
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.replace(tmp_path, blob_path)
+    return {"sha256": digest, "size": size, "new": True}
+
+
+def create_snapshot(only_if_due: bool = False) -> Optional[dict]:
+    """
+    Takes a snapshot: a full gzip-compressed DB dump plus only the uploads not yet in the
+    blob store. Writes and returns the snapshot manifest.
+    """
+    check_backup_tools()
+
+    with repository_lock():
+        # Re-checked under the lock so concurrent workers don't snapshot twice
+        if only_if_due and not snapshot_due():
+            return None
+
+        now = datetime.datetime.utcnow()
+        snapshot_id = now.strftime("%Y%m%dT%H%M%SZ")
+        snapshot_dir = os.path.join(_snapshots_dir(), snapshot_id)
+        tmp_dir = f"{snapshot_dir}.partial"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+        try:
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "id": snapshot_id,
+                "created_at": now.isoformat() + "Z",
+                "database": None,
+                "uploads": [],
+            }
+
+            # 1. Database (full dump every run)
+            with open_database_dump() as (name, source):
+                if source is not None:
+                    dump_name = f"{name}.gz"
+                    with gzip.open(os.path.join(tmp_dir, dump_name), "wb", compresslevel=6) as dst:
+                        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                            dst.write(chunk)
+                    manifest["database"] = {
+                        "name": name,
+                        "file": dump_name,
+                        "sha256": _file_sha256(os.path.join(tmp_dir, dump_name)),
+                        "size": os.path.getsize(os.path.join(tmp_dir, dump_name)),
+                    }
+
+            # 2. Uploads (only new content is copied)
+            new_blobs = 0
+            new_bytes = 0
+            for rel_path, file_path in iter_upload_files():
+                blob = _store_blob(file_path)
+                if blob is None:
+                    continue
+                manifest["uploads"].append({"path": rel_path, "sha256": blob["sha256"], "size": blob["size"]})
+                if blob["new"]:
+                    new_blobs += 1
+                    new_bytes += blob["size"]
+            manifest["stats"] = {"new_blobs": new_blobs, "new_bytes": new_bytes}
+
+            _write_atomic(os.path.join(tmp_dir, "manifest.json"), json.dumps(manifest, indent=2).encode())
+            os.replace(tmp_dir, snapshot_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Backup snapshot {snapshot_id}: {len(manifest['uploads'])} uploads, {new_blobs} new ({new_bytes} bytes)")
+        apply_retention()
+    return manifest
+
+
+def list_snapshots() -> List[dict]:
+    """
+    Returns all snapshot manifests, newest first.
+    """
+    snapshots = []
+    if not os.path.isdir(_snapshots_dir()):
+        return snapshots
+    for name in sorted(os.listdir(_snapshots_dir()), reverse=True):
+        manifest_path = os.path.join(_snapshots_dir(), name, "manifest.json")
+        if name.endswith(".partial") or not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path) as f:
+            snapshots.append(json.load(f))
+    return snapshots
+
+
+def get_snapshot(snapshot_id: str) -> Optional[dict]:
+    for manifest in list_snapshots():
+        if manifest["id"] == snapshot_id:
+            return manifest
+    return None
+
+
+def select_retained(snapshot_ids: List[str], keep_daily: int = None, keep_weekly: int = None, keep_monthly: int = None) -> set:
+    """
+    Grandfather-father-son selection: the newest snapshot of each of the last N days,
+    ISO weeks and months is kept. The newest snapshot is always kept.
+    """
+    keep_daily = BACKUP_KEEP_DAILY if keep_daily is None else keep_daily
+    keep_weekly = BACKUP_KEEP_WEEKLY if keep_weekly is None else keep_weekly
+    keep_monthly = BACKUP_KEEP_MONTHLY if keep_monthly is None else keep_monthly
+
+    ordered = sorted(snapshot_ids, reverse=True)
+    keep = set(ordered[:1])
+    rules = [
+        (keep_daily, lambda d: d.date()),
+        (keep_weekly, lambda d: d.isocalendar()[:2]),
+        (keep_monthly, lambda d: (d.year, d.month)),
+    ]
+    for limit, period_of in rules:
+        seen = set()
+        for snapshot_id in ordered:
+            if len(seen) >= limit:
+                break
+            period = period_of(datetime.datetime.strptime(snapshot_id, "%Y%m%dT%H%M%SZ"))
+            if period not in seen:
+                seen.add(period)
+                keep.add(snapshot_id)
+    return keep
+
+
+def apply_retention() -> dict:
+    """
+    Deletes snapshots outside the retention policy, then blobs no snapshot references.
+    Must be called with the repository lock held.
+    """
+    snapshots = list_snapshots()
+    keep = select_retained([s["id"] for s in snapshots])
+    removed = 0
+    for manifest in snapshots:
+        if manifest["id"] not in keep:
+            shutil.rmtree(os.path.join(_snapshots_dir(), manifest["id"]), ignore_errors=True)
+            removed += 1
+
+    referenced = {u["sha256"] for s in snapshots if s["id"] in keep for u in s["uploads"]}
+    removed_blobs = 0
+    blobs_dir = os.path.join(BACKUP_REPO_DIR, "blobs")
+    if os.path.isdir(blobs_dir):
+        for root, dirs, files in os.walk(blobs_dir):
+            for file in files:
+                if file not in referenced:
+                    os.remove(os.path.join(root, file))
+                    removed_blobs += 1
+
+    if removed or removed_blobs:
+        logger.info(f"Backup retention: removed {removed} snapshots and {removed_blobs} blobs")
+    return {"removed_snapshots": removed, "removed_blobs": removed_blobs}
+
+
+def verify_snapshot(manifest: dict) -> List[str]:
+    """
+    Re-hashes the DB dump and every referenced blob. Returns a list of problems (empty if intact).
+    """
+    problems = []
+    snapshot_dir = os.path.join(_snapshots_dir(), manifest["id"])
+    db = manifest.get("database")
+    if db:
+        dump_path = os.path.join(snapshot_dir, db["file"])
+        if not os.path.exists(dump_path):
+            problems.append(f"missing {db['file']}")
+        elif _file_sha256(dump_path) != db["sha256"]:
+            problems.append(f"checksum mismatch {db['file']}")
+
+    checked = {}
+    for upload in manifest["uploads"]:
+        digest = upload["sha256"]
+        if digest not in checked:
+            blob_path = _blob_path(digest)
+            checked[digest] = os.path.exists(blob_path) and _file_sha256(blob_path) == digest
+        if not checked[digest]:
+            problems.append(f"blob {digest[:12]} for {upload['path']} missing or corrupt")
+    return problems
+
+
+def verify_repository() -> dict:
+    return {manifest["id"]: verify_snapshot(manifest) for manifest in list_snapshots()}
+
+
+def stream_snapshot_archive(manifest: dict):
+    """
+    Re-assembles a snapshot into the regular backup ZIP layout (database + uploads/),
+    so it can be downloaded and restored like a manual backup.
+    """
+    snapshot_dir = os.path.join(_snapshots_dir(), manifest["id"])
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        db = manifest.get("database")
+        if db:
+            with gzip.open(os.path.join(snapshot_dir, db["file"]), "rb") as source:
+                yield from _copy_into_zip(zipf, buffer, db["name"], source)
+        zipf.writestr("uploads/", b"")
+        for upload in manifest["uploads"]:
+            with open(_blob_path(upload["sha256"]), "rb") as source:
+                yield from _copy_into_zip(zipf, buffer, os.path.join("uploads", upload["path"]), source, zipfile.ZIP_STORED)
+    yield from buffer.drain()
+
+
+def open_snapshot_archive(snapshot_id: str):
+    """
+    Returns a stream_snapshot_archive() generator for the snapshot, or None if it doesn't
+    exist. The repository lock is taken now and held until the generator finishes (or is
+    closed), so retention can't delete the dump or blobs mid-download.
+    Raises BlockingIOError if a snapshot, backup or restore is running.
+    """
+    lock_file = acquire_job_lock()
+    try:
+        manifest = get_snapshot(snapshot_id)
+    except Exception:
+        release_job_lock(lock_file)
+        raise
+    if manifest is None:
+        release_job_lock(lock_file)
+        return None
+
+    def locked_stream():
+        try:
+            yield from stream_snapshot_archive(manifest)
+        finally:
+            release_job_lock(lock_file)
+
+    return locked_stream()
+
+
+def snapshot_due() -> bool:
+    if BACKUP_INTERVAL_HOURS <= 0:
+        return False
+    snapshots = list_snapshots()
+    if not snapshots:
+        return True
+    last = datetime.datetime.strptime(snapshots[0]["id"], "%Y%m%dT%H%M%SZ")
+    return datetime.datetime.utcnow() - last >= datetime.timedelta(hours=BACKUP_INTERVAL_HOURS)
+
+
+def run_scheduled_snapshot() -> Optional[dict]:
+    """
+    Called periodically by every worker; only takes a snapshot when one is due and no
+    snapshot, backup or restore is running.
+    """
+    if not snapshot_due():
+        return None
+    try:
+        return create_snapshot(only_if_due=True)
+    except BlockingIOError:
+        return None
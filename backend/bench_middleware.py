@@ -0,0 +1,142 @@
+"""
+Micro-benchmark of the middleware overhead per request:
+
+    python bench_middleware.py --path /recipes --requests 2000
+
+Calls the app in-process (no server, no sockets) with three middleware stacks and prints the
+latency of each and its overhead over the bare routes:
+
+    none    no user middleware
+    before  the current stack, with the security headers as a BaseHTTPMiddleware (as before)
+    after   the current stack, pure ASGI throughout
+
+Needs a bootstrapped database with the generate_dataset.py users; requests are made as --username.
+"""
+import time
+import asyncio
+import argparse
+import statistics
+
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """
+    The security headers middleware as it was, for comparison.
+    """
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        return response
+
+
+def build_stacks(app) -> dict:
+    """
+    ASGI apps for the "none", "before" and "after" stacks of `app`.
+    """
+    from middleware import SecurityHeadersMiddleware
+
+    current = list(app.user_middleware)
+    before = [
+        Middleware(LegacySecurityHeadersMiddleware) if middleware.cls is SecurityHeadersMiddleware else middleware
+        for middleware in current
+    ]
+    stacks = {}
+    try:
+        for name, middleware in (("none", []), ("before", before), ("after", current)):
+            app.user_middleware = middleware
+            stacks[name] = app.build_middleware_stack()
+    finally:
+        app.user_middleware = current
+    return stacks
+
+
+async def call(asgi_app, path: str, query: str = "", headers=()) -> tuple:
+    """
+    One GET request through `asgi_app`; returns (status, headers, body).
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"bench"), *headers],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    response = {"status": None, "headers": [], "body": b""}
+
+    requested = []
+
+    async def receive():
+        if requested:
+            # Nothing more to read: wait like a client that stays connected
+            await asyncio.Event().wait()
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await asgi_app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+async def measure(asgi_app, path: str, query: str, requests: int, headers) -> list:
+    for _ in range(min(50, requests)):
+        await call(asgi_app, path, query, headers)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        status, _, _ = await call(asgi_app, path, query, headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned {status}")
+    return timings
+
+
+async def run(path: str = "/recipes", query: str = "", requests: int = 1000, rounds: int = 3,
+              accept_encoding: str = "gzip", username: str = "loadtest000000") -> dict:
+    """
+    Median latency in ms per stack, the best of `rounds` rounds (stacks interleaved).
+    """
+    from main import app
+    from auth import create_access_token
+
+    headers = [(b"authorization", f"Bearer {create_access_token({'sub': username})}".encode())] if username else []
+    if accept_encoding:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    stacks = build_stacks(app)
+    best = {name: None for name in stacks}
+    for _ in range(rounds):
+        for name, asgi_app in stacks.items():
+            median = statistics.median(await measure(asgi_app, path, query, requests, headers))
+            best[name] = median if best[name] is None else min(best[name], median)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the per-request overhead of the middleware stack.")
+    parser.add_argument("--path", default="/recipes")
+    parser.add_argument("--query", default="", help="Query string, e.g. limit=12&tab=discover")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per stack and round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--accept-encoding", default="gzip", help="Empty to request uncompressed responses")
+    parser.add_argument("--username", default="loadtest000000", help="User to authenticate as, empty for none")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.path, args.query, args.requests, args.rounds, args.accept_encoding, args.username))
+    print(f"GET {args.path}: median per request over {args.requests} requests, best of {args.rounds} rounds")
+    for name, median in results.items():
+        overhead = median - results["none"]
+        print(f"  {name:7} {median * 1000:9.0f}µs   middleware {overhead * 1000:+8.0f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Micro-benchmark of response serialization:
+
+    python bench_serialization.py --recipes 50 --catalog 500
+
+Builds a page of recipes (with chapters, ingredients and steps) and an ingredient catalog as
+unsaved ORM objects, so no database is needed, and prints the median time to turn each into
+JSON bytes:
+
+    encoder   response model, then jsonable_encoder and json.dumps (dict-returning routes)
+    adapter   pre-built TypeAdapter, validated and dumped by pydantic-core (model_response)
+    cached    catalog bytes reused for an unchanged ETag (catalog_response)
+"""
+import json
+import time
+import uuid
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+import models
+import serialization
+from generate_dataset import INGREDIENTS
+
+
+def recipe_page(recipes: int = 50, chapters: int = 2, ingredients: int = 5, steps: int = 4, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    items = []
+    for i in range(recipes):
+        recipe_id = uuid.UUID(int=rng.getrandbits(128))
+        recipe = models.Recipe(
+            id=recipe_id, user_id=uuid.UUID(int=rng.getrandbits(128)), title=f"Recipe {i}",
+            created_at=datetime(2026, 1, 1) + timedelta(minutes=i), yield_amount=2,
+            type=models.RecipeCategory.baking, created_type=models.RecipeType.manual,
+            is_public=True, reference_temperature=20.0,
+        )
+        for c in range(chapters):
+            chapter = models.Chapter(id=uuid.UUID(int=rng.getrandbits(128)), recipe_id=recipe_id, name=f"Chapter {c}", order_index=c)
+            for n in range(ingredients):
+                name, ingredient_type, (low, high) = rng.choice(INGREDIENTS)
+                chapter.ingredients.append(models.Ingredient(
+                    id=n, chapter_id=chapter.id, name=name, amount=float(rng.randint(low, high)), unit="g", type=ingredient_type,
+                ))
+            for n in range(steps):
+                chapter.steps.append(models.Step(
+                    id=n, chapter_id=chapter.id, order_index=n, description="Mix, knead and let rest until doubled.",
+                    duration_min=rng.randint(5, 120), type=rng.choice(list(models.StepType)),
+                ))
+            recipe.chapters.append(chapter)
+        recipe.author = "baker"
+        recipe.rating_count = 0
+        recipe.average_rating = 0.0
+        recipe.is_favorited = False
+        items.append(recipe)
+    return {"items": items, "total": recipes, "page": 1, "size": recipes, "pages": 1}
+
+
+def catalog(items: int = 500) -> list:
+    unit = models.Unit(id=1, name={"en": {"singular": "gram", "plural": "grams"}, "de": {"singular": "Gramm", "plural": "Gramm"}})
+    catalog_items = []
+    for i in range(items):
+        name, _, _ = INGREDIENTS[i % len(INGREDIENTS)]
+        item = models.IngredientItem(id=i, name={lang: f"{value} {i}" for lang, value in name.items()}, default_unit_id=1, is_verified=True)
+        item.default_unit = unit
+        catalog_items.append(item)
+    return catalog_items
+
+
+def encoder(adapter, content) -> bytes:
+    value = adapter.validate_python(content, from_attributes=True)
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def adapter_json(adapter, content) -> bytes:
+    return serialization.model_response(adapter, content).body
+
+
+def measure(fn, repeat: int) -> float:
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(recipes: int = 50, catalog_items: int = 500, repeat: int = 50) -> dict:
+    """
+    Median milliseconds per method, {"recipe_page": {...}, "catalog": {...}}.
+    """
+    page = recipe_page(recipes)
+    items = catalog(catalog_items)
+    etag = f'"bench-{catalog_items}"'
+    return {
+        "recipe_page": {
+            "encoder": measure(lambda: encoder(serialization.RECIPE_PAGE, page), repeat),
+            "adapter": measure(lambda: adapter_json(serialization.RECIPE_PAGE, page), repeat),
+        },
+        "catalog": {
+            "encoder": measure(lambda: encoder(serialization.INGREDIENT_ITEMS, items), repeat),
+            "adapter": measure(lambda: adapter_json(serialization.INGREDIENT_ITEMS, items), repeat),
+            "cached": measure(lambda: serialization.catalog_response(serialization.INGREDIENT_ITEMS, etag, lambda: items).body, repeat),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the serialization of recipe pages and catalogs.")
+    parser.add_argument("--recipes", type=int, default=50, help="Recipes per page")
+    parser.add_argument("--catalog", type=int, default=500, help="Ingredient catalog size")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"orjson: {'yes' if serialization.orjson is not None else 'no (stdlib json)'}")
+    results = run(args.recipes, args.catalog, args.repeat)
+    for name, label in (("recipe_page", f"{args.recipes}-recipe page"), ("catalog", f"{args.catalog}-item catalog")):
+        print(label)
+        for method, median in results[name].items():
+            print(f"  {method:8} {median:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
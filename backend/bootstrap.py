@@ -0,0 +1,131 @@
+"""
+One-shot database setup, run before the API workers start (Dockerfile, systemd unit, update.sh):
+
+    python bootstrap.py
+
+Creates or migrates the schema with Alembic, then seeds roles, units and ingredients. Concurrent
+runs (several containers starting at once) are serialized by a database advisory lock. Workers
+run no DDL themselves; on startup they only check that the schema is at the Alembic head.
+"""
+import os
+import time
+import fcntl
+from contextlib import contextmanager
+from sqlalchemy import inspect, text
+from logger import logger
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Application-wide key of the PostgreSQL advisory lock (arbitrary, "bake" in ASCII)
+ADVISORY_LOCK_KEY = 0x62616B65
+
+# Last revision before the schema was fully managed by Alembic. Databases without a version
+# (created by create_all() on import) are stamped here and then upgraded: the following
+# revision adds whatever tables and columns they are missing.
+LEGACY_REVISION = "75d883dd6bb0"
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    # Keep the app's logging configuration when migrating in-process
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection):
+    from alembic.runtime.migration import MigrationContext
+
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+@contextmanager
+def bootstrap_lock(engine):
+    """
+    Held while migrating and seeding. PostgreSQL: session advisory lock; SQLite has none, so a
+    lock file next to the database is used instead.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        return
+
+    database = engine.url.database
+    lock_path = f"{os.path.abspath(database)}.bootstrap.lock" if database and database != ":memory:" else os.path.join(BACKEND_DIR, ".bootstrap.lock")
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migrate(engine):
+    """
+    Brings the schema to the Alembic head: a new database is created from the models and
+    stamped, a legacy one is stamped at LEGACY_REVISION and upgraded.
+    """
+    from alembic import command
+    import models
+
+    config = alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        tables = set(inspect(conn).get_table_names()) - {"alembic_version"}
+        current = current_revision(conn)
+        if not tables:
+            logger.info("Bootstrap: creating schema")
+            models.Base.metadata.create_all(bind=conn)
+            command.stamp(config, "head")
+            return
+        if current is None:
+            logger.info(f"Bootstrap: database has no schema version, treating it as {LEGACY_REVISION}")
+            command.stamp(config, LEGACY_REVISION)
+        command.upgrade(config, "head")
+
+
+def seed():
+    from seed_data import seed_roles, seed_data
+
+    seed_roles()
+    seed_data()
+
+
+def bootstrap():
+    from database import engine
+
+    start = time.perf_counter()
+    with bootstrap_lock(engine):
+        migrate(engine)
+        seed()
+    logger.info(f"Bootstrap completed in {time.perf_counter() - start:.1f}s")
+
+
+def check_schema_version(engine):
+    """
+    Raises RuntimeError unless the database is at the head revision.
+    """
+    with engine.connect() as conn:
+        current = current_revision(conn)
+    head = head_revision()
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'}, this version needs {head}. "
+            "Run `python bootstrap.py` before starting the API."
+        )
+
+
+if __name__ == "__main__":
+    bootstrap()
@@ -1,11 +1,6 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from sqlalchemy.orm import Session
 import models
 
-from email.header import Header
-
 def send_mail(db: Session, to_email: str, subject: str, body: str, smtp_config: dict = None):
     """
     Sends an email using SMTP settings from the database or provided config.
@@ -35,6 +30,11 @@ def send_mail(db: Session, to_email: str, subject: str, body: str, smtp_config:
         logger.warning("SMTP settings not configured")
         return False
         
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    from email.header import Header
+
     try:
         # Sanitize inputs - Aggressively remove non-breaking spaces
         to_email = to_email.replace('\xa0', '').strip()
@@ -0,0 +1,74 @@
+"""
+Strong ETags and conditional GET for read-heavy endpoints.
+
+ETags come from the recipe's version column or the catalog counters in table_versions (both
+bumped by the commit hook in models.py), so checking If-None-Match costs one small
+query and a 304 is sent before anything is loaded or serialized.
+"""
+import os
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import models
+from version import VERSION
+
+# Cache-Control hints: clients may store the response but revalidate it on every use
+PRIVATE_REVALIDATE = "private, no-cache"
+PUBLIC_REVALIDATE = "public, no-cache"
+# Changes only with an update of the app
+PUBLIC_HOUR = "public, max-age=3600"
+
+
+def make_etag(*parts) -> str:
+    # The app version is part of every tag: a new release may serialize differently
+    digest = hashlib.sha256("|".join(str(part) for part in (VERSION, *parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def table_etag(db: Session, *tables: str) -> str:
+    versions = dict(db.execute(
+        select(models.TableVersion.name, models.TableVersion.version).where(models.TableVersion.name.in_(tables))
+    ).all())
+    return make_etag(*(f"{table}:{versions.get(table, 0)}" for table in tables))
+
+
+def recipe_etag(db: Session, recipe_id, user: Optional[models.User], *parts) -> Optional[str]:
+    """
+    None if the recipe doesn't exist. Per user, since the detail says whether they favorited it,
+    and per variant in `parts` (e.g. a sparse fieldset).
+    """
+    version = db.execute(select(models.Recipe.version).where(models.Recipe.id == recipe_id)).scalar()
+    if version is None:
+        return None
+    return make_etag("recipe", recipe_id, version, user.id if user else "anonymous", *parts)
+
+
+def file_etag(path: str) -> str:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return make_etag("file", path, "missing")
+    return make_etag("file", path, stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" matches "x" (compressed responses are weak)
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Sets ETag and Cache-Control on the endpoint's response and returns a 304 response if the
+    client's copy is current (the endpoint returns it as is), otherwise None.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
@@ -0,0 +1,159 @@
+"""
+Sparse fieldsets for the recipe endpoints: `?fields=` and `?include=`.
+
+    GET /recipes/{id}?fields=id,title,reference_temperature&include=chapters.steps
+
+`fields` lists the recipe fields to return (`id` is always returned). `include` lists the
+related collections: `chapters` (with ingredients and steps), `chapters.ingredients`,
+`chapters.steps` (chapters with only that collection) and `ingredient_overview` (detail
+only: the list never computes it). Without `include`, the collections named in `fields` are
+returned; without either parameter, the full recipe is returned.
+
+The fieldset decides which relationships are loaded (nothing else is touched, so nothing is
+lazy loaded) and which response model the recipe is serialized with.
+"""
+import functools
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, TypeAdapter, computed_field, create_model
+from sqlalchemy.orm import joinedload, selectinload
+
+import models
+import schemas
+import serialization
+from images import rendition_srcset
+
+# Recipe fields backed by relationships (or computed from them)
+INCLUDES = ("chapters", "chapters.ingredients", "chapters.steps", "ingredient_overview")
+CHAPTER_COLLECTIONS = frozenset({"ingredients", "steps"})
+COLLECTION_FIELDS = frozenset({"chapters", "ingredient_overview"})
+FIELDS = frozenset(schemas.Recipe.model_fields) | frozenset(schemas.Recipe.model_computed_fields)
+SCALAR_FIELDS = FIELDS - COLLECTION_FIELDS
+# Only computed by the recipe detail endpoint
+DETAIL_ONLY_FIELDS = frozenset({"ingredient_overview"})
+
+def _split(value: Optional[str]) -> Optional[frozenset]:
+    if value is None:
+        return None
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+
+class RecipeFieldset:
+    def __init__(self, fields: Optional[str] = None, include: Optional[str] = None, detail: bool = True):
+        requested = _split(fields)
+        includes = _split(include)
+        if not detail:
+            unsupported = sorted(((requested or frozenset()) | (includes or frozenset())) & DETAIL_ONLY_FIELDS)
+            if unsupported:
+                raise ValueError(f"Not available in recipe lists: {', '.join(unsupported)}")
+        unknown = sorted((requested or frozenset()) - FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(FIELDS))}")
+        unknown = sorted((includes or frozenset()) - set(INCLUDES))
+        if unknown:
+            raise ValueError(f"Unknown include: {', '.join(unknown)}. Allowed: {', '.join(INCLUDES)}")
+
+        self.full = requested is None and includes is None
+        if includes is None:
+            self.fields = requested if requested is not None else FIELDS
+        else:
+            roots = frozenset(path.split(".")[0] for path in includes)
+            self.fields = ((requested if requested is not None else SCALAR_FIELDS) - COLLECTION_FIELDS) | roots
+        self.fields = self.fields | {"id"}
+
+        nested = frozenset(path.split(".", 1)[1] for path in includes or () if "." in path)
+        self.chapter_collections = nested or CHAPTER_COLLECTIONS
+        # Fields the endpoint needs beyond the response, e.g. for sorting
+        self.loaded = set(self.fields)
+
+    @property
+    def key(self) -> str:
+        # Distinguishes the variants of a response, e.g. in ETags
+        if self.full:
+            return ""
+        return f"{','.join(sorted(self.fields))};{','.join(sorted(self.chapter_collections))}"
+
+    def also_load(self, *names: str):
+        self.loaded.update(names)
+
+    def loader_options(self, load=selectinload) -> list:
+        """
+        Loader options for the relationships the fields need; collections use `load`.
+        """
+        options = []
+        if "author" in self.loaded:
+            options.append(joinedload(models.Recipe.owner))
+        if self.loaded & {"average_rating", "rating_count"}:
+            options.append(load(models.Recipe.ratings))
+        if "is_favorited" in self.loaded:
+            options.append(load(models.Recipe.favorites))
+        chapters = "chapters" in self.loaded
+        # The ingredient overview is aggregated from the chapters' ingredients
+        ingredients = chapters and "ingredients" in self.chapter_collections or "ingredient_overview" in self.loaded
+        steps = chapters and "steps" in self.chapter_collections
+        if ingredients:
+            options.append(load(models.Recipe.chapters).options(load(models.Chapter.ingredients)))
+        if steps:
+            options.append(load(models.Recipe.chapters).options(load(models.Chapter.steps)))
+        return options
+
+    def populate(self, recipe: models.Recipe, current_user: Optional[models.User]):
+        """
+        Sets the derived fields that are loaded (author, rating, favorite).
+        """
+        if "author" in self.loaded:
+            recipe.author = recipe.owner.username if recipe.owner else "Unknown"
+        if self.loaded & {"average_rating", "rating_count"}:
+            recipe.rating_count = len(recipe.ratings)
+            recipe.average_rating = sum(rt.score for rt in recipe.ratings) / recipe.rating_count if recipe.rating_count > 0 else 0.0
+        if "is_favorited" in self.loaded:
+            recipe.is_favorited = any(f.user_id == current_user.id for f in recipe.favorites) if current_user else False
+
+    def adapter(self, page: bool = False) -> TypeAdapter:
+        if self.full:
+            return serialization.RECIPE_PAGE if page else serialization.RECIPE
+        # Sorted tuples of validated names: one cache entry per distinct fieldset, however
+        # the query string spells it
+        return _adapters(tuple(sorted(self.fields)), tuple(sorted(self.chapter_collections)))[1 if page else 0]
+
+
+class _RecipeImage(BaseModel):
+    # Base of sparse models with image_srcset: the URL it is computed from isn't returned
+    image_url: Optional[str] = Field(None, exclude=True)
+
+    @computed_field
+    @property
+    def image_srcset(self) -> Optional[str]:
+        return rendition_srcset(self.image_url)
+
+
+def _chapter_model(collections: frozenset):
+    if frozenset(collections) == CHAPTER_COLLECTIONS:
+        return schemas.Chapter
+    types = {"ingredients": List[schemas.Ingredient], "steps": List[schemas.Step]}
+    return create_model(
+        "SparseChapter", __base__=schemas.ChapterBase,
+        id=(UUID, ...), recipe_id=(UUID, ...),
+        **{name: (types[name], ...) for name in collections}
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _adapters(fields: tuple, chapter_collections: tuple) -> tuple:
+    """
+    (recipe, page) adapters for a sparse model with just `fields` (sorted, validated names).
+    """
+    definitions = {}
+    for name in fields:
+        if name == "image_srcset":
+            continue
+        if name == "chapters":
+            definitions[name] = (List[_chapter_model(chapter_collections)], ...)
+            continue
+        field = schemas.Recipe.model_fields[name]
+        definitions[name] = (field.annotation, ... if field.is_required() else field.default)
+    base = _RecipeImage if "image_srcset" in fields else BaseModel
+    recipe = create_model("SparseRecipe", __base__=base, **definitions)
+    page = create_model("SparseRecipePage", __base__=schemas.RecipePage, items=(List[recipe], ...))
+    return TypeAdapter(recipe), TypeAdapter(page)
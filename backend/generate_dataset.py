@@ -0,0 +1,347 @@
+"""
+Generates a large synthetic dataset for capacity and load testing:
+
+    python generate_dataset.py --users 2000 --recipes 50000 --seed 42
+
+Users, recipes (with chapters, ingredients and steps), ratings, favorites, sessions and
+(recurring) schedules are written with bulk inserts in blocks of --batch-size rows. The output
+only depends on --seed and --reference-date, so benchmark datasets are reproducible. Generated
+users are named <prefix>NNNNNN and share one password; --clear removes them and their data.
+"""
+import re
+import sys
+import time
+import uuid
+import random
+import argparse
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, insert, select, update
+import models
+
+# (name, type, typical amount range in g) of the generated ingredients
+INGREDIENTS = [
+    ({"en": "Wheat flour", "de": "Weizenmehl"}, models.IngredientType.flour, (200, 1000)),
+    ({"en": "Rye flour", "de": "Roggenmehl"}, models.IngredientType.flour, (100, 600)),
+    ({"en": "Spelt flour", "de": "Dinkelmehl"}, models.IngredientType.flour, (100, 600)),
+    ({"en": "Whole wheat flour", "de": "Weizenvollkornmehl"}, models.IngredientType.flour, (50, 400)),
+    ({"en": "Water", "de": "Wasser"}, models.IngredientType.liquid, (100, 750)),
+    ({"en": "Milk", "de": "Milch"}, models.IngredientType.liquid, (50, 400)),
+    ({"en": "Sourdough starter", "de": "Anstellgut"}, models.IngredientType.starter, (10, 200)),
+    ({"en": "Yeast", "de": "Hefe"}, models.IngredientType.starter, (1, 42)),
+    ({"en": "Salt", "de": "Salz"}, models.IngredientType.salt, (5, 25)),
+    ({"en": "Sunflower seeds", "de": "Sonnenblumenkerne"}, models.IngredientType.add_in, (20, 150)),
+    ({"en": "Walnuts", "de": "Walnüsse"}, models.IngredientType.add_in, (20, 150)),
+    ({"en": "Butter", "de": "Butter"}, models.IngredientType.other, (10, 250)),
+    ({"en": "Sugar", "de": "Zucker"}, models.IngredientType.other, (5, 200)),
+    ({"en": "Honey", "de": "Honig"}, models.IngredientType.other, (5, 60)),
+    ({"en": "Egg", "de": "Ei"}, models.IngredientType.other, (50, 200)),
+]
+
+TITLE_ADJECTIVES = ["Rustic", "Country", "Overnight", "Seeded", "Light", "Dark", "Crusty", "Soft", "Quick", "Classic"]
+TITLE_NOUNS = ["Sourdough", "Rye Bread", "Baguette", "Ciabatta", "Focaccia", "Brioche", "Rolls", "Pizza", "Bagels", "Spelt Loaf"]
+CHAPTER_NAMES = ["Starter", "Preferment", "Soaker", "Main Dough", "Topping"]
+STEP_TEXTS = {
+    models.StepType.active: ["Mix all ingredients", "Knead the dough", "Stretch and fold", "Shape the loaf", "Pre-shape"],
+    models.StepType.passive: ["Let it rise", "Bulk fermentation", "Proof in the basket", "Rest the dough", "Retard in the fridge"],
+    models.StepType.baking: ["Bake with steam", "Bake until golden", "Bake in the Dutch oven"],
+}
+RECURRENCE_RULES = ["FREQ=DAILY", "FREQ=WEEKLY;BYDAY=SA", "FREQ=WEEKLY;BYDAY=MO,TH", "FREQ=MONTHLY;BYMONTHDAY=1"]
+
+# Relative frequency of 1, 2, 3 and 4 chapters per recipe
+CHAPTER_WEIGHTS = [30, 45, 20, 5]
+
+DEFAULT_PREFIX = "loadtest"
+DEFAULT_PASSWORD = "loadtest-password"
+
+
+class _Batches:
+    """
+    Collects rows per table and inserts them with one executemany per full batch. Parents are
+    flushed before children so foreign keys hold on PostgreSQL.
+    """
+
+    ORDER = [models.User, models.Recipe, models.Chapter, models.Ingredient, models.Step,
+             models.Rating, models.Favorite, models.UserSession, models.Schedule]
+
+    def __init__(self, conn, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.rows = {model: [] for model in self.ORDER}
+        self.counts = {model: 0 for model in self.ORDER}
+
+    def add(self, model, row: dict):
+        self.rows[model].append(row)
+        if len(self.rows[model]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model in self.ORDER:
+            rows = self.rows[model]
+            if rows:
+                self.conn.execute(insert(model), rows)
+                self.counts[model] += len(rows)
+                self.rows[model] = []
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _weighted_sample(rng: random.Random, population: int, weights, k: int) -> list:
+    """
+    k distinct indexes out of range(population), drawn with the given (cumulative) weights.
+    """
+    k = min(k, population)
+    picked = set()
+    while len(picked) < k:
+        picked.update(rng.choices(range(population), cum_weights=weights, k=k - len(picked)))
+    return sorted(picked)
+
+
+def _cumulative(weights):
+    total, result = 0.0, []
+    for w in weights:
+        total += w
+        result.append(total)
+    return result
+
+
+def _recipe_rows(rng: random.Random, batches: _Batches, recipe_id: uuid.UUID):
+    for c in range(rng.choices(range(1, 5), weights=CHAPTER_WEIGHTS)[0]):
+        chapter_id = _uuid(rng)
+        batches.add(models.Chapter, {"id": chapter_id, "recipe_id": recipe_id, "name": CHAPTER_NAMES[c], "order_index": c})
+
+        for name, ingredient_type, (low, high) in rng.sample(INGREDIENTS, rng.randint(2, 8)):
+            batches.add(models.Ingredient, {
+                "chapter_id": chapter_id,
+                "name": name,
+                "amount": round(rng.uniform(low, high)),
+                "unit": "g",
+                "type": ingredient_type,
+                "temperature": rng.choice([None, None, 4.0, 20.0, 28.0]),
+            })
+
+        steps = rng.randint(1, 6)
+        for s in range(steps):
+            if s == steps - 1 and c == 0 and rng.random() < 0.5:
+                step_type = models.StepType.baking
+            else:
+                step_type = rng.choice([models.StepType.active, models.StepType.passive])
+            if step_type == models.StepType.active:
+                duration = rng.randint(5, 30)
+            elif step_type == models.StepType.passive:
+                # Mostly an hour or two, sometimes overnight
+                duration = min(960, int(rng.lognormvariate(4.5, 0.8)))
+            else:
+                duration = rng.randint(20, 60)
+            batches.add(models.Step, {
+                "chapter_id": chapter_id,
+                "order_index": s,
+                "description": rng.choice(STEP_TEXTS[step_type]),
+                "duration_min": duration,
+                "type": step_type,
+                "temperature": rng.choice([220, 230, 250]) if step_type == models.StepType.baking else None,
+            })
+
+
+def generate(conn, users: int, recipes: int, seed: int = 0, reference_date: date = None,
+             prefix: str = DEFAULT_PREFIX, password: str = DEFAULT_PASSWORD, batch_size: int = 1000) -> dict:
+    """
+    Writes the dataset through the connection (the caller commits) and returns the number of
+    rows per table. Needs the "User" role (created by bootstrap.py).
+    """
+    from auth import get_password_hash
+
+    rng = random.Random(seed)
+    reference = datetime.combine(reference_date or date.today(), datetime.min.time())
+    role_id = conn.execute(select(models.Role.id).where(models.Role.name == "User")).scalar()
+    if role_id is None:
+        raise RuntimeError('Role "User" not found: run bootstrap.py first.')
+    if _generated_user_ids(conn, prefix):
+        raise RuntimeError(f'Users with prefix "{prefix}" exist: remove them with --clear or pick another --prefix.')
+
+    batches = _Batches(conn, batch_size)
+    # bcrypt is slow on purpose, so all generated users share one hash
+    hashed_password = get_password_hash(password)
+
+    user_ids = []
+    for i in range(users):
+        user_id = str(_uuid(rng))
+        user_ids.append(user_id)
+        created_at = reference - timedelta(days=rng.randint(1, 730), seconds=rng.randint(0, 86399))
+        batches.add(models.User, {
+            "id": user_id,
+            "username": f"{prefix}{i:06d}",
+            "email": f"{prefix}{i:06d}@example.com",
+            "hashed_password": hashed_password,
+            "role": models.UserRole.user,
+            "role_id": role_id,
+            "is_active": True,
+            "is_verified": True,
+            "language": rng.choice(["en", "en", "de"]),
+            "token_version": 1,
+            "session_duration_minutes": 60,
+            "created_at": created_at,
+        })
+        for _ in range(rng.choices([0, 1, 2, 3], weights=[20, 50, 20, 10])[0]):
+            last_used = reference - timedelta(minutes=rng.randint(0, 60 * 24 * 14))
+            batches.add(models.UserSession, {
+                "id": str(_uuid(rng)),
+                "user_id": user_id,
+                "ip_address": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                "user_agent": rng.choice(["Mozilla/5.0 (X11; Linux x86_64)", "Mozilla/5.0 (iPhone)", "Mozilla/5.0 (Windows NT 10.0)"]),
+                "created_at": last_used - timedelta(hours=rng.randint(0, 72)),
+                "last_used_at": last_used,
+                "expires_at": last_used + timedelta(days=30),
+                "is_active": rng.random() < 0.9,
+            })
+
+    if not user_ids:
+        batches.flush()
+        return {model.__tablename__: count for model, count in batches.counts.items()}
+
+    # A few prolific authors own most recipes, like on any recipe site
+    author_weights = _cumulative(rng.paretovariate(1.2) for _ in user_ids)
+    recipe_ids, recipe_owners = [], []
+    for n in range(recipes):
+        recipe_id = _uuid(rng)
+        owner = rng.choices(range(len(user_ids)), cum_weights=author_weights)[0]
+        recipe_ids.append(recipe_id)
+        recipe_owners.append(owner)
+        created_at = reference - timedelta(days=rng.randint(0, 700), seconds=rng.randint(0, 86399))
+        category = models.RecipeCategory.baking if rng.random() < 0.8 else models.RecipeCategory.cooking
+        batches.add(models.Recipe, {
+            "id": recipe_id,
+            "user_id": user_ids[owner],
+            "title": f"{rng.choice(TITLE_ADJECTIVES)} {rng.choice(TITLE_NOUNS)} #{n}",
+            "source_url": f"https://example.com/recipes/{n}" if rng.random() < 0.3 else None,
+            "created_type": models.RecipeType.ai_import if rng.random() < 0.3 else models.RecipeType.manual,
+            "type": category,
+            "is_public": rng.random() < 0.6,
+            "yield_amount": rng.choice([1, 1, 2, 2, 4, 6, 12]),
+            "weight_per_piece": rng.choice([None, 80, 500, 750, 1000]),
+            "reference_temperature": rng.choice([20.0, 22.0, 24.0, 26.0]),
+            "created_at": created_at,
+        })
+        _recipe_rows(rng, batches, recipe_id)
+
+    if recipe_ids:
+        # Popularity is skewed as well: most ratings and favorites go to few recipes
+        popularity = _cumulative(rng.paretovariate(1.0) for _ in recipe_ids)
+        for user_id in user_ids:
+            for r in _weighted_sample(rng, len(recipe_ids), popularity, rng.choices([0, 1, 3, 10, 30], weights=[30, 25, 25, 15, 5])[0]):
+                batches.add(models.Rating, {
+                    "user_id": user_id,
+                    "recipe_id": recipe_ids[r],
+                    "score": rng.choices([1, 2, 3, 4, 5], weights=[3, 5, 15, 40, 37])[0],
+                    "created_at": reference - timedelta(days=rng.randint(0, 365)),
+                })
+            for r in _weighted_sample(rng, len(recipe_ids), popularity, rng.choices([0, 2, 5, 20], weights=[35, 30, 25, 10])[0]):
+                batches.add(models.Favorite, {
+                    "user_id": user_id,
+                    "recipe_id": recipe_ids[r],
+                    "created_at": reference - timedelta(days=rng.randint(0, 365)),
+                })
+
+        recipes_by_owner = {}
+        for recipe_id, owner in zip(recipe_ids, recipe_owners):
+            recipes_by_owner.setdefault(owner, []).append(recipe_id)
+        for u, user_id in enumerate(user_ids):
+            own = recipes_by_owner.get(u)
+            for _ in range(rng.choices([0, 1, 4, 12], weights=[40, 30, 20, 10])[0]):
+                recipe_id = rng.choice(own) if own and rng.random() < 0.7 else recipe_ids[rng.choices(range(len(recipe_ids)), cum_weights=popularity)[0]]
+                target = reference + timedelta(days=rng.randint(-60, 30), hours=rng.randint(6, 20))
+                recurring = rng.random() < 0.15
+                batches.add(models.Schedule, {
+                    "id": _uuid(rng),
+                    "user_id": user_id,
+                    "recipe_id": recipe_id,
+                    "target_time": target,
+                    "start_time": target - timedelta(hours=rng.randint(2, 24)),
+                    "title": "Feed sourdough starter" if recurring else None,
+                    "event_type": "feeding" if recurring else "baking",
+                    "recurrence_rule": rng.choice(RECURRENCE_RULES) if recurring else None,
+                    "real_temperature": rng.choice([None, 19.5, 21.0, 23.5]),
+                })
+
+    batches.flush()
+    return {model.__tablename__: count for model, count in batches.counts.items()}
+
+
+def _generated_user_ids(conn, prefix: str) -> list:
+    """
+    Ids of the users named exactly <prefix>NNNNNN. Real accounts that merely start with the
+    prefix (such as "loadtester") are not matched.
+    """
+    pattern = re.compile(re.escape(prefix) + "[0-9]{6,}")
+    rows = conn.execute(select(models.User.id, models.User.username).where(models.User.username.startswith(prefix, autoescape=True)))
+    return [user_id for user_id, username in rows if pattern.fullmatch(username)]
+
+
+def clear(conn, prefix: str = DEFAULT_PREFIX, batch_size: int = 1000) -> int:
+    """
+    Deletes the generated users with the prefix and everything they own, batch_size users per
+    round. Returns the number of users.
+    """
+    user_ids = _generated_user_ids(conn, prefix)
+    deleted = 0
+    for start in range(0, len(user_ids), batch_size):
+        users = user_ids[start:start + batch_size]
+        recipes = select(models.Recipe.id).where(models.Recipe.user_id.in_(users)).scalar_subquery()
+        chapters = select(models.Chapter.id).where(models.Chapter.recipe_id.in_(recipes)).scalar_subquery()
+
+        # Other users' favorites, ratings and schedules of the deleted recipes go too; their
+        # import jobs and ingredients pointing at the deleted recipes lose the link
+        conn.execute(delete(models.Favorite).where(models.Favorite.user_id.in_(users) | models.Favorite.recipe_id.in_(recipes)))
+        conn.execute(delete(models.Rating).where(models.Rating.user_id.in_(users) | models.Rating.recipe_id.in_(recipes)))
+        conn.execute(delete(models.Schedule).where(models.Schedule.user_id.in_(users) | models.Schedule.recipe_id.in_(recipes)))
+        conn.execute(delete(models.ImportJob).where(models.ImportJob.user_id.in_(users)))
+        conn.execute(update(models.ImportJob).where(models.ImportJob.recipe_id.in_(recipes)).values(recipe_id=None))
+        conn.execute(delete(models.VerificationToken).where(models.VerificationToken.user_id.in_(users)))
+        conn.execute(delete(models.UserSession).where(models.UserSession.user_id.in_(users)))
+        linking = (select(models.Chapter.recipe_id).join(models.Ingredient, models.Ingredient.chapter_id == models.Chapter.id)
+                   .where(models.Ingredient.linked_recipe_id.in_(recipes)).scalar_subquery())
+        conn.execute(update(models.Recipe).where(models.Recipe.id.in_(linking)).values(version=models.Recipe.version + 1))
+        conn.execute(update(models.Ingredient).where(models.Ingredient.linked_recipe_id.in_(recipes)).values(linked_recipe_id=None))
+        conn.execute(delete(models.Ingredient).where(models.Ingredient.chapter_id.in_(chapters)))
+        conn.execute(delete(models.Step).where(models.Step.chapter_id.in_(chapters)))
+        conn.execute(delete(models.Chapter).where(models.Chapter.recipe_id.in_(recipes)))
+        conn.execute(delete(models.Recipe).where(models.Recipe.user_id.in_(users)))
+        deleted += conn.execute(delete(models.User).where(models.User.id.in_(users))).rowcount
+    return deleted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for capacity testing.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--recipes", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0, help="Same seed (and reference date) gives the same data")
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=None,
+                        help="Date all timestamps are relative to, YYYY-MM-DD (default: today)")
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Username prefix of the generated users")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of all generated users")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT batch")
+    parser.add_argument("--clear", action="store_true", help="Only delete previously generated users and their data")
+    args = parser.parse_args(argv)
+
+    from database import engine
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        if args.clear:
+            print(f"Deleted {clear(conn, args.prefix, args.batch_size)} users with prefix '{args.prefix}' and their data")
+            return
+        try:
+            counts = generate(conn, args.users, args.recipes, seed=args.seed, reference_date=args.reference_date,
+                              prefix=args.prefix, password=args.password, batch_size=args.batch_size)
+        except RuntimeError as e:
+            sys.exit(str(e))
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"{table:15} {count:>10}")
+    print(f"Inserted {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
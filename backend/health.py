@@ -0,0 +1,173 @@
+"""
+Liveness and readiness checks for the orchestrator and the admin status page.
+
+Readiness runs every check concurrently with its own timeout and caches the result for
+HEALTH_CACHE_SECONDS, so frequent probes from several sources cost at most one round of
+checks per worker and interval. A timeout only stops waiting: a blocking check keeps its
+thread until it returns, so a check still running from an earlier round is awaited again
+instead of starting another thread.
+"""
+import os
+import time
+import asyncio
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+# The heartbeat task runs on the same event loop as the periodic jobs (session cleanup,
+# upload GC, scheduled backups) and /readyz itself. A stale heartbeat means the task died;
+# while the loop is blocked /readyz can't answer either, so a block only shows afterwards,
+# as the lag the heartbeat measured (how late its sleep woke up).
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("HEARTBEAT_INTERVAL_SECONDS", "10"))
+HEALTH_MAX_LOOP_LAG_SECONDS = float(os.getenv("HEALTH_MAX_LOOP_LAG_SECONDS", "1"))
+
+# Checks whose failure makes the worker not ready; the others only degrade the status
+CRITICAL_CHECKS = {"database"}
+
+IS_DOCKER = os.path.exists("/.dockerenv")
+
+_last_heartbeat = None
+_loop_lag = 0.0
+_cache = {"expires": 0.0, "result": None}
+_lock = None
+# Check name -> (event loop, future) of blocking checks running in the executor
+_in_flight = {}
+
+
+async def heartbeat_loop():
+    global _last_heartbeat, _loop_lag
+    while True:
+        _last_heartbeat = time.monotonic()
+        await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+        _loop_lag = max(0.0, time.monotonic() - _last_heartbeat - HEARTBEAT_INTERVAL_SECONDS)
+
+
+def check_database():
+    from sqlalchemy import text
+    from database import engine
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return "online", None
+
+
+async def check_scraper():
+    from scraper import PLAYWRIGHT_WS_ENDPOINT
+
+    if not PLAYWRIGHT_WS_ENDPOINT:
+        # Without a remote browser pages are fetched with plain HTTP requests
+        return "online", "no renderer configured, static fetching only"
+
+    url = urlsplit(PLAYWRIGHT_WS_ENDPOINT)
+    port = url.port or (443 if url.scheme in ("wss", "https") else 80)
+    _, writer = await asyncio.open_connection(url.hostname, port)
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return "online", None
+
+
+def check_ai():
+    import models
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        setting = db.query(models.SystemSetting.value).filter(models.SystemSetting.key == "gemini_api_key").first()
+    finally:
+        db.close()
+    if setting and setting.value and setting.value.strip():
+        return "online", None
+    return "offline", "no Gemini API key configured"
+
+
+async def check_worker():
+    if _last_heartbeat is None:
+        return "offline", "background worker not started"
+    age = time.monotonic() - _last_heartbeat
+    if age > 3 * HEARTBEAT_INTERVAL_SECONDS:
+        return "offline", f"last heartbeat {age:.0f}s ago"
+    if _loop_lag > HEALTH_MAX_LOOP_LAG_SECONDS:
+        return "offline", f"event loop lagged {_loop_lag:.1f}s behind the heartbeat"
+    return "online", None
+
+
+CHECKS = {
+    "database": check_database,
+    "scraper": check_scraper,
+    "ai": check_ai,
+    "worker": check_worker,
+}
+
+
+def _start_blocking_check(name, check):
+    loop = asyncio.get_running_loop()
+    running = _in_flight.get(name)
+    if running is not None and running[0] is loop and not running[1].done():
+        return running[1]
+    future = loop.run_in_executor(None, check)
+    # Retrieved here, as nobody may be waiting anymore when a timed-out check fails
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _in_flight[name] = (loop, future)
+    return future
+
+
+async def _run_check(name, check):
+    start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(check):
+            call = check()
+        else:
+            # Shielded: timing out must not drop the future while its thread still runs
+            call = asyncio.shield(_start_blocking_check(name, check))
+        status, detail = await asyncio.wait_for(call, timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        status, detail = "offline", f"timed out after {HEALTH_CHECK_TIMEOUT_SECONDS:g}s"
+    except OSError as e:
+        status, detail = "offline", f"unreachable: {e}"
+    except Exception as e:
+        status, detail = "offline", str(e)
+    result = {"status": status, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+    if detail:
+        result["detail"] = detail
+    return result
+
+
+async def readiness(force: bool = False) -> dict:
+    """
+    Runs all checks (or returns the cached result) as
+    {"status": "ok" | "degraded" | "unavailable", "ready": bool, "checked_at": ..., "checks": {...}}.
+    """
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+
+    async with _lock:
+        # Probes arriving while a round is running wait for it and share its result
+        now = time.monotonic()
+        if not force and _cache["result"] is not None and now < _cache["expires"]:
+            return _cache["result"]
+
+        names = list(CHECKS)
+        results = await asyncio.gather(*(_run_check(name, CHECKS[name]) for name in names))
+        checks = dict(zip(names, results))
+        ready = all(checks[name]["status"] == "online" for name in CRITICAL_CHECKS)
+        if not ready:
+            status = "unavailable"
+        elif all(check["status"] == "online" for check in checks.values()):
+            status = "ok"
+        else:
+            status = "degraded"
+
+        result = {
+            "status": status,
+            "ready": ready,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+        }
+        _cache.update(expires=time.monotonic() + HEALTH_CACHE_SECONDS, result=result)
+        return result
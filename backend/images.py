@@ -0,0 +1,249 @@
+import os
+import io
+import re
+import socket
+import hashlib
+import asyncio
+import ipaddress
+from functools import lru_cache
+from typing import Optional, Dict
+from logger import logger
+from uploads import UPLOAD_DIR, content_key
+
+UPLOAD_URL_PREFIX = "/static/uploads"
+
+# Rendition name -> target width in pixels (never upscaled)
+RENDITIONS = {
+    "thumb": 160,
+    "card": 480,
+    "hero": 1200,
+}
+DEFAULT_RENDITION = "hero"
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+IMAGE_MAX_DOWNLOAD_BYTES = int(os.getenv("IMAGE_MAX_DOWNLOAD_BYTES", str(15 * 1024 * 1024)))
+IMAGE_DOWNLOAD_TIMEOUT = 15
+IMAGE_MAX_REDIRECTS = 5
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+def rendition_filename(content_hash: str, rendition: str, fmt: str = "webp") -> str:
+    return f"{content_hash}_{rendition}.{fmt}"
+
+
+def rendition_url(content_hash: str, rendition: str = DEFAULT_RENDITION, fmt: str = "webp") -> str:
+    return f"{UPLOAD_URL_PREFIX}/{rendition_filename(content_hash, rendition, fmt)}"
+
+
+def generate_renditions(data: bytes, content_hash: str) -> Dict[str, str]:
+    """
+    Writes WebP and JPEG renditions of the image for every entry in RENDITIONS.
+    Files are keyed by content hash, so existing renditions are reused as-is (only their
+    mtime is refreshed).
+    Returns {rendition: webp_url}.
+    """
+    from PIL import Image, ImageOps
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    urls = {}
+    source = None
+    try:
+        for name, width in RENDITIONS.items():
+            webp_path = os.path.join(UPLOAD_DIR, rendition_filename(content_hash, name, "webp"))
+            jpeg_path = os.path.join(UPLOAD_DIR, rendition_filename(content_hash, name, "jpg"))
+            urls[name] = rendition_url(content_hash, name, "webp")
+            if os.path.exists(webp_path) and os.path.exists(jpeg_path):
+                # Reused: refresh mtime so the upload GC grace period restarts
+                os.utime(webp_path)
+                os.utime(jpeg_path)
+                continue
+
+            if source is None:
+                source = Image.open(io.BytesIO(data))
+                source = ImageOps.exif_transpose(source).convert("RGB")
+
+            img = source.copy()
+            if img.width > width:
+                img.thumbnail((width, round(img.height * width / img.width)), Image.LANCZOS)
+
+            # Write to a temp name first so readers never see half-written files
+            for path, fmt, options in (
+                (webp_path, "WEBP", {"quality": WEBP_QUALITY, "method": 4}),
+                (jpeg_path, "JPEG", {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}),
+            ):
+                tmp_path = f"{path}.tmp"
+                img.save(tmp_path, fmt, **options)
+                os.replace(tmp_path, path)
+    finally:
+        if source is not None:
+            source.close()
+
+    return urls
+
+
+_RENDITION_URL_RE = re.compile(r"^(?P<prefix>.*" + re.escape(UPLOAD_URL_PREFIX) + r"/(?P<key>[^/_.?#]+))_(?:" + "|".join(RENDITIONS) + r")\.(?P<ext>webp|jpg)$")
+
+
+@lru_cache(maxsize=4096)
+def _largest_rendition_width(content_hash: str) -> int:
+    # Only reads the image header. Files are content-addressed, so the width never changes;
+    # a missing file raises and is not cached.
+    from PIL import Image
+
+    largest = max(RENDITIONS, key=RENDITIONS.get)
+    with Image.open(os.path.join(UPLOAD_DIR, rendition_filename(content_hash, largest, "webp"))) as img:
+        return img.width
+
+
+def rendition_widths(content_hash: str) -> Dict[str, int]:
+    """
+    Real pixel widths of the renditions of an image: renditions are never upscaled, so
+    each is at most as wide as the largest one.
+    """
+    largest_width = _largest_rendition_width(content_hash)
+    return {name: min(width, largest_width) for name, width in RENDITIONS.items()}
+
+
+def rendition_srcset(url: Optional[str]) -> Optional[str]:
+    """
+    Builds a srcset attribute value for an image URL that points at one of our renditions,
+    with each rendition's real width. Renditions that are no wider than a smaller one
+    (source narrower than the target) are left out.
+    Returns None for any other URL (remote images, legacy uploads without renditions).
+    """
+    if not url:
+        return None
+    match = _RENDITION_URL_RE.match(url)
+    if not match:
+        return None
+    try:
+        widths = rendition_widths(match.group("key"))
+    except Exception:
+        return None
+
+    prefix, ext = match.group("prefix"), match.group("ext")
+    candidates = []
+    for name, width in sorted(widths.items(), key=lambda item: RENDITIONS[item[0]]):
+        if candidates and candidates[-1][1] >= width:
+            continue
+        candidates.append((name, width))
+    return ", ".join(f"{prefix}_{name}.{ext} {width}w" for name, width in candidates)
+
+
+def upload_renditions_sync(file_path: str, key: str) -> Optional[Dict[str, str]]:
+    """
+    Generates renditions for an uploaded file. Returns None if the file is not a raster image.
+    """
+    try:
+        from PIL import Image
+        with open(file_path, "rb") as f:
+            data = f.read()
+        with Image.open(io.BytesIO(data)) as img:
+            img.verify()
+        return generate_renditions(data, key)
+    except ImportError:
+        logger.warning("Pillow is not installed, skipping upload renditions")
+    except Exception as e:
+        logger.info(f"No renditions for {file_path}: {e}")
+    return None
+
+
+async def upload_renditions(file_path: str, key: str) -> Optional[Dict[str, str]]:
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, upload_renditions_sync, file_path, key)
+
+
+def check_public_url(url: str):
+    """
+    Rejects URLs that are not http(s) or whose host resolves to a loopback, private,
+    link-local or otherwise non-public address (e.g. cloud metadata services).
+    Raises ValueError.
+    """
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Unsupported image URL: {url}")
+
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise ValueError(f"Cannot resolve {parts.hostname}: {e}")
+
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if getattr(address, "ipv4_mapped", None):
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise ValueError(f"Image host {parts.hostname} resolves to non-public address {address}")
+
+
+def download_image(url: str) -> bytes:
+    """
+    Downloads an image with a size limit. Redirects are followed manually so that every
+    hop is checked with check_public_url. Raises ValueError for non-public targets and
+    non-image or oversized responses.
+    """
+    import requests
+    from urllib.parse import urljoin
+
+    headers = {'User-Agent': USER_AGENT}
+    for _ in range(IMAGE_MAX_REDIRECTS + 1):
+        check_public_url(url)
+        response = requests.get(url, headers=headers, timeout=IMAGE_DOWNLOAD_TIMEOUT, stream=True, allow_redirects=False)
+        if response.is_redirect:
+            url = urljoin(url, response.headers["Location"])
+            response.close()
+            continue
+        break
+    else:
+        raise ValueError("Too many redirects")
+
+    with response:
+        response.raise_for_status()
+
+        content_type = response.headers.get("Content-Type", "")
+        if content_type and not content_type.startswith("image/"):
+            raise ValueError(f"Not an image: {content_type}")
+
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > IMAGE_MAX_DOWNLOAD_BYTES:
+            raise ValueError("Image too large")
+
+        buffer = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            buffer.write(chunk)
+            if buffer.tell() > IMAGE_MAX_DOWNLOAD_BYTES:
+                raise ValueError("Image too large")
+        return buffer.getvalue()
+
+
+def ingest_remote_image_sync(url: str) -> Optional[str]:
+    data = download_image(url)
+    content_hash = content_key(hashlib.sha256(data))
+    urls = generate_renditions(data, content_hash)
+    return urls[DEFAULT_RENDITION]
+
+
+async def ingest_remote_image(url: Optional[str]) -> Optional[str]:
+    """
+    Downloads a remote recipe image once and stores local renditions under static/uploads.
+    Returns the relative URL of the hero rendition, or the original URL if ingestion fails
+    (or it is already local), so imports never fail because of an image.
+    Renditions of an import preview that is never saved are unreferenced and removed by
+    the upload GC after its grace period.
+    """
+    if not url or not url.startswith(("http://", "https://")) or f"{UPLOAD_URL_PREFIX}/" in url:
+        return url
+
+    try:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, ingest_remote_image_sync, url)
+    except ImportError:
+        logger.warning("Pillow is not installed, keeping remote image URL")
+    except Exception as e:
+        logger.warning(f"Image ingestion failed for {url}: {e}")
+    return url
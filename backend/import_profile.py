@@ -0,0 +1,119 @@
+"""
+Import-time profile of the API, based on `python -X importtime`:
+
+    python import_profile.py --budget-ms 1000
+
+Imports main in fresh interpreters, prints the slowest packages and fails (exit code 1) when the
+import takes longer than the budget or loads one of LAZY_MODULES. Those are only needed by a few
+endpoints (AI import, scraping, e-mail, login) and are imported where they are used, so that
+workers start fast and don't carry them in memory until then.
+"""
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Imported on first use only, never while importing main
+LAZY_MODULES = (
+    "google.generativeai",
+    "grpc",
+    "playwright",
+    "requests",
+    "smtplib",
+    "passlib",
+    "jose",
+    "PIL",
+)
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1000"))
+
+
+def parse_importtime(output: str) -> list:
+    """
+    Parses -X importtime output into (module, self_us, cumulative_us, depth) tuples, in import order.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def profile_import(module: str = "main", runs: int = 3, cwd: str = BACKEND_DIR, env: dict = None) -> dict:
+    """
+    Imports `module` in `runs` fresh interpreters and returns the fastest run: total milliseconds,
+    self time per top-level package and all modules loaded.
+    """
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=cwd, env={**os.environ, "PYTHONPATH": BACKEND_DIR, **(env or {})},
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        entries = parse_importtime(result.stderr)
+        total_us = next(cumulative for name, _, cumulative, depth in reversed(entries) if name == module and depth == 0)
+        if best is None or total_us < best[0]:
+            best = (total_us, entries)
+
+    total_us, entries = best
+    packages = defaultdict(int)
+    for name, self_us, _, _ in entries:
+        packages[name.split(".")[0]] += self_us
+    return {
+        "module": module,
+        "total_ms": total_us / 1000,
+        "packages_ms": {name: us / 1000 for name, us in sorted(packages.items(), key=lambda item: -item[1])},
+        "modules": {name for name, _, _, _ in entries},
+    }
+
+
+def loaded_lazy_modules(profile: dict) -> list:
+    return sorted(
+        lazy for lazy in LAZY_MODULES
+        if any(name == lazy or name.startswith(lazy + ".") for name in profile["modules"])
+    )
+
+
+def check_budget(profile: dict, budget_ms: float = IMPORT_BUDGET_MS) -> list:
+    """
+    Returns a list of violations, empty when the import is within budget.
+    """
+    problems = []
+    if profile["total_ms"] > budget_ms:
+        problems.append(f"import {profile['module']} took {profile['total_ms']:.0f}ms, budget is {budget_ms:.0f}ms")
+    for lazy in loaded_lazy_modules(profile):
+        problems.append(f"import {profile['module']} loads {lazy}, which should be imported on first use")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile and check the import time of the API.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to import in, the fastest counts")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list")
+    args = parser.parse_args(argv)
+
+    profile = profile_import(args.module, runs=args.runs)
+    print(f"import {args.module}: {profile['total_ms']:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    for name, ms in list(profile["packages_ms"].items())[:args.top]:
+        print(f"  {name:30} {ms:8.1f}ms")
+
+    problems = check_budget(profile, args.budget_ms)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
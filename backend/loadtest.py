@@ -0,0 +1,454 @@
+"""
+HTTP load test of the core user journeys, driven by asyncio with keep-alive connections and no
+dependencies outside the standard library:
+
+    python bootstrap.py
+    python generate_dataset.py --users 200 --recipes 5000 --seed 1
+    python loadtest.py --start-server --concurrency 20 --duration 30 --output reports/run
+
+Every scenario (discover, search, recipe detail, plan, favorite, rate, login) runs on its own for
+--duration seconds with --concurrency virtual users, logged in as the users created by
+generate_dataset.py. The report (<output>.json and <output>.md) lists throughput and latency
+percentiles per endpoint; pass an earlier report as --baseline to get the change per endpoint.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SEARCH_TERMS = ["Sourdough", "Rye", "Baguette", "Focaccia", "Walnuts", "Mehl", "Honey", "Spelt"]
+PERCENTILES = (50, 90, 95, 99)
+
+
+class HttpConnection:
+    """
+    Minimal HTTP/1.1 client connection, reconnecting when the server closed it.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, headers: dict = None, body: bytes = b""):
+        for attempt in (1, 2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await self._send(method, path, headers or {}, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # A kept-alive connection may have been closed in between, retry once on a new one
+                await self.close()
+                if attempt == 2:
+                    raise
+
+    async def _send(self, method, path, headers, body):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        if not status_line.strip():
+            raise ConnectionError("Connection closed")
+        status = int(status_line.split(b" ", 2)[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            content = bytearray()
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers up to the closing empty line
+                    while await self.reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                content += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+            content = bytes(content)
+        else:
+            content = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, content
+
+
+class Stats:
+    """
+    Latencies and errors per endpoint label. Requests started during the warm-up are ignored.
+    """
+
+    def __init__(self, record_from: float):
+        self.record_from = record_from
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+
+    def record(self, label: str, started: float, duration: float, status):
+        if started < self.record_from:
+            return
+        self.latencies.setdefault(label, []).append(duration)
+        statuses = self.statuses.setdefault(label, {})
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+
+class VirtualUser:
+    def __init__(self, host, port, token, username, password, recipe_ids, stats, rng):
+        self.connection = HttpConnection(host, port)
+        self.token = token
+        self.username = username
+        self.password = password
+        self.recipe_ids = recipe_ids
+        self.stats = stats
+        self.rng = rng
+
+    async def call(self, label, method, path, params=None, json_body=None, form=None, auth=True):
+        headers = {"Accept": "application/json"}
+        body = b""
+        if auth:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if json_body is not None:
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(json_body).encode()
+        elif form is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            body = urlencode(form).encode()
+        if params:
+            path = f"{path}?{urlencode(params)}"
+
+        started = time.perf_counter()
+        try:
+            status, content = await self.connection.request(method, path, headers, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.stats.record(label, started, time.perf_counter() - started, type(e).__name__)
+            return None
+        self.stats.record(label, started, time.perf_counter() - started, status)
+        return content if status < 400 else None
+
+    def recipe_id(self):
+        return self.rng.choice(self.recipe_ids)
+
+
+# Scenarios: one iteration of a user journey each
+
+async def discover(user: VirtualUser):
+    await user.call("GET /recipes (discover)", "GET", "/recipes",
+                    {"tab": "discover", "skip": 12 * user.rng.randint(0, 9), "limit": 12})
+
+
+async def search(user: VirtualUser):
+    await user.call("GET /recipes (search)", "GET", "/recipes", {"search": user.rng.choice(SEARCH_TERMS), "limit": 12})
+
+
+async def recipe_detail(user: VirtualUser):
+    await user.call("GET /recipes/{recipe_id}", "GET", f"/recipes/{user.recipe_id()}")
+
+
+async def plan(user: VirtualUser):
+    start = datetime(2025, 1, 1, 6) + timedelta(hours=user.rng.randint(0, 24 * 30))
+    await user.call("POST /recipes/{recipe_id}/plan", "POST", f"/recipes/{user.recipe_id()}/plan",
+                    {"start_time": start.isoformat()})
+
+
+async def favorite(user: VirtualUser):
+    await user.call("POST /recipes/{recipe_id}/favorite", "POST", f"/recipes/{user.recipe_id()}/favorite")
+
+
+async def rate(user: VirtualUser):
+    await user.call("POST /recipes/{recipe_id}/rate", "POST", f"/recipes/{user.recipe_id()}/rate",
+                    json_body={"score": user.rng.randint(1, 5)})
+
+
+async def login(user: VirtualUser):
+    await user.call("POST /token", "POST", "/token", form={"username": user.username, "password": user.password}, auth=False)
+
+
+SCENARIOS = {
+    "discover": discover,
+    "search": search,
+    "recipe_detail": recipe_detail,
+    "plan": plan,
+    "favorite": favorite,
+    "rate": rate,
+    "login": login,
+}
+
+
+async def _login(host, port, username, password):
+    connection = HttpConnection(host, port)
+    try:
+        status, content = await connection.request(
+            "POST", "/token",
+            {"Content-Type": "application/x-www-form-urlencoded"},
+            urlencode({"username": username, "password": password}).encode(),
+        )
+    finally:
+        await connection.close()
+    if status != 200:
+        raise RuntimeError(f"Login as {username} failed ({status}): {content[:200].decode(errors='replace')}")
+    return json.loads(content)["access_token"]
+
+
+async def _recipe_ids(host, port, token, count=200):
+    connection = HttpConnection(host, port)
+    ids = []
+    try:
+        while len(ids) < count:
+            status, content = await connection.request(
+                "GET", f"/recipes?{urlencode({'tab': 'discover', 'skip': len(ids), 'limit': 100})}",
+                {"Authorization": f"Bearer {token}"},
+            )
+            items = json.loads(content)["items"] if status == 200 else []
+            if not items:
+                break
+            ids += [item["id"] for item in items]
+    finally:
+        await connection.close()
+    if not ids:
+        raise RuntimeError("No recipes found, generate a dataset first (generate_dataset.py)")
+    return ids
+
+
+def _summarize(stats: Stats, seconds: float) -> dict:
+    endpoints = {}
+    for label, latencies in sorted(stats.latencies.items()):
+        ordered = sorted(latencies)
+        endpoints[label] = {
+            "requests": len(ordered),
+            "errors": stats.errors.get(label, 0),
+            "statuses": stats.statuses[label],
+            "throughput_rps": round(len(ordered) / seconds, 2),
+            "latency_ms": {
+                "mean": round(1000 * sum(ordered) / len(ordered), 2),
+                # Nearest-rank percentiles
+                **{f"p{p}": round(1000 * ordered[max(0, -(-p * len(ordered) // 100) - 1)], 2) for p in PERCENTILES},
+                "max": round(1000 * ordered[-1], 2),
+            },
+        }
+    return endpoints
+
+
+async def run_scenario(name, host, port, tokens, usernames, password, recipe_ids, concurrency, duration, warmup, seed):
+    scenario = SCENARIOS[name]
+    start = time.perf_counter()
+    stats = Stats(record_from=start + warmup)
+    deadline = start + warmup + duration
+
+    users = [
+        VirtualUser(host, port, tokens[i], usernames[i], password, recipe_ids, stats, random.Random(f"{seed}-{name}-{i}"))
+        for i in range(concurrency)
+    ]
+
+    async def worker(user):
+        try:
+            while time.perf_counter() < deadline:
+                await scenario(user)
+        finally:
+            await user.connection.close()
+
+    await asyncio.gather(*(worker(user) for user in users))
+    return _summarize(stats, max(time.perf_counter() - stats.record_from, 1e-9))
+
+
+async def run(args) -> dict:
+    url = urlsplit(args.base_url)
+    if url.scheme != "http":
+        raise RuntimeError("Only plain http:// base URLs are supported (run against a local server)")
+    host, port = url.hostname, url.port or 80
+
+    usernames = [f"{args.user_prefix}{i:06d}" for i in range(args.concurrency)]
+    # Sequentially: logins are deliberately slow (bcrypt) and would skew a cold server
+    tokens = [await _login(host, port, username, args.password) for username in usernames]
+    recipe_ids = await _recipe_ids(host, port, tokens[0])
+
+    report = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "base_url": args.base_url,
+            "commit": _git_commit(),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        print(f"Running {name} ({args.concurrency} users, {args.duration}s)...", flush=True)
+        report["scenarios"][name] = await run_scenario(
+            name, host, port, tokens, usernames, args.password, recipe_ids,
+            args.concurrency, args.duration, args.warmup, args.seed,
+        )
+    return report
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _change(current, previous, lower_is_better=False):
+    if not previous:
+        return "n/a"
+    percent = 100 * (current - previous) / previous
+    better = percent < 0 if lower_is_better else percent > 0
+    return f"{percent:+.1f}%" + (" ✓" if better and abs(percent) >= 5 else "")
+
+
+def render_markdown(report: dict, baseline: dict = None) -> str:
+    meta = report["meta"]
+    lines = [
+        "# Load test report",
+        "",
+        f"Commit `{meta['commit'] or 'unknown'}` against {meta['base_url']} at {meta['started_at']}: "
+        f"{meta['concurrency']} concurrent users, {meta['duration_s']}s per scenario after {meta['warmup_s']}s warm-up.",
+    ]
+    if baseline:
+        lines.append(f"Changes are relative to commit `{baseline['meta']['commit'] or 'unknown'}` ({baseline['meta']['started_at']}).")
+    lines.append("")
+
+    header = "| Scenario | Endpoint | Requests | Errors | Req/s | Mean ms | p50 ms | p90 ms | p95 ms | p99 ms | Max ms |"
+    if baseline:
+        header += " Δ Req/s | Δ p95 |"
+    lines += [header, "|" + "---|" * (header.count("|") - 1)]
+    for scenario, endpoints in report["scenarios"].items():
+        for label, result in endpoints.items():
+            latency = result["latency_ms"]
+            row = (
+                f"| {scenario} | `{label}` | {result['requests']} | {result['errors']} | {result['throughput_rps']} "
+                f"| {latency['mean']} | {latency['p50']} | {latency['p90']} | {latency['p95']} | {latency['p99']} | {latency['max']} |"
+            )
+            if baseline:
+                previous = baseline.get("scenarios", {}).get(scenario, {}).get(label)
+                row += (
+                    f" {_change(result['throughput_rps'], previous and previous['throughput_rps'])} "
+                    f"| {_change(latency['p95'], previous and previous['latency_ms']['p95'], lower_is_better=True)} |"
+                )
+            lines.append(row)
+    return "\n".join(lines) + "\n"
+
+
+class _Server:
+    """
+    Starts uvicorn on the port of the base URL and waits until it answers.
+    """
+
+    def __init__(self, port: int, workers: int):
+        self.port = port
+        self.workers = workers
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR,
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {self.process.returncode}")
+            try:
+                status, _ = asyncio.run(_get("127.0.0.1", self.port, "/system/version"))
+                if status == 200:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.25)
+        self.__exit__()
+        raise RuntimeError("uvicorn did not start within 60s")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+async def _get(host, port, path):
+    connection = HttpConnection(host, port)
+    try:
+        return await connection.request("GET", path)
+    finally:
+        await connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the core user journeys of the API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-server", action="store_true", help="Start uvicorn (main:app) on the base URL's port")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --start-server")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--user-prefix", default="loadtest", help="Users created by generate_dataset.py")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--output", default="loadtest-report", help="Writes <output>.json and <output>.md")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    try:
+        if args.start_server:
+            with _Server(urlsplit(args.base_url).port or 80, args.workers):
+                report = asyncio.run(run(args))
+        else:
+            report = asyncio.run(run(args))
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(f"{args.output}.json", "w") as f:
+        json.dump(report, f, indent=2)
+    markdown = render_markdown(report, baseline)
+    with open(f"{args.output}.md", "w") as f:
+        f.write(markdown)
+    print(markdown)
+
+
+if __name__ == "__main__":
+    main()
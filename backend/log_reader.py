@@ -0,0 +1,254 @@
+import os
+import re
+import json
+import datetime
+from typing import Iterator, List, Optional, Tuple
+from logger import LOG_FILE
+
+# Block size for reading the log backwards from EOF
+READ_BLOCK_SIZE = 64 * 1024
+# Upper bound of bytes scanned per request, so selective filters can't read the whole file at once;
+# the returned cursor continues where the scan stopped
+LOG_SCAN_MAX_BYTES = 8 * 1024 * 1024
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+# '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_RECORD_RE = re.compile(r"^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (?P<logger>\S+) - (?P<level>[A-Z]+) - (?P<message>.*)$")
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+# LOG_FORMAT=json writes one object per line, starting with the timestamp
+_JSON_RECORD_PREFIX = '{"timestamp": '
+
+
+def is_record_start(line: str) -> bool:
+    return line.startswith(_JSON_RECORD_PREFIX) or bool(_RECORD_RE.match(line))
+
+
+def _local_naive(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+class LogFilter:
+    def __init__(self, level: Optional[str] = None, contains: Optional[str] = None,
+                 since: Optional[datetime.datetime] = None, until: Optional[datetime.datetime] = None):
+        if level and level.upper() not in LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        self.min_level = LEVELS[level.upper()] if level else None
+        self.contains = contains.lower() if contains else None
+        # Log timestamps are naive local time
+        self.since = _local_naive(since)
+        self.until = _local_naive(until)
+
+    def matches(self, record: dict) -> bool:
+        if self.min_level is not None and LEVELS.get(record["level"], 0) < self.min_level:
+            return False
+        if self.since and record["time"] and record["time"] < self.since:
+            return False
+        if self.until and record["time"] and record["time"] > self.until:
+            return False
+        if self.contains and self.contains not in record["text"].lower():
+            return False
+        return True
+
+
+def parse_record(offset: int, lines: List[str]) -> dict:
+    """
+    Builds a record from its header line and continuation lines (e.g. a traceback).
+    """
+    text = "\n".join(lines)
+    if lines[0].startswith(_JSON_RECORD_PREFIX):
+        try:
+            entry = json.loads(lines[0])
+            return dict(entry, offset=offset, time=datetime.datetime.strptime(entry["timestamp"], _TIMESTAMP_FORMAT), text=text)
+        except (ValueError, KeyError):
+            pass
+    match = _RECORD_RE.match(lines[0])
+    if not match:
+        return {"offset": offset, "timestamp": None, "time": None, "logger": None, "level": None, "message": text, "text": text}
+    return {
+        "offset": offset,
+        "timestamp": match.group("timestamp"),
+        "time": datetime.datetime.strptime(match.group("timestamp"), _TIMESTAMP_FORMAT),
+        "logger": match.group("logger"),
+        "level": match.group("level"),
+        "message": "\n".join([match.group("message")] + lines[1:]),
+        "text": text,
+    }
+
+
+def public_record(record: dict) -> dict:
+    return {key: value for key, value in record.items() if key not in ("time", "inode")}
+
+
+def iter_lines_backwards(f, end: int) -> Iterator[Tuple[int, str]]:
+    """
+    Yields (byte offset, line) from `end` towards the start of the file, reading fixed-size
+    blocks, so the cost depends on the lines consumed rather than the file size.
+    """
+    position = end
+    remainder = b""
+    while position > 0:
+        read_size = min(READ_BLOCK_SIZE, position)
+        position -= read_size
+        f.seek(position)
+        block = f.read(read_size) + remainder
+        lines = block.split(b"\n")
+        # The first piece may be the tail of a line that starts in an earlier block
+        remainder = lines.pop(0)
+        line_end = position + len(block)
+        for line in reversed(lines):
+            line_end -= len(line) + 1
+            yield line_end + 1, line.decode("utf-8", "replace").rstrip("\r")
+    if remainder:
+        yield 0, remainder.decode("utf-8", "replace").rstrip("\r")
+
+
+def iter_records_backwards(f, end: int) -> Iterator[dict]:
+    """
+    Groups lines into records, newest first. Lines that don't start with a timestamp belong
+    to the record above them.
+    """
+    continuation = []
+    for offset, line in iter_lines_backwards(f, end):
+        if not line and not continuation:
+            continue
+        continuation.insert(0, line)
+        if is_record_start(line) or offset == 0:
+            yield parse_record(offset, continuation)
+            continuation = []
+
+
+def make_cursor(f, offset: int) -> str:
+    # The inode makes cursors from before a log rotation detectable
+    return f"{os.fstat(f.fileno()).st_ino}-{offset}"
+
+
+def parse_cursor(f, cursor: str) -> int:
+    try:
+        inode, offset = cursor.split("-", 1)
+        inode, offset = int(inode), int(offset)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if inode != os.fstat(f.fileno()).st_ino:
+        raise LookupError("Log file was rotated")
+    return offset
+
+
+def _tail_from_memory(f, limit: int, log_filter: LogFilter, size: int) -> Optional[dict]:
+    """
+    Serves the newest page from this process's ring buffer. Returns None if the buffer
+    can't fill the page or its records don't belong to the current log file. Other
+    processes (workers, the scheduler) append to the same file, so the buffered records
+    must also be exactly the file's last bytes: each record has to end where the next
+    one starts, the newest at EOF.
+    """
+    from logger import ring_buffer
+
+    inode = os.fstat(f.fileno()).st_ino
+    records = list(ring_buffer.records)
+    entries = []
+    end = size
+    for record in reversed(records):
+        if record["inode"] != inode or record["offset"] is None or record["offset"] + record["length"] != end:
+            return None
+        end = record["offset"]
+        if log_filter.since and record["time"] < log_filter.since:
+            break
+        if log_filter.matches(record):
+            entries.append(record)
+            if len(entries) >= limit:
+                break
+    else:
+        # Ran out of buffered records: only complete if the buffer starts at the file start
+        if not records or records[0]["offset"] != 0:
+            return None
+
+    if not entries:
+        return None
+    entries.reverse()
+    oldest = entries[0]["offset"]
+    return {
+        "entries": [public_record(record) for record in entries],
+        "cursor": make_cursor(f, oldest) if oldest else None,
+        "end_cursor": make_cursor(f, size),
+        "source": "memory",
+    }
+
+
+def tail(limit: int = 100, cursor: Optional[str] = None, log_filter: Optional[LogFilter] = None,
+         path: Optional[str] = None, source: str = "auto") -> dict:
+    """
+    Returns up to `limit` matching records ending at the cursor (or EOF), oldest first, and
+    the cursor for the next older page (None once the start of the file is reached).
+    With source="auto" the newest page comes from the in-memory ring buffer when it can
+    (only while this worker wrote the file's last records); source="file" always reads the file.
+    """
+    path = path or LOG_FILE
+    log_filter = log_filter or LogFilter()
+    if source not in ("auto", "file"):
+        raise ValueError(f"Unknown source: {source}")
+    if not os.path.exists(path):
+        return {"entries": [], "cursor": None, "end_cursor": None}
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if source == "auto" and cursor is None and path == LOG_FILE:
+            page = _tail_from_memory(f, limit, log_filter, size)
+            if page:
+                return page
+
+        end = min(parse_cursor(f, cursor), size) if cursor else size
+        entries = []
+        next_offset = None
+        for record in iter_records_backwards(f, end):
+            next_offset = record["offset"]
+            if log_filter.since and record["time"] and record["time"] < log_filter.since:
+                # Records are chronological, nothing older can match
+                next_offset = 0
+                break
+            if log_filter.matches(record):
+                entries.append(record)
+                if len(entries) >= limit:
+                    break
+            if end - record["offset"] >= LOG_SCAN_MAX_BYTES:
+                break
+        else:
+            next_offset = 0
+
+        entries.reverse()
+        return {
+            "entries": [public_record(record) for record in entries],
+            "cursor": make_cursor(f, next_offset) if next_offset else None,
+            "end_cursor": make_cursor(f, size),
+            "source": "file",
+        }
+
+
+def read_new_records(f, position: int) -> Tuple[List[dict], int]:
+    """
+    Reads complete records appended after `position`. A trailing partial line is left for
+    the next call. Returns (records, new position).
+    """
+    f.seek(position)
+    data = f.read()
+    complete = data.rfind(b"\n") + 1
+    if not complete:
+        return [], position
+
+    records = []
+    current = None
+    offset = position
+    for raw in data[:complete].split(b"\n")[:-1]:
+        line = raw.decode("utf-8", "replace").rstrip("\r")
+        if is_record_start(line) or current is None:
+            if current:
+                records.append(parse_record(*current))
+            current = (offset, [line])
+        else:
+            current[1].append(line)
+        offset += len(raw) + 1
+    if current:
+        records.append(parse_record(*current))
+    return records, position + complete
@@ -1,39 +1,318 @@
 import logging
 import os
+import re
 import sys
+import json
+import time
+import gzip
+import glob
+import queue
+import fcntl
+import atexit
+import shutil
+import datetime
+import collections
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 
 # Default to False (INFO), controlled by DB/Main
 DEBUG_MODE = False
 
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json" (one JSON object per line)
+
+# Rotation: by size and at fixed times (aligned to local midnight); rotated files are gzip-compressed
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # 0 disables size rotation
+LOG_ROTATE_HOURS = int(os.getenv("LOG_ROTATE_HOURS", "24"))  # 0 disables time rotation
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+
+# Log every finished request (method, path, status, duration) at INFO instead of DEBUG
+LOG_REQUESTS = os.getenv("LOG_REQUESTS", "false").lower() == "true"
+
+# Recent records kept in memory for the admin log viewer
+LOG_RING_BUFFER_SIZE = int(os.getenv("LOG_RING_BUFFER_SIZE", "5000"))
+# Records waiting for the writer thread; further records are dropped instead of blocking callers
+LOG_QUEUE_SIZE = 10000
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+CONTEXT_FIELDS = ("request_id", "user_id", "route", "duration_ms")
+
+# Per-request context (request id, user id, route), set by the request middleware
+_log_context = ContextVar("log_context", default=None)
+
+
+def bind_log_context(**fields):
+    """
+    Starts a new logging context for the current request. Returns a token for reset_log_context().
+    The context is a mutable dict, so values added later (e.g. the user id by the auth
+    dependency) are visible to every log call of the request.
+    """
+    return _log_context.set(dict(fields))
+
+
+def update_log_context(**fields):
+    context = _log_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+def reset_log_context(token):
+    _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copies the request context onto the record. Runs in the calling thread,
+    before the record is handed to the writer thread.
+    """
+
+    def filter(self, record):
+        context = _log_context.get()
+        if context:
+            for field in CONTEXT_FIELDS:
+                if getattr(record, field, None) is None and context.get(field) is not None:
+                    setattr(record, field, context[field])
+            scope = context.get("scope")
+            if scope is not None and getattr(record, "route", None) is None:
+                # Route template once the router has matched, the raw path before that
+                route = scope.get("route")
+                record.route = getattr(route, "path", None) or scope.get("path")
+        return True
+
+
+class RedactTokenFilter(logging.Filter):
+    """
+    Masks ?token= query parameters (backup download tokens) in uvicorn's access log lines.
+    """
+
+    _TOKEN_RE = re.compile(r"([?&]token=)[^&\s]*")
+
+    def filter(self, record):
+        if isinstance(record.args, tuple):
+            record.args = tuple(self._TOKEN_RE.sub(r"\1***", arg) if isinstance(arg, str) else arg for arg in record.args)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["message"] += "\n" + self.formatException(record.exc_info)
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, default=str)
+
+
+class RotatingCompressedFileHandler(logging.Handler):
+    """
+    Appends records to the log file and rotates it by size and at fixed times. Rotated files
+    are gzip-compressed as <name>.<timestamp>.gz and only the newest backup_count are kept.
+    Rotation is coordinated between worker processes with a lock file; a process that finds
+    the file already rotated by another one just reopens it.
+    """
+
+    def __init__(self, filename, max_bytes=0, rotate_hours=0, backup_count=0):
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.max_bytes = max_bytes
+        self.rotate_hours = rotate_hours
+        self.backup_count = backup_count
+        self.stream = None
+        self.inode = None
+        self.rollover_at = self._next_rollover(time.time())
+        # Position of the last written record, read by the ring buffer for log viewer cursors
+        self.last_record = None
+        self.last_offset = None
+        self.last_length = None
+
+    def _open(self):
+        # Unbuffered O_APPEND: every record is one write, even with several processes
+        self.stream = open(self.baseFilename, "ab", buffering=0)
+        self.inode = os.fstat(self.stream.fileno()).st_ino
+
+    def _close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def _next_rollover(self, now):
+        if not self.rotate_hours:
+            return None
+        period = self.rotate_hours * 3600
+        midnight = datetime.datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        return midnight + ((now - midnight) // period + 1) * period
+
+    def _reopen_if_moved(self) -> bool:
+        try:
+            moved = os.stat(self.baseFilename).st_ino != self.inode
+        except FileNotFoundError:
+            moved = True
+        if moved:
+            self._close()
+            self._open()
+        return moved
+
+    def _should_rollover(self, incoming: int) -> bool:
+        size = os.fstat(self.stream.fileno()).st_size
+        if self.rollover_at and time.time() >= self.rollover_at:
+            return True
+        return bool(self.max_bytes) and size > 0 and size + incoming > self.max_bytes
+
+    def do_rollover(self):
+        with open(f"{self.baseFilename}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Skip if another worker rotated in the meantime
+            if not self._reopen_if_moved() and os.fstat(self.stream.fileno()).st_size > 0:
+                # Sortable and unique even for several size rollovers per second
+                rotated = f"{self.baseFilename}.{datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+                os.rename(self.baseFilename, rotated)
+                self._close()
+                self._open()
+                self._compress(rotated)
+                self._prune()
+        self.rollover_at = self._next_rollover(time.time())
+
+    def _compress(self, path):
+        with open(path, "rb") as source, gzip.open(f"{path}.gz.tmp", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.replace(f"{path}.gz.tmp", f"{path}.gz")
+        os.remove(path)
+
+    def _prune(self):
+        if not self.backup_count:
+            return
+        rotated = sorted(glob.glob(f"{glob.escape(self.baseFilename)}.*.gz"))
+        for path in rotated[:-self.backup_count]:
+            os.remove(path)
+
+    def emit(self, record):
+        try:
+            data = (self.format(record) + "\n").encode("utf-8")
+            if self.stream is None:
+                self._open()
+            else:
+                # Another worker may have rotated the file
+                self._reopen_if_moved()
+            if self._should_rollover(len(data)):
+                self.do_rollover()
+            self.stream.write(data)
+            self.last_record = record
+            self.last_offset = os.lseek(self.stream.fileno(), 0, os.SEEK_CUR) - len(data)
+            self.last_length = len(data)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            self._close()
+        finally:
+            self.release()
+        super().close()
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the most recent records in memory (per process), in the same shape as the
+    records log_reader parses from the file, so the log viewer can skip the disk.
+    """
+
+    def __init__(self, capacity: int, file_handler: RotatingCompressedFileHandler = None):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+        self.file_handler = file_handler
+
+    def emit(self, record):
+        try:
+            text = self.format(record)
+            written = self.file_handler is not None and self.file_handler.last_record is record
+            entry = {
+                "offset": self.file_handler.last_offset if written else None,
+                "length": self.file_handler.last_length if written else None,
+                "inode": self.file_handler.inode if written else None,
+                "timestamp": self.formatter.formatTime(record) if self.formatter else None,
+                "time": datetime.datetime.fromtimestamp(record.created).replace(microsecond=int(record.msecs) * 1000),
+                "logger": record.name,
+                "level": record.levelname,
+                "message": record.getMessage(),
+                "text": text,
+            }
+            for field in CONTEXT_FIELDS:
+                value = getattr(record, field, None)
+                if value is not None:
+                    entry[field] = value
+            self.records.append(entry)
+        except Exception:
+            self.handleError(record)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread. When the queue is full the record is dropped
+    (and counted) rather than blocking the request.
+    """
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 # Configure Logger
 logger = logging.getLogger("bakencook")
 logger.setLevel(logging.INFO)
 
+# Create Formatter
+formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+
 # Create Console Handler
 handler = logging.StreamHandler(sys.stdout)
 handler.setLevel(logging.INFO)
-
-# Create Formatter
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 handler.setFormatter(formatter)
 
 # Create File Handler
-file_handler = logging.FileHandler("app.log")
+file_handler = RotatingCompressedFileHandler(LOG_FILE, LOG_MAX_BYTES, LOG_ROTATE_HOURS, LOG_BACKUP_COUNT)
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(formatter)
 
+# Create Ring Buffer (after the file handler, so it can record file positions)
+ring_buffer = RingBufferHandler(LOG_RING_BUFFER_SIZE, file_handler)
+ring_buffer.setLevel(logging.INFO)
+ring_buffer.setFormatter(formatter)
+
+# All output happens on the listener thread; callers only enqueue
+queue_handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+queue_handler.addFilter(ContextFilter())
+listener = QueueListener(queue_handler.queue, handler, file_handler, ring_buffer, respect_handler_level=True)
+
 # Add Handlers to Logger
 if not logger.handlers:
-    logger.addHandler(handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+
+logging.getLogger("uvicorn.access").addFilter(RedactTokenFilter())
+
 
 def get_logger(name: str = None):
     if name:
         return logger.getChild(name)
     return logger
 
+
 def set_log_level(debug_mode: bool):
     level = logging.DEBUG if debug_mode else logging.INFO
     logger.setLevel(level)
-    for h in logger.handlers:
+    for h in logger.handlers + list(listener.handlers):
         h.setLevel(level)
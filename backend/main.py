@@ -1,6 +1,5 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request, UploadFile, File, BackgroundTasks, Form
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response, UploadFile, File, BackgroundTasks, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import text, func, desc, or_, cast, String
@@ -8,8 +7,8 @@ from typing import List, Optional, Dict, Any
 import models
 import schemas
 from database import engine, get_db, SessionLocal
-from ai_parser import parse_recipe_from_text, parse_recipe_from_image
-from scraper import scrape_url
+from uploads import receive_upload, collect_garbage, UPLOAD_GC_INTERVAL_SECONDS
+from images import ingest_remote_image, upload_renditions, rendition_srcset, DEFAULT_RENDITION
 from datetime import datetime, timedelta
 from auth import get_password_hash, verify_password, create_access_token, get_current_user, get_current_active_user, has_permission, get_optional_current_user, get_user_for_automation
 import auth
@@ -21,6 +20,10 @@ import secrets
 from email_utils import send_mail, send_verification_email
 from email_templates import get_email_template
 from logger import logger
+import etags
+import serialization
+from fieldsets import RecipeFieldset
+from fastapi.datastructures import Default
 
 def get_gemini_api_key(db: Session) -> Optional[str]:
     setting = db.query(models.SystemSetting).filter(models.SystemSetting.key == "gemini_api_key").first()
@@ -34,55 +37,13 @@ def get_gemini_api_key(db: Session) -> Optional[str]:
         key = key[1:-1]
     return key
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
-
-# Migration: Add language column if missing
-try:
-    with engine.connect() as conn:
-        # Check if column exists (Postgres specific, but try/except works for simple add)
-        # For SQLite/Postgres, attempting to add it will fail if it exists.
-        # We wrap in try/except to ignore "duplicate column" error.
-        conn.execute(text("ALTER TABLE users ADD COLUMN language VARCHAR DEFAULT 'en'"))
-        conn.commit()
-except Exception as e:
-    # logger.info(f"Migration note: {e}")
-    pass
-
-# Seed Roles
-def seed_roles():
-    db = next(get_db())
-    roles = [
-        {"name": "Admin", "permissions": ["read:recipes", "write:recipes", "delete:recipes", "manage:users", "manage:roles", "manage:system", "manage:units", "manage:ingredients"]},
-        {"name": "Editor", "permissions": ["read:recipes", "write:recipes", "delete:recipes"]},
-        {"name": "User", "permissions": ["read:recipes", "write:recipes"]},
-        {"name": "Viewer", "permissions": ["read:recipes"]}
-    ]
-    for r in roles:
-        existing = db.query(models.Role).filter(models.Role.name == r["name"]).first()
-        if not existing:
-            new_role = models.Role(name=r["name"], permissions=r["permissions"])
-            db.add(new_role)
-        else:
-            # Update existing admin role to include new permissions if missing
-            if r["name"] == "Admin":
-                current_perms = set(existing.permissions)
-                new_perms = set(r["permissions"])
-                if not new_perms.issubset(current_perms):
-                    existing.permissions = list(current_perms.union(new_perms))
-                    db.add(existing)
-    db.commit()
-
-    db.commit()
+# Schema migrations and seeding run once in bootstrap.py, before the workers start
+from seed_data import seed_roles
 
-seed_roles()
 
-from seed_data import seed_data
-seed_data()
 
-
-
-app = FastAPI(title="Bake Assist API")
+# Default(): routes with a response_model keep FastAPI's direct pydantic-core serialization
+app = FastAPI(title="Bake Assist API", default_response_class=Default(serialization.FastJSONResponse))
 
 app.add_middleware(
     CORSMiddleware,
@@ -96,23 +57,35 @@ app.add_middleware(
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
 
-# Security Headers Middleware
-from starlette.middleware.base import BaseHTTPMiddleware
+# Pure ASGI middleware, innermost first: compression, security headers, Server-Timing, then
+# the request id and log context around all of them
+from middleware import CompressionMiddleware, SecurityHeadersMiddleware, TimingMiddleware, RequestLogContextMiddleware
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(TimingMiddleware)
+app.add_middleware(RequestLogContextMiddleware)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        return response
+# Per-request query count and DB time (Server-Timing header in debug mode), slow-query log
+from query_stats import QueryStatsMiddleware, instrument_queries
+app.add_middleware(QueryStatsMiddleware)
+instrument_queries(engine)
 
-app.add_middleware(SecurityHeadersMiddleware)
+# Prometheus metrics (added last, so it is outermost and the latency includes all other middleware)
+from metrics import MetricsMiddleware, instrument_engine, track_background_task, tracked_task
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
 
 # Ensure static directory exists
 os.makedirs("static/uploads", exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Serves precompressed .br/.gz siblings and caches content-hashed uploads as immutable
+from static_files import PrecompressedStaticFiles
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+
+@app.on_event("startup")
+def check_database_schema():
+    # Workers run no DDL: refuse to start until bootstrap.py has migrated the database
+    from bootstrap import check_schema_version
+    check_schema_version(engine)
 
 @app.on_event("startup")
 def startup_event():
@@ -135,17 +108,25 @@ def read_root():
     return {"message": "Backend is running!"}
 
 @app.post("/upload")
-async def upload_file(request: Request, file: UploadFile = File(...), current_user: models.User = Depends(get_current_user)):
-    file_extension = os.path.splitext(file.filename)[1]
-    file_name = f"{uuid.uuid4()}{file_extension}"
+async def upload_file(request: Request, current_user: models.User = Depends(get_current_user)):
+    # Streamed straight from the request body (multipart field "file"), size-limited and
+    # content-addressed: identical files are stored once
+    upload = await receive_upload(request)
+    file_name = upload.file_name
     file_path = f"static/uploads/{file_name}"
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
         
     # Return full URL
     base_url = str(request.base_url).rstrip("/")
-    return {"url": f"{base_url}/static/uploads/{file_name}"}
+    original_url = f"{base_url}/static/uploads/{file_name}"
+
+    # Images get resized renditions; "url" then points at the largest one
+    renditions = await upload_renditions(file_path, upload.key)
+    if not renditions:
+        return {"url": original_url, "original_url": original_url, "renditions": None, "srcset": None}
+
+    renditions = {name: f"{base_url}{url}" for name, url in renditions.items()}
+    url = renditions[DEFAULT_RENDITION]
+    return {"url": url, "original_url": original_url, "renditions": renditions, "srcset": rendition_srcset(url)}
 
 # --- System Initialization ---
 
@@ -289,9 +270,12 @@ def get_system_version():
     return {"version": VERSION}
 
 @app.get("/system/changelog")
-def get_system_changelog():
+def get_system_changelog(request: Request, response: Response):
     root_dir = os.getenv("PROJECT_ROOT", os.path.dirname(os.path.dirname(__file__)))
     changelog_path = os.path.join(root_dir, 'CHANGELOG.md')
+    cached = etags.not_modified(request, response, etags.file_etag(changelog_path), etags.PUBLIC_HOUR)
+    if cached:
+        return cached
     if os.path.exists(changelog_path):
         with open(changelog_path, 'r') as f:
             content = f.read()
@@ -803,62 +787,176 @@ def delete_my_account(
 
 @app.get("/admin/system/backup")
 def download_backup(
-    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(has_permission("manage:system"))
 ):
-    from backup import create_backup
-    from fastapi.responses import FileResponse
+    from backup import stream_backup, backup_filename, check_backup_tools
+    from fastapi.responses import StreamingResponse
     
     try:
-        zip_path = create_backup()
-        filename = os.path.basename(zip_path)
-        
-        # Schedule cleanup after response
-        def cleanup(path):
-            try:
-                os.remove(path)
-            except:
-                pass
-                
-        background_tasks.add_task(cleanup, zip_path)
-        
-        return FileResponse(
-            path=zip_path, 
-            filename=filename, 
-            media_type='application/zip'
-        )
+        # Fail before streaming starts if the dump tools are missing
+        check_backup_tools()
     except Exception as e:
         logger.error(f"Backup failed: {e}")
         raise HTTPException(status_code=500, detail=f"Backup failed: {str(e)}")
 
-@app.post("/admin/system/restore")
+    # Archive is generated while it is sent: no staging copies, first byte immediately
+    filename = backup_filename()
+    return StreamingResponse(
+        stream_backup(),
+        media_type='application/zip',
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.post("/admin/system/backup/jobs", status_code=202)
+def start_backup_job(
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(has_permission("manage:system"))
+):
+    from backup_jobs import acquire_job_lock, create_job, run_backup_job
+
+    try:
+        lock_file = acquire_job_lock()
+    except BlockingIOError:
+        raise HTTPException(status_code=409, detail="Another backup or restore job is running")
+    job = create_job("backup")
+    background_tasks.add_task(run_backup_job, job["id"], lock_file)
+    return job
+
+@app.get("/admin/system/backup/jobs")
+def list_backup_jobs(current_user: models.User = Depends(has_permission("manage:system"))):
+    from backup_jobs import list_jobs
+    return list_jobs()
+
+@app.get("/admin/system/backup/jobs/{job_id}")
+def get_backup_job(job_id: str, current_user: models.User = Depends(has_permission("manage:system"))):
+    from backup_jobs import get_job
+
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/admin/system/backup/jobs/{job_id}/download")
+def download_backup_job(job_id: str, token: Optional[str] = None, x_download_token: Optional[str] = Header(None)):
+    """
+    Serves a finished backup archive with Range support, so interrupted downloads can resume.
+    Authorized by the job's download token, preferably sent as X-Download-Token. Plain links
+    (the browser downloading it directly) pass it as ?token=, which is masked in access logs.
+    """
+    from backup_jobs import get_job, archive_path
+    from fastapi.responses import FileResponse
+
+    provided = x_download_token or token
+    job = get_job(job_id)
+    if (
+        not job or not job.get("download_token") or not provided
+        or not secrets.compare_digest(provided.encode(), job["download_token"].encode())
+    ):
+        raise HTTPException(status_code=404, detail="Backup not found")
+    path = archive_path(job)
+    if not path:
+        raise HTTPException(status_code=404, detail="Backup archive has expired")
+    return FileResponse(path, media_type="application/zip", filename=job["file"])
+
+# --- Scheduled Backups (local repository) ---
+
+def snapshot_summary(manifest: dict) -> dict:
+    return {
+        "id": manifest["id"],
+        "created_at": manifest["created_at"],
+        "database_size": manifest["database"]["size"] if manifest.get("database") else 0,
+        "upload_count": len(manifest["uploads"]),
+        "upload_size": sum(u["size"] for u in manifest["uploads"]),
+        "new_bytes": manifest.get("stats", {}).get("new_bytes", 0),
+    }
+
+@app.get("/admin/system/snapshots")
+def read_snapshots(current_user: models.User = Depends(has_permission("manage:system"))):
+    from backup_repository import list_snapshots
+    return [snapshot_summary(m) for m in list_snapshots()]
+
+@app.post("/admin/system/snapshots")
+def trigger_snapshot(
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(has_permission("manage:system"))
+):
+    from backup_repository import create_snapshot
+
+    def run_snapshot():
+        try:
+            create_snapshot()
+        except BlockingIOError:
+            logger.warning("Snapshot skipped: another backup is running")
+        except Exception as e:
+            logger.error(f"Snapshot failed: {e}")
+
+    background_tasks.add_task(run_snapshot)
+    return {"message": "Snapshot started"}
+
+@app.get("/admin/system/snapshots/verify")
+def verify_snapshots(current_user: models.User = Depends(has_permission("manage:system"))):
+    from backup_repository import verify_repository
+    results = verify_repository()
+    return {
+        "ok": all(not problems for problems in results.values()),
+        "snapshots": results
+    }
+
+@app.get("/admin/system/snapshots/{snapshot_id}/download")
+def download_snapshot(snapshot_id: str, current_user: models.User = Depends(has_permission("manage:system"))):
+    from backup_repository import open_snapshot_archive
+    from fastapi.responses import StreamingResponse
+
+    try:
+        archive = open_snapshot_archive(snapshot_id)
+    except BlockingIOError:
+        raise HTTPException(status_code=409, detail="Another backup or restore job is running")
+    if archive is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return StreamingResponse(
+        archive,
+        media_type='application/zip',
+        headers={"Content-Disposition": f'attachment; filename="snapshot_{snapshot_id}.zip"'}
+    )
+
+@app.post("/admin/system/restore", status_code=202)
 async def upload_restore(
-    file: UploadFile = File(...),
+    request: Request,
+    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(has_permission("manage:system"))
 ):
-    from backup import restore_backup
-    
-    if not file.filename.endswith('.zip'):
-        raise HTTPException(status_code=400, detail="Only .zip files are allowed")
-        
-    # Save uploaded file temporarily
-    temp_zip_path = f"temp_restore_{uuid.uuid4()}.zip"
+    from backup_jobs import acquire_job_lock, release_job_lock, create_job, update_job, restore_upload_path, run_restore_job
+    from uploads import iter_file_field
+
     try:
-        with open(temp_zip_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Perform restore
-        restore_backup(temp_zip_path)
-        
-        return {"message": "System restored successfully"}
-        
-    except Exception as e:
-        logger.error(f"Restore failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Restore failed: {str(e)}")
-    finally:
-        if os.path.exists(temp_zip_path):
-            os.remove(temp_zip_path)
-    
+        lock_file = acquire_job_lock()
+    except BlockingIOError:
+        raise HTTPException(status_code=409, detail="Another backup or restore job is running")
+
+    # The archive is streamed to disk once; extraction and verification run in the job
+    job = create_job("restore", message="Uploading archive")
+    zip_path = restore_upload_path(job["id"])
+    loop = asyncio.get_event_loop()
+    info = {}
+    try:
+        buffer = await loop.run_in_executor(None, open, zip_path, "wb")
+        try:
+            async for data in iter_file_field(request, "file", info):
+                if not info.get("filename", "").endswith(".zip"):
+                    raise HTTPException(status_code=400, detail="Only .zip files are allowed")
+                await loop.run_in_executor(None, buffer.write, data)
+        finally:
+            buffer.close()
+    except BaseException as e:
+        update_job(job["id"], status="failed", error=getattr(e, "detail", None) or str(e) or "Upload aborted")
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        release_job_lock(lock_file)
+        raise
+
+    background_tasks.add_task(run_restore_job, job["id"], zip_path, lock_file)
+    return update_job(job["id"], message="Archive received", size=os.path.getsize(zip_path))
+
     # Raw key (shown ONCE to user)
     raw_key = secrets.token_urlsafe(32)
     
@@ -886,7 +984,10 @@ def export_my_data(
     current_user: models.User = Depends(get_current_user)
 ):
     # Export user data, recipes, etc.
-    recipes = db.query(models.Recipe).filter(models.Recipe.user_id == current_user.id).all()
+    recipes = db.query(models.Recipe).options(
+        selectinload(models.Recipe.chapters).selectinload(models.Chapter.ingredients),
+        selectinload(models.Recipe.chapters).selectinload(models.Chapter.steps)
+    ).filter(models.Recipe.user_id == current_user.id).all()
     
     export_data = {
         "username": current_user.username,
@@ -895,18 +996,21 @@ def export_my_data(
     }
     
     for r in recipes:
+        # Ingredients and steps belong to the recipe's chapters
+        chapters = sorted(r.chapters, key=lambda c: c.order_index or 0)
         recipe_dict = {
             "title": r.title,
             "ingredients": [
-                {"name": i.name, "amount": i.amount, "unit": i.unit} for i in r.ingredients
+                {"name": i.name, "amount": i.amount, "unit": i.unit} for c in chapters for i in c.ingredients
             ],
             "steps": [
-                {"description": s.description, "duration": s.duration_min} for s in r.steps
+                {"description": s.description, "duration": s.duration_min}
+                for c in chapters for s in sorted(c.steps, key=lambda s: s.order_index or 0)
             ]
         }
         export_data["recipes"].append(recipe_dict)
         
-    return export_data
+    return serialization.FastJSONResponse(export_data)
 
 # --- Admin Routes ---
 from auth import has_permission
@@ -918,7 +1022,7 @@ def read_all_users(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(has_permission("manage:users"))
 ):
-    users = db.query(models.User).offset(skip).limit(limit).all()
+    users = db.query(models.User).options(joinedload(models.User.role_rel)).offset(skip).limit(limit).all()
     return users
 
 @app.delete("/admin/users/{user_id}")
@@ -1017,11 +1121,16 @@ def update_user_admin(
 @app.get("/admin/roles", response_model=List[schemas.Role])
 def read_roles(db: Session = Depends(get_db), current_user: models.User = Depends(has_permission("manage:roles"))):
     roles = db.query(models.Role).all()
-    # Manually populate user_count since it's not a column but a computed property we want
-    # Or we can use a join/group_by query for efficiency, but for now simple loop is fine for small number of roles
+    # user_count is not a column: count the users of all roles in one grouped query
+    user_counts = dict(
+        db.query(models.User.role_id, func.count(models.User.id))
+        .filter(models.User.role_id.isnot(None))
+        .group_by(models.User.role_id)
+        .all()
+    )
     result = []
     for role in roles:
-        count = db.query(models.User).filter(models.User.role_id == role.id).count()
+        count = user_counts.get(role.id, 0)
         # We need to convert the SQLAlchemy model to a dict or object that matches the schema
         # Pydantic's orm_mode will handle the model attributes, but user_count needs to be added
         role_dict = {
@@ -1128,8 +1237,12 @@ def toggle_user_status(
 # --- Admin: Units ---
 
 @app.get("/admin/units", response_model=List[schemas.Unit])
-def read_units(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return db.query(models.Unit).all()
+def read_units(request: Request, response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    etag = etags.table_etag(db, "units")
+    cached = etags.not_modified(request, response, etag, etags.PRIVATE_REVALIDATE)
+    if cached:
+        return cached
+    return serialization.catalog_response(serialization.UNITS, etag, lambda: db.query(models.Unit).all(), response)
 
 @app.post("/admin/units", response_model=schemas.Unit)
 def create_unit(unit: schemas.UnitCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
@@ -1201,11 +1314,15 @@ def delete_unit(unit_id: int, db: Session = Depends(get_db), current_user: model
 
 # --- Automation / Import API ---
 
+@tracked_task("import_job")
 async def process_import_job(job_id: str, url: str, user_id: str, db: Session):
     job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
     if not job:
         return
 
+    from scraper import scrape_url
+    from ai_parser import parse_recipe_from_text
+
     try:
         job.status = models.ImportJobStatus.processing
         db.commit()
@@ -1222,6 +1339,9 @@ async def process_import_job(job_id: str, url: str, user_id: str, db: Session):
              raise Exception("Gemini API Key not configured")
              
         recipe_data = await parse_recipe_from_text(scraped_text, source_url=url, api_key=gemini_key, language="de")
+
+        # Store the remote image locally instead of hotlinking it
+        recipe_data["image_url"] = await ingest_remote_image(recipe_data.get("image_url"))
         
         # 3. Create Recipe
         # Map schema to model
@@ -1331,20 +1451,28 @@ def get_import_job_status(
 
 @app.get("/admin/units/export", response_model=List[schemas.Unit])
 def export_units(db: Session = Depends(get_db), current_user: models.User = Depends(has_permission("manage:units"))):
-    return db.query(models.Unit).all()
+    return serialization.model_response(serialization.UNITS, db.query(models.Unit).all())
 
 @app.get("/admin/ingredients/export", response_model=List[schemas.IngredientItem])
 def export_ingredients(db: Session = Depends(get_db), current_user: models.User = Depends(has_permission("manage:ingredients"))):
-    return db.query(models.IngredientItem).all()
+    ingredients = db.query(models.IngredientItem).options(joinedload(models.IngredientItem.default_unit)).all()
+    return serialization.model_response(serialization.INGREDIENT_ITEMS, ingredients)
 
 
 
 # --- Admin: Ingredients ---
-from ai_parser import translate_ingredient
 
 @app.get("/admin/ingredients", response_model=List[schemas.IngredientItem])
-def read_ingredients(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return db.query(models.IngredientItem).all()
+def read_ingredients(request: Request, response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    etag = etags.table_etag(db, "ingredient_items")
+    cached = etags.not_modified(request, response, etag, etags.PRIVATE_REVALIDATE)
+    if cached:
+        return cached
+    return serialization.catalog_response(
+        serialization.INGREDIENT_ITEMS, etag,
+        lambda: db.query(models.IngredientItem).options(joinedload(models.IngredientItem.default_unit)).all(),
+        response
+    )
 
 @app.post("/admin/ingredients", response_model=schemas.IngredientItem)
 async def create_ingredient(
@@ -1376,6 +1504,7 @@ async def create_ingredient(
         # Fetch API Key
         api_key = get_gemini_api_key(db)
         
+        from ai_parser import translate_ingredient
         translated = await translate_ingredient(source_name, api_key=api_key)
         name_dict = translated
     
@@ -1636,19 +1765,102 @@ async def periodic_cleanup():
             await asyncio.sleep(3600)
             # Create a new session for the background task
             db = next(get_db())
-            perform_session_cleanup(db)
+            with track_background_task("session_cleanup"):
+                perform_session_cleanup(db)
         except Exception as e:
             print(f"Cleanup error: {e}")
             await asyncio.sleep(60)
 
+async def periodic_upload_gc():
+    while True:
+        try:
+            await asyncio.sleep(UPLOAD_GC_INTERVAL_SECONDS)
+            db = next(get_db())
+            try:
+                with track_background_task("upload_gc"):
+                    await asyncio.get_event_loop().run_in_executor(None, collect_garbage, db)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"Upload GC error: {e}")
+            await asyncio.sleep(60)
+
+@app.delete("/admin/system/uploads/cleanup")
+def cleanup_uploads(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(has_permission("manage:system"))
+):
+    stats = collect_garbage(db)
+    return {"message": f"Removed {stats['deleted']} unused files", **stats}
+
+async def periodic_backup():
+    from backup_repository import run_scheduled_snapshot
+    from backup_jobs import cleanup_jobs
+    while True:
+        try:
+            # Check hourly; a snapshot is only taken when BACKUP_INTERVAL_HOURS have passed
+            await asyncio.sleep(3600)
+            with track_background_task("scheduled_backup"):
+                await asyncio.get_event_loop().run_in_executor(None, run_scheduled_snapshot)
+                await asyncio.get_event_loop().run_in_executor(None, cleanup_jobs)
+        except Exception as e:
+            print(f"Scheduled backup error: {e}")
+            await asyncio.sleep(60)
+
 @app.on_event("startup")
 async def startup_event():
     asyncio.create_task(periodic_cleanup())
+    asyncio.create_task(periodic_upload_gc())
+    asyncio.create_task(periodic_backup())
+    from health import heartbeat_loop
+    asyncio.create_task(heartbeat_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from scraper import shutdown_browser_pool
+    from metrics import mark_process_dead
+    await shutdown_browser_pool()
+    mark_process_dead()
+
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    """
+    Liveness: answers as long as the worker serves requests, without any I/O.
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """
+    Readiness with a breakdown per check (database, scraper, AI key, background worker),
+    cached for HEALTH_CACHE_SECONDS. 503 when a critical check (the database) fails.
+    """
+    from health import readiness
+    from fastapi.responses import JSONResponse
+
+    result = await readiness()
+    return JSONResponse(result, status_code=200 if result["ready"] else 503)
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics(request: Request):
+    """
+    Prometheus text format. Requires `Authorization: Bearer <METRICS_TOKEN>` if METRICS_TOKEN is set.
+    """
+    from metrics import render_metrics, METRICS_TOKEN
+    from fastapi.responses import Response
+
+    if METRICS_TOKEN and not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 # --- System Settings ---
 
 @app.get("/settings/public", response_model=Dict[str, str])
-def read_public_settings(db: Session = Depends(get_db)):
+def read_public_settings(request: Request, response: Response, db: Session = Depends(get_db)):
+    cached = etags.not_modified(request, response, etags.table_etag(db, "system_settings"), etags.PUBLIC_REVALIDATE)
+    if cached:
+        return cached
     # Allow public access to specific settings needed for branding
     public_keys = ["app_name", "favicon_url", "allow_guest_access", "enable_registration"]
     settings = db.query(models.SystemSetting).filter(models.SystemSetting.key.in_(public_keys)).all()
@@ -1735,132 +1947,104 @@ def update_system_settings(
 @app.get("/admin/logs")
 def get_system_logs(
     lines: int = 100,
+    cursor: Optional[str] = None,
+    level: Optional[str] = None,
+    q: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    source: str = "auto",
     current_user: models.User = Depends(has_permission("manage:system"))
 ):
-    log_file = "app.log"
-    if not os.path.exists(log_file):
-        return {"logs": []}
-        
+    """
+    Last `lines` log records (oldest first), read backwards from the end of the file.
+    Pass the returned `cursor` to page further back. The newest page is served from this
+    worker's in-memory buffer when it holds the file's last records; source=file forces
+    reading the file.
+    """
+    from log_reader import tail, LogFilter
+
     try:
-        with open(log_file, "r") as f:
-            # Read all lines and return the last 'lines' count
-            all_lines = f.readlines()
-            return {"logs": all_lines[-lines:]}
-    except Exception as e:
+        page = tail(max(1, min(lines, 1000)), cursor, LogFilter(level, q, since, until), source=source)
+    except LookupError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"Failed to read logs: {e}")
+    page["logs"] = [entry["text"] for entry in page["entries"]]
+    return serialization.FastJSONResponse(page)
+
+@app.get("/admin/logs/stream")
+async def stream_system_logs(
+    request: Request,
+    level: Optional[str] = None,
+    q: Optional[str] = None,
+    current_user: models.User = Depends(has_permission("manage:system"))
+):
+    """
+    Server-Sent Events stream of new log records, one `log` event per record.
+    """
+    from log_reader import LogFilter, read_new_records, public_record
+    from logger import LOG_FILE
+    from fastapi.responses import StreamingResponse
+    import json
+
+    try:
+        log_filter = LogFilter(level, q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        loop = asyncio.get_event_loop()
+        f = None
+        position = 0
+        idle = 0
+        # Only records written after connecting are sent; a newly created file is read from the start
+        start_at_end = os.path.exists(LOG_FILE)
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                if f is not None:
+                    # Reopen from the start when the file was rotated or truncated
+                    try:
+                        rotated = os.stat(LOG_FILE).st_ino != os.fstat(f.fileno()).st_ino
+                    except FileNotFoundError:
+                        rotated = True
+                    if rotated or os.fstat(f.fileno()).st_size < position:
+                        f.close()
+                        f = None
+                        position = 0
+                if f is None and os.path.exists(LOG_FILE):
+                    f = open(LOG_FILE, "rb")
+                    position = f.seek(0, os.SEEK_END) if start_at_end else 0
+                    start_at_end = False
+
+                records = []
+                if f is not None:
+                    records, position = await loop.run_in_executor(None, read_new_records, f, position)
+                for record in records:
+                    if log_filter.matches(record):
+                        yield f"event: log\ndata: {json.dumps(public_record(record))}\n\n"
+
+                idle = 0 if records else idle + 1
+                if idle and idle % 15 == 0:
+                    yield ": keepalive\n\n"
+                await asyncio.sleep(1)
+        finally:
+            if f is not None:
+                f.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.on_event("startup")
 def startup_event():
     # Run session cleanup on startup
     try:
         db = next(get_db())
-        
-        # --- Simple Migration Check ---
-        # Check for missing columns and add them if necessary
-        # This is a workaround for lack of Alembic
-        from sqlalchemy import text
-        
-        # 1. session_duration_minutes in users
-        try:
-            db.execute(text("SELECT session_duration_minutes FROM users LIMIT 1"))
-        except Exception:
-            print("Migrating: Adding session_duration_minutes to users table...")
-            db.rollback()
-            # Add column with default 60
-            # Note: Syntax depends on DB. Assuming PostgreSQL based on DATABASE_URL default, 
-            # but SQLite also supports ADD COLUMN.
-            try:
-                db.execute(text("ALTER TABLE users ADD COLUMN session_duration_minutes INTEGER DEFAULT 60"))
-                db.commit()
-            except Exception as e:
-                print(f"Migration failed: {e}")
-                db.rollback()
-
-        # 2. weight_per_piece in recipes
-        try:
-            db.execute(text("SELECT weight_per_piece FROM recipes LIMIT 1"))
-        except Exception:
-            print("Migrating: Adding weight_per_piece to recipes table...")
-            db.rollback()
-            try:
-                db.execute(text("ALTER TABLE recipes ADD COLUMN weight_per_piece INTEGER DEFAULT 0"))
-                db.commit()
-            except Exception as e:
-                print(f"Migration failed: {e}")
-                db.rollback()
-
-        # 3. reference_temperature in recipes
-        try:
-            db.execute(text("SELECT reference_temperature FROM recipes LIMIT 1"))
-        except Exception:
-            print("Migrating: Adding reference_temperature to recipes table...")
-            db.rollback()
-            try:
-                db.execute(text("ALTER TABLE recipes ADD COLUMN reference_temperature FLOAT DEFAULT 20.0"))
-                db.commit()
-            except Exception as e:
-                print(f"Migration failed: {e}")
-                db.rollback()
-
-        # 4. real_temperature in schedules
-        try:
-            db.execute(text("SELECT real_temperature FROM schedules LIMIT 1"))
-        except Exception:
-            print("Migrating: Adding real_temperature to schedules table...")
-            db.rollback()
-            try:
-                db.execute(text("ALTER TABLE schedules ADD COLUMN real_temperature FLOAT"))
-                db.commit()
-            except Exception as e:
-                print(f"Migration failed: {e}")
-                db.rollback()
-            print("Migrating: Adding weight_per_piece to recipes table...")
-            db.rollback()
-            try:
-                db.execute(text("ALTER TABLE recipes ADD COLUMN weight_per_piece INTEGER"))
-                db.commit()
-            except Exception as e:
-                print(f"Migration failed: {e}")
-                db.rollback()
-                
-        # 5. Fix amount type in ingredients (Integer -> Float)
-        try:
-            # This is primarily for Postgres. SQLite ignores this or fails safely.
-            # SQLite uses dynamic typing, so changing the model might be enough if we don't enforce strict types.
-            # But for Postgres we need to alter the column.
-            db.execute(text("ALTER TABLE ingredients ALTER COLUMN amount TYPE FLOAT"))
-            db.commit()
-            print("Migrated: ingredients.amount to FLOAT")
-        except Exception as e:
-            # Expected to fail on SQLite or if already float
-            print(f"Migration (amount -> float) skipped/failed (expected on SQLite): {e}")
-            print(f"Migration (amount -> float) skipped/failed (expected on SQLite): {e}")
-            db.rollback()
-
-        # 6. Add email and is_verified to users
-        try:
-            db.execute(text("SELECT email FROM users LIMIT 1"))
-        except Exception:
-            print("Migrating: Adding email and is_verified to users table...")
-            db.rollback()
-            try:
-                db.execute(text("ALTER TABLE users ADD COLUMN email VARCHAR"))
-                db.execute(text("ALTER TABLE users ADD COLUMN is_verified BOOLEAN DEFAULT FALSE"))
-                # Auto-verify existing users
-                db.execute(text("UPDATE users SET is_verified = TRUE"))
-                db.commit()
-            except Exception as e:
-                print(f"Migration failed: {e}")
-                db.rollback()
-
-        # 7. Create verification_tokens table (if not exists)
-        # SQLAlchemy create_all should handle this if we run it, but main.py runs it at top.
-        # However, if table didn't exist at start, it's created. If it's new model, we need to ensure it's created.
-        # models.Base.metadata.create_all(bind=engine) is called at top of file.
-        # So if we restart, it should be created.
-        
-        # --- End Migration Check ---
-
         deleted = perform_session_cleanup(db)
         print(f"Startup: Cleaned up {deleted} expired sessions")
     except Exception as e:
@@ -1869,6 +2053,13 @@ def startup_event():
 
 # --- Recipes ---
 
+def load_recipe_with_chapters(db: Session, recipe_id) -> models.Recipe:
+    # Chapters, ingredients and steps in three queries instead of one per chapter
+    return db.query(models.Recipe).options(
+        selectinload(models.Recipe.chapters).selectinload(models.Chapter.ingredients),
+        selectinload(models.Recipe.chapters).selectinload(models.Chapter.steps)
+    ).populate_existing().filter(models.Recipe.id == recipe_id).one()
+
 @app.post("/recipes/", response_model=schemas.Recipe)
 def create_recipe(
     recipe: schemas.RecipeCreate, 
@@ -1888,33 +2079,20 @@ def create_recipe(
         reference_temperature=recipe.reference_temperature,
         user_id=current_user.id
     )
-    db.add(db_recipe)
-    db.commit()
-    db.refresh(db_recipe)
 
-    # Create Chapters
+    # Create Chapters with their Ingredients and Steps; written in one flush (batched per table)
     for chapter in recipe.chapters:
         db_chapter = models.Chapter(
-            recipe_id=db_recipe.id,
             name=chapter.name,
-            order_index=chapter.order_index
+            order_index=chapter.order_index,
+            ingredients=[models.Ingredient(**ing.dict()) for ing in chapter.ingredients],
+            steps=[models.Step(**step.dict()) for step in chapter.steps]
         )
-        db.add(db_chapter)
-        db.commit()
-        db.refresh(db_chapter)
-
-        # Create Ingredients for Chapter
-        for ing in chapter.ingredients:
-            db_ing = models.Ingredient(**ing.dict(), chapter_id=db_chapter.id)
-            db.add(db_ing)
-        
-        # Create Steps for Chapter
-        for step in chapter.steps:
-            db_step = models.Step(**step.dict(), chapter_id=db_chapter.id)
-            db.add(db_step)
+        db_recipe.chapters.append(db_chapter)
 
+    db.add(db_recipe)
     db.commit()
-    db.refresh(db_recipe)
+    db_recipe = load_recipe_with_chapters(db, db_recipe.id)
     
     # Populate ingredient_overview for response
     all_ingredients = []
@@ -1947,14 +2125,23 @@ def read_recipes(
     tab: Optional[str] = "discover", # discover, my_recipes, search
     search: Optional[str] = None,
     sort_by: Optional[str] = "newest", # newest, oldest, rating, favorites
+    fields: Optional[str] = None, # e.g. id,title,reference_temperature, see fieldsets.py
+    include: Optional[str] = None, # e.g. chapters.steps
     db: Session = Depends(get_db),
     current_user: Optional[models.User] = Depends(get_optional_current_user)
 ):
-    query = db.query(models.Recipe).options(
-        joinedload(models.Recipe.ratings),
-        joinedload(models.Recipe.favorites),
-        joinedload(models.Recipe.owner)
-    )
+    try:
+        fieldset = RecipeFieldset(fields, include, detail=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if sort_by == "rating":
+        fieldset.also_load("average_rating")
+    elif sort_by == "favorites":
+        fieldset.also_load("is_favorited")
+
+    # Collections are loaded with one extra query each (not joined, which would multiply the
+    # rows the LIMIT applies to); only the ones the fieldset needs
+    query = db.query(models.Recipe).options(*fieldset.loader_options(selectinload))
 
     # Filter by tab
     if tab == "my_recipes":
@@ -2001,10 +2188,7 @@ def read_recipes(
 
     # Populate extra fields
     for r in recipes:
-        r.author = r.owner.username if r.owner else "Unknown"
-        r.rating_count = len(r.ratings)
-        r.average_rating = sum(rt.score for rt in r.ratings) / r.rating_count if r.rating_count > 0 else 0.0
-        r.is_favorited = any(f.user_id == current_user.id for f in r.favorites) if current_user else False
+        fieldset.populate(r, current_user)
 
     # In-memory sort for complex metrics
     if sort_by == "rating":
@@ -2012,26 +2196,35 @@ def read_recipes(
     elif sort_by == "favorites":
         recipes.sort(key=lambda x: len(x.favorites), reverse=True)
 
-    return {
+    return serialization.model_response(fieldset.adapter(page=True), {
         "items": recipes,
         "total": total,
         "page": (skip // limit) + 1 if limit > 0 else 1,
         "size": limit,
         "pages": (total + limit - 1) // limit if limit > 0 else 0
-    }
+    })
 
 @app.get("/recipes/{recipe_id}", response_model=schemas.Recipe)
 def read_recipe(
     recipe_id: str, 
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None, # e.g. id,title,reference_temperature, see fieldsets.py
+    include: Optional[str] = None, # e.g. chapters.steps
     db: Session = Depends(get_db),
     current_user: Optional[models.User] = Depends(get_optional_current_user)
 ):
+    try:
+        fieldset = RecipeFieldset(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    etag = etags.recipe_etag(db, recipe_id, current_user, fieldset.key)
+    if etag:
+        cached = etags.not_modified(request, response, etag, etags.PRIVATE_REVALIDATE)
+        if cached:
+            return cached
     recipe = db.query(models.Recipe).options(
-        joinedload(models.Recipe.ratings),
-        joinedload(models.Recipe.favorites),
-        joinedload(models.Recipe.owner),
-        joinedload(models.Recipe.chapters).joinedload(models.Chapter.ingredients),
-        joinedload(models.Recipe.chapters).joinedload(models.Chapter.steps)
+        *fieldset.loader_options(joinedload)
     ).filter(models.Recipe.id == recipe_id).first()
     if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
@@ -2039,33 +2232,31 @@ def read_recipe(
     # Allow any authenticated user to view any recipe
     
     # Populate ingredient_overview
-    all_ingredients = []
-    for chapter in recipe.chapters:
-        all_ingredients.extend(chapter.ingredients)
-        
-    aggregated = {}
-    for ing in all_ingredients:
-        # ing.name is a dict, so we need to make it hashable
-        name_key = tuple(sorted(ing.name.items())) if isinstance(ing.name, dict) else ing.name
-        # Group by name, unit, AND temperature
-        key = (name_key, ing.unit, ing.temperature)
-        
-        if key in aggregated:
-            aggregated[key].amount += ing.amount
-        else:
-            import copy
-            new_ing = copy.copy(ing)
-            aggregated[key] = new_ing
+    if "ingredient_overview" in fieldset.loaded:
+        all_ingredients = []
+        for chapter in recipe.chapters:
+            all_ingredients.extend(chapter.ingredients)
+        
+        aggregated = {}
+        for ing in all_ingredients:
+            # ing.name is a dict, so we need to make it hashable
+            name_key = tuple(sorted(ing.name.items())) if isinstance(ing.name, dict) else ing.name
+            # Group by name, unit, AND temperature
+            key = (name_key, ing.unit, ing.temperature)
+        
+            if key in aggregated:
+                aggregated[key].amount += ing.amount
+            else:
+                import copy
+                new_ing = copy.copy(ing)
+                aggregated[key] = new_ing
             
-    recipe.ingredient_overview = list(aggregated.values())
+        recipe.ingredient_overview = list(aggregated.values())
 
     # Populate extra fields
-    recipe.author = recipe.owner.username if recipe.owner else "Unknown"
-    recipe.rating_count = len(recipe.ratings)
-    recipe.average_rating = sum(rt.score for rt in recipe.ratings) / recipe.rating_count if recipe.rating_count > 0 else 0.0
-    recipe.is_favorited = any(f.user_id == current_user.id for f in recipe.favorites) if current_user else False
+    fieldset.populate(recipe, current_user)
 
-    return recipe
+    return serialization.model_response(fieldset.adapter(), recipe, response)
 
 @app.post("/recipes/{recipe_id}/plan")
 def plan_recipe(
@@ -2074,7 +2265,9 @@ def plan_recipe(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    recipe = db.query(models.Recipe).filter(models.Recipe.id == recipe_id).first()
+    recipe = db.query(models.Recipe).options(
+        selectinload(models.Recipe.chapters).selectinload(models.Chapter.steps)
+    ).filter(models.Recipe.id == recipe_id).first()
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -2176,6 +2369,8 @@ def update_recipe(
         db.query(models.Ingredient).filter(models.Ingredient.chapter_id.in_(existing_chapter_ids)).delete(synchronize_session=False)
         db.query(models.Step).filter(models.Step.chapter_id.in_(existing_chapter_ids)).delete(synchronize_session=False)
         db.query(models.Chapter).filter(models.Chapter.id.in_(existing_chapter_ids)).delete(synchronize_session=False)
+        # Bulk deletes bypass the flush, so the ETag version is bumped explicitly
+        models.mark_recipe_changed(db, recipe.id)
     
     # Create new chapters
     for chapter in recipe_update.chapters:
@@ -2196,8 +2391,7 @@ def update_recipe(
             db.add(db_step)
 
     db.commit()
-    db.refresh(recipe)
-    return recipe
+    return load_recipe_with_chapters(db, recipe.id)
 
 @app.delete("/recipes/{recipe_id}")
 def delete_recipe(
@@ -2300,6 +2494,7 @@ async def import_from_image(
         # Parse with AI
         api_key = get_gemini_api_key(db)
         
+        from ai_parser import parse_recipe_from_image
         try:
             recipe_data = await parse_recipe_from_image(temp_path, language=language, api_key=api_key)
         finally:
@@ -2321,6 +2516,9 @@ async def import_from_url(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
+    from scraper import scrape_url
+    from ai_parser import parse_recipe_from_text
+
     try:
         # 1. Scrape
         text_content = ""
@@ -2345,6 +2543,10 @@ async def import_from_url(
         api_key = get_gemini_api_key(db)
 
         recipe_data = await parse_recipe_from_text(text_content, source_url=request.url, language=request.language, api_key=api_key)
+
+        # Store the remote image locally instead of hotlinking it. If the preview is never
+        # saved, the upload GC removes the unreferenced renditions after its grace period.
+        recipe_data["image_url"] = await ingest_remote_image(recipe_data.get("image_url"))
         
         return recipe_data
     except HTTPException as he:
@@ -2385,7 +2587,9 @@ def calculate_schedule(
     # target_time format: ISO 8601
     from datetime import datetime
     
-    recipe = db.query(models.Recipe).filter(models.Recipe.id == recipe_id).first()
+    recipe = db.query(models.Recipe).options(
+        selectinload(models.Recipe.chapters).selectinload(models.Chapter.steps)
+    ).filter(models.Recipe.id == recipe_id).first()
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -2394,8 +2598,9 @@ def calculate_schedule(
     current_time = target_dt
     schedule_steps = []
     
-    # Reverse iterate steps
-    sorted_steps = sorted(recipe.steps, key=lambda x: x.order_index, reverse=True)
+    # Reverse iterate steps (chapter by chapter)
+    steps = [(c.order_index or 0, s.order_index or 0, s) for c in recipe.chapters for s in c.steps]
+    sorted_steps = [s for _, _, s in sorted(steps, key=lambda x: x[:2], reverse=True)]
     
     for step in sorted_steps:
         duration = timedelta(minutes=step.duration_min)
@@ -2487,10 +2692,11 @@ def read_schedules(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
+    # The response includes each recipe with its chapters, ingredients and steps
+    recipe_chapters = joinedload(models.Schedule.recipe).selectinload(models.Recipe.chapters)
     query = db.query(models.Schedule).options(
-        joinedload(models.Schedule.recipe)
-        .selectinload(models.Recipe.chapters)
-        .selectinload(models.Chapter.steps)
+        recipe_chapters.selectinload(models.Chapter.steps),
+        recipe_chapters.selectinload(models.Chapter.ingredients)
     ).filter(models.Schedule.user_id == current_user.id)
     
     if start_date:
@@ -2525,7 +2731,6 @@ def delete_schedule(
 
 # --- System / Version ---
 from version import APP_VERSION
-import requests
 
 @app.post("/admin/system/email/test")
 def test_email_config(
@@ -2599,43 +2804,29 @@ def test_email_config(
         raise HTTPException(status_code=400, detail=f"Failed to send test email: {str(e)}")
 
 @app.get("/admin/system/info", response_model=schemas.SystemInfo)
-def get_system_info(db: Session = Depends(get_db)):
-    # Check Database
-    db_status = "offline"
-    try:
-        db.execute(text("SELECT 1"))
-        db_status = "online"
-    except Exception:
-        pass
-
-    # Check Scraper (Basic check if module is importable and browser is installed)
-    scraper_status = "offline"
-    try:
-        from playwright.sync_api import sync_playwright
-        scraper_status = "online"
-        # Optional: specific check if browser is installed?
-    except ImportError:
-        pass
-
-    # Determine environment
-    is_docker = os.path.exists("/.dockerenv")
-
+async def get_system_info():
+    # Served from the cached readiness checks, the status page polls this
+    from health import readiness, IS_DOCKER
     from version import VERSION
-    
+
+    checks = (await readiness())["checks"]
     return {
         "version": VERSION,
-        "environment": "docker" if is_docker else "local",
+        "environment": "docker" if IS_DOCKER else "local",
         "services": {
             "frontend": "online", # If they can see this, it's online
             "backend": "online",
-            "database": db_status,
-            "scraper": scraper_status
+            "database": checks["database"]["status"],
+            "scraper": checks["scraper"]["status"]
         },
         "update_available": False # Default to false, client can trigger check
     }
 
 @app.get("/system/config", response_model=schemas.SystemConfig)
-def get_public_config(db: Session = Depends(get_db)):
+def get_public_config(request: Request, response: Response, db: Session = Depends(get_db)):
+    cached = etags.not_modified(request, response, etags.table_etag(db, "system_settings"), etags.PUBLIC_REVALIDATE)
+    if cached:
+        return cached
     # Fetch settings
     settings = db.query(models.SystemSetting).all()
     settings_dict = {s.key: s.value for s in settings}
@@ -0,0 +1,227 @@
+import os
+import time
+import asyncio
+import functools
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client import multiprocess
+
+# Multiple uvicorn workers: set PROMETHEUS_MULTIPROC_DIR to an empty directory (wiped before
+# the workers start). Every process then writes its samples to files there and /metrics
+# aggregates them, whichever worker answers.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Optional bearer token for /metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Label for requests that matched no route, so unknown paths don't create new series
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled",
+    ["method"], multiprocess_mode="livesum"
+)
+
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use", "Database connections checked out from the pool",
+    multiprocess_mode="livesum"
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured database pool size (summed over workers)",
+    multiprocess_mode="livesum"
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per request, by route template",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250)
+)
+
+AI_CALL_DURATION = Histogram(
+    "ai_call_duration_seconds", "Latency of AI (Gemini) calls",
+    ["operation", "outcome"],
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+)
+SCRAPE_DURATION = Histogram(
+    "scrape_duration_seconds", "Latency of fetching and rendering recipe pages",
+    ["method", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+)
+
+BACKGROUND_TASKS_RUNNING = Gauge(
+    "background_tasks_running", "Background tasks currently running",
+    ["task"], multiprocess_mode="livesum"
+)
+BACKGROUND_TASKS = Counter(
+    "background_tasks_total", "Finished background tasks",
+    ["task", "outcome"]
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, status and latency per route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            # Set by the router once a route matched
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUESTS.labels(method, route, str(status_code[0])).inc()
+            HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+            HTTP_REQUESTS_IN_PROGRESS.labels(method).dec()
+
+
+def instrument_engine(engine):
+    """
+    Tracks pool checkouts of the engine in db_pool_connections_in_use.
+    """
+    from sqlalchemy import event
+
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.set(size())
+
+    event.listen(engine, "checkout", lambda *args: DB_POOL_IN_USE.inc())
+    event.listen(engine, "checkin", lambda *args: DB_POOL_IN_USE.dec())
+
+
+@contextmanager
+def observe_ai_call(operation: str):
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        AI_CALL_DURATION.labels(operation, outcome).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_scrape(method: str):
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        SCRAPE_DURATION.labels(method, outcome).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_background_task(task: str):
+    BACKGROUND_TASKS_RUNNING.labels(task).inc()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        BACKGROUND_TASKS_RUNNING.labels(task).dec()
+        BACKGROUND_TASKS.labels(task, outcome).inc()
+
+
+def tracked_task(task: str):
+    """
+    Decorator counting a (sync or async) background function in background_tasks_running.
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track_background_task(task):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_background_task(task):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ImportQueueCollector:
+    """
+    Import job queue depth, read from the database at scrape time (shared by all workers).
+    """
+
+    def collect(self):
+        from sqlalchemy import func
+        from database import SessionLocal
+        from logger import logger
+        import models
+
+        family = GaugeMetricFamily("import_jobs_queue_depth", "Import jobs waiting or in progress", labels=["status"])
+        db = SessionLocal()
+        try:
+            counts = dict(
+                db.query(models.ImportJob.status, func.count(models.ImportJob.id))
+                .filter(models.ImportJob.status.in_([models.ImportJobStatus.pending, models.ImportJobStatus.processing]))
+                .group_by(models.ImportJob.status)
+                .all()
+            )
+        except Exception as e:
+            logger.warning(f"Metrics: could not count import jobs: {e}")
+            return
+        finally:
+            db.close()
+        for status in (models.ImportJobStatus.pending, models.ImportJobStatus.processing):
+            family.add_metric([status.value], counts.get(status, 0))
+        yield family
+
+
+def render_metrics():
+    """
+    Returns (body, content type) in the Prometheus text format.
+    """
+    registry = CollectorRegistry()
+    if MULTIPROC_DIR:
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_DefaultRegistryCollector(REGISTRY))
+    registry.register(ImportQueueCollector())
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class _DefaultRegistryCollector:
+    def __init__(self, registry):
+        self.registry = registry
+
+    def collect(self):
+        return self.registry.collect()
+
+
+def mark_process_dead():
+    """
+    Removes this worker's live gauges from the shared directory on shutdown.
+    """
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,258 @@
+"""
+Pure ASGI middleware (security headers, timing, request id and log context, compression).
+
+None of them wraps the response in a task and memory stream like Starlette's
+BaseHTTPMiddleware: they only look at the http.response.start / body messages on their way
+out, so streaming responses (backup downloads, the log stream) pass through chunk by chunk.
+"""
+import os
+import time
+import uuid
+import zlib
+import logging
+from logger import logger, bind_log_context, reset_log_context, LOG_REQUESTS
+
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+]
+
+# Responses smaller than this are sent uncompressed, compressing wouldn't gain anything
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+# Brotli quality for responses compressed on the fly (11 is for precompressed files only)
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Only text formats are compressed. Archives and images already are, and event streams must
+# reach the client unbuffered.
+COMPRESSIBLE_TYPES = (
+    "text/html", "text/plain", "text/css", "text/csv", "text/javascript", "text/markdown",
+    "application/json", "application/javascript", "application/xml", "image/svg+xml",
+    "application/manifest+json",
+)
+
+
+def _header(headers, name: bytes):
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def supported_encodings() -> tuple:
+    # Server preference: brotli (optional "brotli" package) compresses JSON better than gzip
+    return ("br", "gzip") if brotli_available() else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str, available=None):
+    """
+    Picks the content coding for an Accept-Encoding header value: the one with the highest
+    q-value among `available` (default: supported_encodings()), ties broken by that order.
+    Returns None if the client accepts none of them.
+    """
+    available = supported_encodings() if available is None else available
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+    best = None
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (coding, q)
+    return best[0] if best else None
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, more_body: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, more_body: bool) -> bytes:
+        data = self._compressor.process(data)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class SecurityHeadersMiddleware:
+    """
+    Adds SECURITY_HEADERS to every response that doesn't set them itself.
+    """
+
+    def __init__(self, app, headers=SECURITY_HEADERS):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                present = {key.lower() for key, _ in headers}
+                headers.extend(header for header in self.headers if header[0] not in present)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class TimingMiddleware:
+    """
+    Sends the time until the response started as a Server-Timing entry ("app;dur=<ms>").
+    Like the query timings, only in debug mode.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and logger.isEnabledFor(logging.DEBUG):
+                timing = f"app;dur={(time.perf_counter() - start) * 1000:.1f}"
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+class RequestLogContextMiddleware:
+    """
+    Binds request id, user id and route to every log record of the request, returns the id as
+    X-Request-ID (taken from the request if the proxy set one) and logs the request when done.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = (_header(scope["headers"], b"x-request-id") or b"").decode("latin-1")
+        request_id = incoming[:64] if incoming.isprintable() and incoming else uuid.uuid4().hex
+        token = bind_log_context(request_id=request_id, scope=scope)
+        start = time.perf_counter()
+        status_code = [500]
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            logger.log(
+                logging.INFO if LOG_REQUESTS else logging.DEBUG,
+                f"{scope['method']} {scope['path']} {status_code[0]} {duration_ms}ms",
+                extra={"duration_ms": duration_ms}
+            )
+            reset_log_context(token)
+
+
+class CompressionMiddleware:
+    """
+    Brotli or gzip, as negotiated with Accept-Encoding, for text responses of at least
+    `minimum_size` bytes. Streaming responses are compressed chunk by chunk (each chunk is
+    flushed), so they keep streaming; responses that already carry a Content-Encoding
+    (precompressed static files) are left alone.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, level: int = COMPRESSION_LEVEL,
+                 brotli_quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.encodings = supported_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept_encoding = (_header(scope["headers"], b"accept-encoding") or b"").decode("latin-1")
+        encoding = negotiate_encoding(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether compressing is worth it
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                response_start, start = start, None
+                headers = list(response_start.get("headers", []))
+                if not self._compressible(response_start["status"], headers) or (not more_body and len(body) < self.minimum_size):
+                    await send(response_start)
+                    return await send(message)
+
+                compressor = _BrotliCompressor(self.brotli_quality) if encoding == "br" else _GzipCompressor(self.level)
+                data = compressor.compress(body, more_body)
+                headers = [(key, value) for key, value in headers if key.lower() not in (b"content-length", b"vary", b"etag")]
+                vary = _header(response_start.get("headers", []), b"vary")
+                etag = _header(response_start.get("headers", []), b"etag")
+                if etag:
+                    # Compression isn't byte-for-byte reproducible, so a strong ETag becomes weak
+                    headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                if not more_body:
+                    headers.append((b"content-length", str(len(data)).encode("latin-1")))
+                await send({**response_start, "headers": headers})
+                return await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+            if compressor is None:
+                return await send(message)
+            await send({"type": "http.response.body", "body": compressor.compress(body, more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(status: int, headers) -> bool:
+        if status < 200 or status in (204, 206, 304) or _header(headers, b"content-encoding"):
+            return False
+        content_type = (_header(headers, b"content-type") or b"").decode("latin-1").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
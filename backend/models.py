@@ -1,5 +1,6 @@
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Enum, Table, JSON, Float, DateTime, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, Session
 from sqlalchemy.types import TypeDecorator, CHAR
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 import uuid
@@ -144,6 +145,8 @@ class Recipe(Base):
     weight_per_piece = Column(Integer, nullable=True) # Optional weight per piece in grams
     reference_temperature = Column(Float, default=20.0) # Reference temperature for fermentation
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped on every change to the recipe, its chapters, ingredients, steps, ratings or favorites (ETag)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     owner = relationship("User", back_populates="recipes")
     chapters = relationship("Chapter", back_populates="recipe", cascade="all, delete-orphan")
@@ -255,6 +258,12 @@ class SystemSetting(Base):
     key = Column(String, primary_key=True, index=True)
     value = Column(String, nullable=False)
 
+class TableVersion(Base):
+    # Change counter per catalog table (units, ingredient_items, system_settings) for ETags
+    __tablename__ = "table_versions"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+
 class VerificationToken(Base):
     __tablename__ = "verification_tokens"
     
@@ -264,3 +273,104 @@ class VerificationToken(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User")
+
+
+# --- Versions for ETags ---
+# Every flush records which recipes and catalog tables it wrote; their versions are bumped once
+# per transaction, just before the commit, so readers can build an ETag from one small query.
+# Bulk query().update()/delete() bypass this: callers mark the affected recipes with
+# mark_recipe_changed().
+
+# Catalog model -> table_versions entries it affects (the ingredient list embeds default units)
+CATALOG_VERSIONS = {
+    "Unit": ("units", "ingredient_items"),
+    "IngredientItem": ("ingredient_items",),
+    "SystemSetting": ("system_settings",),
+}
+
+
+def _changed_objects(session):
+    for obj in session.new:
+        yield obj
+    for obj in session.deleted:
+        yield obj
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            yield obj
+
+
+def _pending_bumps(session):
+    return session.info.setdefault("version_bumps", {"recipes": set(), "chapters": set(), "owners": set(), "tables": set()})
+
+
+def mark_recipe_changed(session, recipe_id):
+    """
+    Bumps the recipe's version on the next commit, for changes the flush doesn't see.
+    """
+    _pending_bumps(session)["recipes"].add(recipe_id)
+
+
+def _record_changes(session, flush_context):
+    from sqlalchemy import inspect
+
+    pending = _pending_bumps(session)
+    new_recipes = {obj.id for obj in session.new if isinstance(obj, Recipe)}
+    for obj in _changed_objects(session):
+        if isinstance(obj, Recipe):
+            # Rows inserted by this flush start at their first version
+            if obj.id not in new_recipes:
+                pending["recipes"].add(obj.id)
+        elif isinstance(obj, (Chapter, Rating, Favorite)):
+            if obj.recipe_id not in new_recipes:
+                pending["recipes"].add(obj.recipe_id)
+        elif isinstance(obj, (Ingredient, Step)):
+            pending["chapters"].add(obj.chapter_id)
+        elif isinstance(obj, User) and inspect(obj).attrs.username.history.deleted:
+            # The recipe detail shows the author's name
+            pending["owners"].add(obj.id)
+        pending["tables"].update(CATALOG_VERSIONS.get(type(obj).__name__, ()))
+
+
+def _bump_versions(session):
+    from sqlalchemy import select, update, or_
+
+    # Pending changes are flushed here, so their versions are part of this commit
+    session.flush()
+    pending = session.info.pop("version_bumps", None)
+    if not pending:
+        return
+    pending["recipes"].discard(None)
+    pending["chapters"].discard(None)
+
+    conn = session.connection()
+    recipes = Recipe.__table__
+    chapters = Chapter.__table__
+    conditions = []
+    if pending["recipes"]:
+        conditions.append(recipes.c.id.in_(pending["recipes"]))
+    if pending["chapters"]:
+        conditions.append(recipes.c.id.in_(select(chapters.c.recipe_id).where(chapters.c.id.in_(pending["chapters"]))))
+    if pending["owners"]:
+        conditions.append(recipes.c.user_id.in_(pending["owners"]))
+    if conditions:
+        conn.execute(update(recipes).where(or_(*conditions)).values(version=recipes.c.version + 1))
+
+    if pending["tables"]:
+        if conn.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        versions = TableVersion.__table__
+        statement = insert(versions).values([{"name": name, "version": 1} for name in sorted(pending["tables"])])
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=[versions.c.name], set_={"version": versions.c.version + 1}
+        ))
+
+
+def _discard_changes(session, *args):
+    session.info.pop("version_bumps", None)
+
+
+event.listen(Session, "after_flush", _record_changes)
+event.listen(Session, "before_commit", _bump_versions)
+event.listen(Session, "after_rollback", _discard_changes)
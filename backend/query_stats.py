@@ -0,0 +1,135 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from logger import logger
+from metrics import DB_QUERIES_PER_REQUEST, UNMATCHED_ROUTE
+
+# Statements slower than this are logged with their route (0 disables)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Longest statement text included in the slow-query log
+SLOW_QUERY_MAX_CHARS = 2000
+
+# Queries of the current request. Like the log context this holds a mutable object, so
+# queries in threadpool endpoints (which run in a copy of the context) are counted too.
+_query_stats = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def route(self):
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the connection: after_cursor_execute never
+    # runs for a statement that raises, and a per-connection stack would then go out of step
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+
+    duration_ms = duration * 1000
+    if SLOW_QUERY_MS and duration_ms >= SLOW_QUERY_MS:
+        route = stats.route if stats is not None else None
+        logger.warning(
+            f"Slow query ({duration_ms:.1f}ms) on {route or 'no request'}: "
+            f"{' '.join(statement.split())[:SLOW_QUERY_MAX_CHARS]}"
+        )
+
+
+def instrument_queries(engine):
+    """
+    Times every statement executed through the engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware counting the queries and DB time of each request. In debug mode the
+    totals are sent as a Server-Timing header (shown in the browser's network panel).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats(scope)
+        token = _query_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and logger.isEnabledFor(logging.DEBUG):
+                timing = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _query_stats.reset(token)
+            DB_QUERIES_PER_REQUEST.labels(stats.route if scope.get("route") else UNMATCHED_ROUTE).observe(stats.count)
+
+
+class QueryLog:
+    def __init__(self):
+        self.statements = []
+        self.rows = 0
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, max_rows: Optional[int] = None, engine=None):
+    """
+    Test helper: fails if the block executes more than `max_queries` statements on the engine,
+    or loads more than `max_rows` ORM objects. Listens on the engine and on all sessions, so it
+    also counts requests made through the TestClient (which runs the app in another thread).
+
+        with assert_max_queries(3, max_rows=20) as log:
+            client.get("/recipes")
+    """
+    if engine is None:
+        from database import engine
+    log = QueryLog()
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+
+    def record_row(session, instance):
+        log.rows += 1
+
+    event.listen(engine, "after_cursor_execute", record_statement)
+    event.listen(Session, "loaded_as_persistent", record_row)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "after_cursor_execute", record_statement)
+        event.remove(Session, "loaded_as_persistent", record_row)
+    if len(log.statements) > max_queries:
+        listing = "\n".join(f"{i + 1}. {' '.join(s.split())}" for i, s in enumerate(log.statements))
+        raise AssertionError(f"Expected at most {max_queries} queries, got {len(log.statements)}:\n{listing}")
+    if max_rows is not None and log.rows > max_rows:
+        raise AssertionError(f"Expected at most {max_rows} loaded rows, got {log.rows}")
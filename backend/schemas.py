@@ -1,8 +1,9 @@
-from pydantic import BaseModel, validator, EmailStr
+from pydantic import BaseModel, validator, EmailStr, computed_field
 from typing import List, Optional, Dict, Union, Any
 from uuid import UUID
 from datetime import datetime
 from models import RecipeType, IngredientType, StepType, RecipeCategory, ImportJobStatus
+from images import rendition_srcset
 import enum
 
 class Token(BaseModel):
@@ -217,6 +218,12 @@ class Recipe(RecipeBase):
     weight_per_piece: Optional[int] = None
     is_favorited: Optional[bool] = False # Context-dependent
 
+    @computed_field
+    @property
+    def image_srcset(self) -> Optional[str]:
+        # srcset for locally stored renditions, None for remote/legacy images
+        return rendition_srcset(self.image_url)
+
     class Config:
         from_attributes = True
 
@@ -1,61 +1,262 @@
-
 import re
-import requests
+import os
+import time
 import asyncio
+from metrics import observe_scrape
+
+# Headless browser (browserless/chromium) used for JavaScript-rendered pages
+PLAYWRIGHT_WS_ENDPOINT = os.getenv("PLAYWRIGHT_WS_ENDPOINT")
+RENDERER_POOL_SIZE = int(os.getenv("RENDERER_POOL_SIZE", "2"))
+RENDERER_PAGE_TIMEOUT_MS = int(os.getenv("RENDERER_PAGE_TIMEOUT_MS", "20000"))
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Resource types the renderer never needs to extract recipe text
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# Below this amount of visible text (without JSON-LD) a page is treated as an empty JS shell
+MIN_TEXT_LENGTH = 500
+
+
+def html_to_text(html: str) -> str:
+    """
+    Reduces an HTML document to plain text, keeping JSON-LD blocks and meta images
+    as appended sections for the AI parser.
+    """
+    # Extract JSON-LD before cleaning
+    json_ld_scripts = re.findall(r'<script type="application/ld\+json">(.*?)</script>', html, flags=re.DOTALL | re.IGNORECASE)
+
+    # Extract Meta Images
+    meta_images = re.findall(r'<meta property="og:image" content="(.*?)">', html, flags=re.IGNORECASE)
+    meta_images += re.findall(r'<meta name="twitter:image" content="(.*?)">', html, flags=re.IGNORECASE)
+
+    # Simple cleanup using regex
+    # 1. Remove scripts and styles
+    html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html, flags=re.DOTALL | re.IGNORECASE)
+
+    # 2. Remove comments
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
+
+    # 3. Remove HTML tags
+    text = re.sub(r'<[^>]+>', ' ', html)
+
+    # 4. Collapse whitespace
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    # Append JSON-LD data if found
+    if json_ld_scripts:
+        text += "\n\n--- JSON-LD DATA ---\n"
+        for script in json_ld_scripts:
+            text += script + "\n"
+
+    # Append Meta Images if found
+    if meta_images:
+        text += "\n\n--- META IMAGES ---\n"
+        for img in meta_images:
+            text += img + "\n"
+
+    return text
+
+
+def has_recipe_content(text: str) -> bool:
+    """
+    Heuristic check whether scraped text is worth sending to the AI parser:
+    either a JSON-LD Recipe object or a reasonable amount of visible text.
+    """
+    if not text:
+        return False
+
+    body, _, extras = text.partition("\n\n--- JSON-LD DATA ---\n")
+    if extras:
+        for block in extras.split("\n--- META IMAGES ---\n")[0].splitlines():
+            if re.search(r'"@type"\s*:\s*(\[[^\]]*)?"Recipe"', block):
+                return True
+
+    return len(body) >= MIN_TEXT_LENGTH
+
+
+class BrowserPool:
+    """
+    Pool of warm browser contexts on a remote Chromium (browserless) reached via
+    the Playwright WS endpoint. Contexts are created once and reused; each page
+    gets its own time budget and never loads images, fonts or media.
+    """
+
+    def __init__(self, ws_endpoint: str, size: int = RENDERER_POOL_SIZE, page_timeout_ms: int = RENDERER_PAGE_TIMEOUT_MS):
+        self.ws_endpoint = ws_endpoint
+        self.size = max(1, size)
+        self.page_timeout_ms = page_timeout_ms
+        self._playwright = None
+        self._browser = None
+        self._contexts = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure_browser(self):
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+
+            from playwright.async_api import async_playwright
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            self._browser = await self._playwright.chromium.connect_over_cdp(self.ws_endpoint)
+            self._contexts = asyncio.Queue()
+            for _ in range(self.size):
+                await self._contexts.put(await self._new_context())
+
+    async def _new_context(self):
+        context = await self._browser.new_context(user_agent=USER_AGENT)
+        await context.route("**/*", self._block_heavy_resources)
+        return context
+
+    @staticmethod
+    async def _block_heavy_resources(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _release(self, context, healthy: bool):
+        browser = self._browser
+        queue = self._contexts
+        current = browser is not None and context.browser is browser
+        if healthy and current:
+            await queue.put(context)
+            return
+
+        try:
+            await context.close()
+        except Exception:
+            pass
+        # Replace broken contexts so the pool keeps its size. Contexts of a browser that has
+        # since been replaced are dropped: the reconnect already refilled the pool.
+        if current and browser.is_connected():
+            try:
+                await queue.put(await self._new_context())
+            except Exception as e:
+                from logger import logger
+                logger.warning(f"Renderer: could not replace browser context: {e}")
+
+    async def render(self, url: str, timeout_ms: int = None) -> str:
+        """
+        Loads the URL in a pooled context and returns the rendered HTML.
+        """
+        budget_ms = timeout_ms or self.page_timeout_ms
+        deadline = time.monotonic() + budget_ms / 1000
+
+        await self._ensure_browser()
+        context = await asyncio.wait_for(self._contexts.get(), timeout=budget_ms / 1000)
+
+        healthy = True
+        page = None
+        try:
+            page = await context.new_page()
+            remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+            page.set_default_timeout(remaining_ms)
+            await page.goto(url, wait_until="domcontentloaded", timeout=remaining_ms)
+
+            # Give client-side rendering the rest of the budget to settle
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms > 0:
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=remaining_ms)
+                except Exception:
+                    pass
+
+            return await page.content()
+        except Exception:
+            healthy = context.browser is not None and context.browser.is_connected()
+            raise
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    healthy = False
+            await self._release(context, healthy)
+
+    async def close(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+_browser_pool = None
+
+
+def get_browser_pool():
+    """
+    Returns the shared renderer pool, or None if no WS endpoint is configured.
+    """
+    global _browser_pool
+    if _browser_pool is None and PLAYWRIGHT_WS_ENDPOINT:
+        _browser_pool = BrowserPool(PLAYWRIGHT_WS_ENDPOINT)
+    return _browser_pool
+
+
+async def shutdown_browser_pool():
+    global _browser_pool
+    if _browser_pool is not None:
+        await _browser_pool.close()
+        _browser_pool = None
+
+
+async def fetch_html(url: str) -> str:
+    # Use a standard user agent to avoid being blocked
+    headers = {
+        'User-Agent': USER_AGENT
+    }
+
+    import requests
+
+    # Run requests in a separate thread since it's blocking
+    loop = asyncio.get_event_loop()
+    response = await loop.run_in_executor(None, lambda: requests.get(url, headers=headers, timeout=30))
+    response.raise_for_status()
+    return response.text
+
+
+async def render_html(url: str) -> str:
+    pool = get_browser_pool()
+    if pool is None:
+        return ""
+    return await pool.render(url)
+
 
 async def scrape_url(url: str) -> str:
     """
     Scrapes the given URL using requests and regex to avoid Playwright instability.
+    Only if that yields no recipe content (e.g. JavaScript-rendered pages) the page
+    is rendered with the pooled headless browser.
     Returns the text content of the body.
     """
+    from logger import logger
+
+    text = ""
     try:
-        # Use a standard user agent to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Run requests in a separate thread since it's blocking
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: requests.get(url, headers=headers, timeout=30))
-        response.raise_for_status()
-        
-        html = response.text
-        
-        # Extract JSON-LD before cleaning
-        json_ld_scripts = re.findall(r'<script type="application/ld\+json">(.*?)</script>', html, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Extract Meta Images
-        meta_images = re.findall(r'<meta property="og:image" content="(.*?)">', html, flags=re.IGNORECASE)
-        meta_images += re.findall(r'<meta name="twitter:image" content="(.*?)">', html, flags=re.IGNORECASE)
-        
-        # Simple cleanup using regex
-        # 1. Remove scripts and styles
-        html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        
-        # 2. Remove comments
-        html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
-        
-        # 3. Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', html)
-        
-        # 4. Collapse whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Append JSON-LD data if found
-        if json_ld_scripts:
-            text += "\n\n--- JSON-LD DATA ---\n"
-            for script in json_ld_scripts:
-                text += script + "\n"
-
-        # Append Meta Images if found
-        if meta_images:
-            text += "\n\n--- META IMAGES ---\n"
-            for img in meta_images:
-                text += img + "\n"
-        
+        with observe_scrape("http"):
+            text = html_to_text(await fetch_html(url))
+    except Exception as e:
+        logger.error(f"Scraping error {url}: {e}")
+
+    if has_recipe_content(text) or get_browser_pool() is None:
         return text
 
+    try:
+        logger.info(f"No recipe content in static HTML, rendering {url}")
+        with observe_scrape("render"):
+            rendered = html_to_text(await render_html(url))
+        if len(rendered) > len(text):
+            return rendered
     except Exception as e:
-        from logger import logger
-        logger.error(f"Scraping error {url}: {e}")
-        return ""
+        logger.error(f"Rendering error {url}: {e}")
+
+    return text
@@ -3,6 +3,30 @@ import models
 from database import SessionLocal
 import json
 
+ROLES = [
+    {"name": "Admin", "permissions": ["read:recipes", "write:recipes", "delete:recipes", "manage:users", "manage:roles", "manage:system", "manage:units", "manage:ingredients"]},
+    {"name": "Editor", "permissions": ["read:recipes", "write:recipes", "delete:recipes"]},
+    {"name": "User", "permissions": ["read:recipes", "write:recipes"]},
+    {"name": "Viewer", "permissions": ["read:recipes"]}
+]
+
+def seed_roles():
+    db = SessionLocal()
+    try:
+        for r in ROLES:
+            existing = db.query(models.Role).filter(models.Role.name == r["name"]).first()
+            if not existing:
+                db.add(models.Role(name=r["name"], permissions=r["permissions"]))
+            elif r["name"] == "Admin":
+                # Update existing admin role to include new permissions if missing
+                current_perms = set(existing.permissions)
+                new_perms = set(r["permissions"])
+                if not new_perms.issubset(current_perms):
+                    existing.permissions = list(current_perms.union(new_perms))
+        db.commit()
+    finally:
+        db.close()
+
 def seed_data():
     db = SessionLocal()
     try:
@@ -204,4 +228,5 @@ def seed_data():
         db.close()
 
 if __name__ == "__main__":
+    seed_roles()
     seed_data()
@@ -0,0 +1,109 @@
+"""
+JSON encoding of API responses.
+
+Routes with a response_model are validated and dumped to JSON bytes by pydantic-core (FastAPI
+does that as long as the default response class is used). Routes that return plain dicts go
+through FastAPI's jsonable_encoder and then FastJSONResponse, which uses orjson if it is
+installed. Large untyped payloads (logs, data export) skip jsonable_encoder by returning a
+FastJSONResponse themselves.
+
+The hot response models have pre-built serializers below. model_response() validates and
+dumps in the endpoint, and catalog_response() keeps the encoded catalogs keyed by their ETag.
+"""
+import json
+import enum
+import uuid
+import decimal
+import threading
+from datetime import date, datetime, time
+from collections import OrderedDict
+from typing import List, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+import schemas
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used instead
+    orjson = None
+
+# Encoded catalogs kept per worker, by ETag (old versions are dropped first)
+CATALOG_CACHE_SIZE = 8
+
+RECIPE = TypeAdapter(schemas.Recipe)
+RECIPE_PAGE = TypeAdapter(schemas.RecipePage)
+UNITS = TypeAdapter(List[schemas.Unit])
+INGREDIENT_ITEMS = TypeAdapter(List[schemas.IngredientItem])
+
+_catalog_cache = OrderedDict()
+_catalog_lock = threading.Lock()
+
+
+def _default(value):
+    # Types that orjson handles natively, for the stdlib encoder, plus pydantic models for both
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson (stdlib json without it). Also accepts datetimes, UUIDs,
+    enums and pydantic models, so endpoints can return it without jsonable_encoder.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def _json_response(body: bytes, response: Optional[Response], status_code: int) -> Response:
+    result = Response(content=body, status_code=status_code, media_type="application/json")
+    if response is not None:
+        # Headers the endpoint set on its injected response (ETag, Cache-Control)
+        result.headers.raw.extend(response.headers.raw)
+    return result
+
+
+def model_response(adapter: TypeAdapter, content, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    """
+    Validates `content` (ORM objects or dicts) with a pre-built adapter and returns it as JSON,
+    as FastAPI would for the route's response_model, without the extra thread pool hop.
+    """
+    return _json_response(adapter.dump_json(adapter.validate_python(content, from_attributes=True)), response, status_code)
+
+
+def catalog_response(adapter: TypeAdapter, etag: str, load, response: Optional[Response] = None) -> Response:
+    """
+    Like model_response() for `load()`, but the encoded body is reused while `etag` (which
+    changes with every write to the catalog) stays the same.
+    """
+    with _catalog_lock:
+        body = _catalog_cache.get(etag)
+        if body is not None:
+            _catalog_cache.move_to_end(etag)
+    if body is None:
+        body = adapter.dump_json(adapter.validate_python(load(), from_attributes=True))
+        with _catalog_lock:
+            _catalog_cache[etag] = body
+            while len(_catalog_cache) > CATALOG_CACHE_SIZE:
+                _catalog_cache.popitem(last=False)
+    return _json_response(body, response, 200)
@@ -0,0 +1,145 @@
+"""
+/static serving with precompressed siblings and long-lived caching of content-addressed files.
+
+Text uploads (SVG, icons) get `.br` and `.gz` siblings when they are stored; for files that
+predate this (update.sh runs it), or anything else copied into static/:
+
+    python static_files.py static
+
+PrecompressedStaticFiles serves the sibling the client accepts, so nothing is compressed per
+request. Uploads are named by their content hash and never change, so they are cached as
+immutable. The frontend build is served by nginx, which does the same with gzip_static.
+"""
+import os
+import re
+import sys
+import gzip
+import mimetypes
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from middleware import negotiate_encoding, brotli_available
+from uploads import CONTENT_KEY_LENGTH
+
+# Extensions worth compressing; images other than SVG are compressed already
+PRECOMPRESS_EXTENSIONS = {
+    ".svg", ".ico", ".html", ".css", ".js", ".mjs", ".json", ".map", ".txt", ".xml", ".webmanifest",
+}
+PRECOMPRESS_MIN_SIZE = int(os.getenv("PRECOMPRESS_MIN_SIZE", "512"))
+
+# Content coding -> sibling suffix, in server preference order
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_CACHE_CONTROL = os.getenv("STATIC_CACHE_CONTROL", "public, max-age=3600")
+
+# Uploads and their renditions: "<content key>.<ext>" or "<content key>_<rendition>.<ext>"
+_CONTENT_HASHED_RE = re.compile(rf"^[0-9a-f]{{{CONTENT_KEY_LENGTH}}}[_.]")
+
+
+def is_content_hashed(file_name: str) -> bool:
+    return bool(_CONTENT_HASHED_RE.match(file_name))
+
+
+def _write_if_smaller(path: str, data: bytes, original_size: int) -> bool:
+    if len(data) >= original_size:
+        return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def precompress_file(path: str, min_size: int = PRECOMPRESS_MIN_SIZE) -> list:
+    """
+    Writes `<path>.gz` (and `<path>.br` if the brotli package is installed) at the highest
+    compression level, unless the file is too small, not text, or wouldn't get smaller.
+    Up-to-date siblings are kept. Returns the paths written.
+    """
+    if os.path.splitext(path)[1].lower() not in PRECOMPRESS_EXTENSIONS:
+        return []
+    stat_result = os.stat(path)
+    if stat_result.st_size < min_size:
+        return []
+
+    written = []
+    data = None
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+        if encoding == "br" and not brotli_available():
+            continue
+        target = path + suffix
+        if os.path.exists(target) and os.stat(target).st_mtime >= stat_result.st_mtime:
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        if encoding == "br":
+            import brotli
+            compressed = brotli.compress(data, quality=11)
+        else:
+            # mtime=0 keeps the output identical for identical input
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if _write_if_smaller(target, compressed, len(data)):
+            written.append(target)
+    return written
+
+
+def precompress_tree(root: str, min_size: int = PRECOMPRESS_MIN_SIZE) -> list:
+    written = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            written += precompress_file(os.path.join(directory, name), min_size)
+    return written
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a precompressed sibling (`.br`, `.gz`) if the client accepts it and
+    the sibling is not older than the file, and sets Cache-Control (immutable for
+    content-hashed names).
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        file_name = os.path.basename(full_path)
+        compressible = os.path.splitext(file_name)[1].lower() in PRECOMPRESS_EXTENSIONS
+
+        response = None
+        if compressible and status_code == 200:
+            available = [
+                encoding for encoding, suffix in PRECOMPRESSED_SUFFIXES.items()
+                if self._fresh_sibling(full_path + suffix, stat_result)
+            ]
+            encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), available) if available else None
+            if encoding:
+                sibling = full_path + PRECOMPRESSED_SUFFIXES[encoding]
+                # Type of the original file; the ETag comes from the sibling, so it differs per coding
+                response = FileResponse(
+                    sibling, status_code=status_code, stat_result=os.stat(sibling),
+                    media_type=mimetypes.guess_type(file_name)[0] or "text/plain",
+                    headers={"content-encoding": encoding},
+                )
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL if is_content_hashed(file_name) else STATIC_CACHE_CONTROL
+        if compressible:
+            response.headers["vary"] = "Accept-Encoding"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def _fresh_sibling(path: str, stat_result) -> bool:
+        try:
+            return os.stat(path).st_mtime >= stat_result.st_mtime
+        except OSError:
+            return False
+
+
+if __name__ == "__main__":
+    roots = sys.argv[1:] or ["static"]
+    written = [path for root in roots for path in precompress_tree(root)]
+    print(f"Wrote {len(written)} precompressed files")
@@ -0,0 +1,251 @@
+import os
+import sys
+import uuid
+import hashlib
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# The app reads its configuration at import time: point it at a throwaway SQLite database and
+# run it from a temporary directory, so uploads, backups and logs don't touch the checkout.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="bakencook-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["PROJECT_ROOT"] = WORK_DIR
+os.environ["SLOW_QUERY_MS"] = "0"
+os.environ.pop("METRICS_TOKEN", None)
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(WORK_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from starlette.routing import Match  # noqa: E402
+
+import main  # noqa: E402
+from bootstrap import bootstrap  # noqa: E402
+import models  # noqa: E402
+from auth import create_access_token, get_password_hash  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from query_stats import assert_max_queries  # noqa: E402
+from seed_data_extended import seed_data_extended  # noqa: E402
+
+PASSWORD = "secret-password"
+API_KEY = "automation-key"
+
+# Fixture dataset. Sizes are chosen so that an N+1 load on any list endpoint clearly exceeds
+# the query budgets in the tests.
+RECIPES_PER_USER = 15
+CHAPTERS_PER_RECIPE = 2
+INGREDIENTS_PER_CHAPTER = 4
+STEPS_PER_CHAPTER = 3
+SCHEDULES_PER_USER = 10
+
+# (method, route template) of every request made through `api`, checked by test_route_coverage
+covered_routes = set()
+
+
+def _create_user(db, username, role_name, role=models.UserRole.user, **fields):
+    role_obj = db.query(models.Role).filter(models.Role.name == role_name).first()
+    user = models.User(
+        username=username,
+        email=f"{username}@example.com",
+        hashed_password=get_password_hash(PASSWORD),
+        role=role,
+        role_id=role_obj.id,
+        is_active=True,
+        is_verified=True,
+        **fields
+    )
+    db.add(user)
+    return user
+
+
+def _create_recipe(db, owner, number):
+    recipe = models.Recipe(
+        title=f"{owner.username} bread {number}",
+        source_url=f"https://example.com/{owner.username}/{number}",
+        user_id=owner.id,
+        type=models.RecipeCategory.baking if number % 2 else models.RecipeCategory.cooking,
+        is_public=True,
+        yield_amount=2,
+        created_at=datetime(2024, 1, 1) + timedelta(hours=number),
+    )
+    for c in range(CHAPTERS_PER_RECIPE):
+        chapter = models.Chapter(name=f"Chapter {c}", order_index=c)
+        chapter.ingredients = [
+            models.Ingredient(name={"en": f"Flour {i}", "de": f"Mehl {i}"}, amount=100 + i, unit="g", type=models.IngredientType.flour)
+            for i in range(INGREDIENTS_PER_CHAPTER)
+        ]
+        chapter.steps = [
+            models.Step(order_index=s, description=f"Step {s}", duration_min=10 + s, type=models.StepType.active)
+            for s in range(STEPS_PER_CHAPTER)
+        ]
+        recipe.chapters.append(chapter)
+    db.add(recipe)
+    return recipe
+
+
+def _seed_dataset():
+    bootstrap()
+    seed_data_extended()
+    db = SessionLocal()
+    try:
+        admin = _create_user(db, "admin", "Admin", role=models.UserRole.admin)
+        alice = _create_user(db, "alice", "User", api_key=hashlib.sha256(API_KEY.encode()).hexdigest())
+        bob = _create_user(db, "bob", "Editor")
+        _create_user(db, "viewer", "Viewer")
+        db.flush()
+
+        recipes = {user.username: [_create_recipe(db, user, n) for n in range(RECIPES_PER_USER)] for user in (alice, bob)}
+        db.flush()
+
+        for recipe in recipes["bob"]:
+            db.add(models.Rating(user_id=alice.id, recipe_id=recipe.id, score=4))
+            db.add(models.Favorite(user_id=alice.id, recipe_id=recipe.id))
+        for recipe in recipes["alice"]:
+            db.add(models.Rating(user_id=bob.id, recipe_id=recipe.id, score=5))
+            db.add(models.Rating(user_id=admin.id, recipe_id=recipe.id, score=3))
+
+        for n in range(SCHEDULES_PER_USER):
+            target = datetime(2024, 6, 1) + timedelta(days=n)
+            db.add(models.Schedule(
+                user_id=alice.id,
+                recipe_id=recipes["alice"][n].id,
+                target_time=target,
+                start_time=target - timedelta(hours=3),
+                title=f"Bake {n}",
+            ))
+            db.add(models.UserSession(user_id=alice.id, expires_at=datetime.utcnow() + timedelta(days=1)))
+        db.add(models.ImportJob(user_id=alice.id, status=models.ImportJobStatus.completed))
+        db.commit()
+    finally:
+        db.close()
+
+
+_seed_dataset()
+
+
+def token_for(username: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+def resolve_route(method: str, path: str) -> str:
+    scope = {"type": "http", "method": method, "path": path.split("?", 1)[0]}
+    for route in main.app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    raise AssertionError(f"No route for {method} {path}")
+
+
+class Api:
+    """
+    Calls an endpoint and asserts its status code and upper bounds on the SQL statements it
+    executes and the ORM rows it loads.
+    """
+
+    def __init__(self, client: TestClient):
+        self.client = client
+
+    def call(self, method, path, *, max_queries, max_rows=None, status=200, **kwargs):
+        covered_routes.add((method, resolve_route(method, path)))
+        budget_error = None
+        try:
+            with assert_max_queries(max_queries, max_rows):
+                response = self.client.request(method, path, **kwargs)
+        except AssertionError as e:
+            budget_error = e
+        assert response.status_code == status, f"{method} {path}: {response.status_code} {response.text[:500]}"
+        if budget_error:
+            raise AssertionError(f"{method} {path}: {budget_error}")
+        return response
+
+    def get(self, path, **kwargs):
+        return self.call("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.call("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.call("PUT", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.call("DELETE", path, **kwargs)
+
+
+def pytest_collection_modifyitems(items):
+    # The route coverage check needs all other tests to have run
+    items.sort(key=lambda item: item.module.__name__ == "test_route_coverage")
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Not used as a context manager: the startup hooks would start the periodic background loops
+    return TestClient(main.app)
+
+
+@pytest.fixture(scope="session")
+def api(client):
+    return Api(client)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def admin_headers():
+    return token_for("admin")
+
+
+@pytest.fixture
+def alice_headers():
+    return token_for("alice")
+
+
+@pytest.fixture
+def bob_headers():
+    return token_for("bob")
+
+
+@pytest.fixture
+def viewer_headers():
+    return token_for("viewer")
+
+
+@pytest.fixture
+def user_of(db):
+    def get(username: str) -> models.User:
+        return db.query(models.User).filter(models.User.username == username).one()
+    return get
+
+
+@pytest.fixture
+def throwaway_user(db):
+    """
+    A fresh user for tests that revoke tokens, change credentials or delete the account.
+    Returns (user, auth headers).
+    """
+    user = _create_user(db, f"temp-{uuid.uuid4().hex[:8]}", "User")
+    db.commit()
+    db.refresh(user)
+    return user, token_for(user.username)
+
+
+@pytest.fixture
+def recipe_of(db):
+    def get(username: str, index: int = 0) -> models.Recipe:
+        return (
+            db.query(models.Recipe)
+            .join(models.User)
+            .filter(models.User.username == username, models.Recipe.title == f"{username} bread {index}")
+            .one()
+        )
+    return get
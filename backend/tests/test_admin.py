@@ -0,0 +1,103 @@
+import models
+
+
+def test_list_users(api, admin_headers):
+    response = api.get("/admin/users", headers=admin_headers, max_queries=4, max_rows=150)
+    assert {"admin", "alice", "bob"} <= {user["username"] for user in response.json()}
+
+
+def test_admin_routes_require_permission(api, alice_headers):
+    api.get("/admin/users", headers=alice_headers, max_queries=1, status=403)
+    api.get("/admin/roles", headers=alice_headers, max_queries=1, status=403)
+
+
+def test_create_update_delete_user(api, admin_headers, user_of):
+    response = api.post(
+        "/admin/users",
+        json={"username": "carol", "email": "carol@example.com", "password": "pw", "role": "user"},
+        headers=admin_headers,
+        max_queries=6,
+    )
+    user_id = response.json()["id"]
+
+    response = api.put(f"/admin/users/{user_id}", json={"username": "caroline", "is_verified": True}, headers=admin_headers, max_queries=7)
+    assert response.json()["username"] == "caroline"
+
+    api.put(f"/admin/users/{user_id}/role?role_name=Editor", headers=admin_headers, max_queries=5)
+    api.put(f"/admin/users/{user_id}/status?is_active=false", headers=admin_headers, max_queries=4)
+    api.delete(f"/admin/users/{user_id}", headers=admin_headers, max_queries=12)
+
+    api.put(f"/admin/users/{user_of('admin').id}/status?is_active=false", headers=admin_headers, max_queries=3, status=400)
+
+
+def test_list_roles(api, admin_headers):
+    response = api.get("/admin/roles", headers=admin_headers, max_queries=3, max_rows=20)
+    counts = {role["name"]: role["user_count"] for role in response.json()}
+    assert counts["Admin"] >= 1 and counts["Editor"] >= 1
+
+
+def test_create_update_delete_role(api, admin_headers):
+    response = api.post("/admin/roles", json={"name": "Baker", "permissions": ["read:recipes"]}, headers=admin_headers, max_queries=5)
+    role_id = response.json()["id"]
+
+    response = api.put(
+        f"/admin/roles/{role_id}",
+        json={"name": "Head Baker", "permissions": ["read:recipes", "write:recipes"]},
+        headers=admin_headers,
+        max_queries=6,
+    )
+    assert response.json()["user_count"] == 0
+
+    api.delete(f"/admin/roles/{role_id}", headers=admin_headers, max_queries=5)
+
+
+def test_delete_role_in_use(api, admin_headers, db):
+    role = db.query(models.Role).filter(models.Role.name == "User").one()
+    api.delete(f"/admin/roles/{role.id}", headers=admin_headers, max_queries=3, status=400)
+
+
+def test_units(api, admin_headers, alice_headers):
+    units = api.get("/admin/units", headers=alice_headers, max_queries=3, max_rows=100).json()
+    assert units
+    api.get("/admin/units/export", headers=admin_headers, max_queries=2, max_rows=100)
+
+    name = {"en": {"singular": "loaf", "plural": "loaves"}, "de": {"singular": "Laib", "plural": "Laibe"}}
+    response = api.post("/admin/units", json={"name": name}, headers=admin_headers, max_queries=5, max_rows=100)
+    unit_id = response.json()["id"]
+    api.post("/admin/units", json={"name": name}, headers=admin_headers, max_queries=2, max_rows=100, status=400)
+
+    api.put(f"/admin/units/{unit_id}", json={"name": name, "description": {"en": "Loaf"}}, headers=admin_headers, max_queries=5)
+    api.delete(f"/admin/units/{unit_id}", headers=admin_headers, max_queries=5)
+
+
+def test_bulk_units(api, admin_headers):
+    units = [{"name": f"bulk-unit-{n}"} for n in range(5)]
+    response = api.post("/admin/units/bulk", json=units, headers=admin_headers, max_queries=3 + 2 * len(units))
+    assert len(response.json()) == len(units)
+
+
+def test_ingredients(api, admin_headers, alice_headers):
+    ingredients = api.get("/admin/ingredients", headers=alice_headers, max_queries=3, max_rows=400).json()
+    assert ingredients
+    api.get("/admin/ingredients/export", headers=admin_headers, max_queries=3, max_rows=400)
+
+    # Both languages given, so no translation (AI) call is needed
+    response = api.post("/admin/ingredients", json={"name": {"en": "Spelt", "de": "Dinkel"}}, headers=alice_headers, max_queries=5)
+    ingredient = response.json()
+    assert ingredient["is_verified"] is False
+
+    response = api.put(f"/admin/ingredients/{ingredient['id']}/approve", headers=admin_headers, max_queries=5)
+    assert response.json()["is_verified"] is True
+    api.put(
+        f"/admin/ingredients/{ingredient['id']}",
+        json={"name": {"en": "Spelt flour", "de": "Dinkelmehl"}},
+        headers=admin_headers,
+        max_queries=5,
+    )
+    api.delete(f"/admin/ingredients/{ingredient['id']}", headers=admin_headers, max_queries=4)
+
+
+def test_bulk_ingredients(api, admin_headers):
+    ingredients = [{"name": {"en": f"Grain {n}", "de": f"Korn {n}"}} for n in range(5)]
+    response = api.post("/admin/ingredients/bulk", json=ingredients, headers=admin_headers, max_queries=3 + 2 * len(ingredients))
+    assert len(response.json()) == len(ingredients)
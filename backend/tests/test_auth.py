@@ -0,0 +1,99 @@
+import models
+from conftest import PASSWORD, RECIPES_PER_USER
+
+
+def test_register_and_login(api, client):
+    response = api.post(
+        "/register",
+        json={"username": "newbie", "email": "newbie@example.com", "password": PASSWORD},
+        max_queries=10,
+    )
+    assert response.json()["is_verified"] is True
+
+    response = api.post("/token", data={"username": "newbie", "password": PASSWORD}, max_queries=6)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Tokens with a session id also touch the session row
+    api.post("/auth/refresh", headers=headers, max_queries=8)
+    sessions = api.get("/users/me/sessions", headers=headers, max_queries=5, max_rows=5).json()
+    assert len(sessions) == 1
+    api.delete(f"/users/me/sessions/{sessions[0]['id']}", headers=headers, max_queries=6)
+
+
+def test_register_duplicate_username(api):
+    api.post("/register", json={"username": "alice", "email": "other@example.com", "password": PASSWORD}, max_queries=2, status=400)
+
+
+def test_login_with_wrong_password(api):
+    api.post("/token", data={"username": "alice", "password": "wrong"}, max_queries=1, status=401)
+
+
+def test_verify_email(api, db, throwaway_user):
+    from datetime import datetime, timedelta
+
+    user, _ = throwaway_user
+    db.add(models.VerificationToken(token="123456", user_id=user.id, expires_at=datetime.utcnow() + timedelta(hours=1)))
+    user.is_verified = False
+    db.commit()
+
+    response = api.post("/auth/verify-email", json={"token": "123456"}, max_queries=5)
+    assert response.json()["access_token"]
+
+
+def test_resend_verification(api, db, throwaway_user):
+    user, _ = throwaway_user
+    user.is_verified = False
+    db.commit()
+
+    # Without SMTP settings the mail is skipped, the token is still stored
+    api.post(f"/auth/resend-verification?username={user.username}", max_queries=6)
+    api.post("/auth/resend-verification?username=alice", max_queries=2)
+
+
+def test_read_me(api, alice_headers):
+    response = api.get("/users/me", headers=alice_headers, max_queries=4, max_rows=5)
+    assert response.json()["rating_count"] == 2 * RECIPES_PER_USER
+
+
+def test_change_password_and_revoke_sessions(api, throwaway_user):
+    _, headers = throwaway_user
+    api.post("/auth/change-password", json={"old_password": PASSWORD, "new_password": "changed"}, headers=headers, max_queries=3)
+    api.post("/auth/revoke-sessions", headers=headers, max_queries=4)
+    # The token version was bumped, so the old token is gone
+    api.get("/users/me", headers=headers, max_queries=1, status=401)
+
+
+def test_update_settings(api, throwaway_user):
+    user, headers = throwaway_user
+    response = api.put(
+        "/users/me/settings",
+        json={"session_duration_minutes": 120, "language": "de", "email": "changed@example.com", "password": PASSWORD},
+        headers=headers,
+        max_queries=6,
+    )
+    assert response.json()["email"] == "changed@example.com"
+
+
+def test_confirm_email_change(api, db, throwaway_user):
+    from datetime import datetime, timedelta
+
+    user, headers = throwaway_user
+    db.add(models.VerificationToken(token="654321:moved@example.com", user_id=user.id, expires_at=datetime.utcnow() + timedelta(minutes=5)))
+    db.commit()
+
+    response = api.post("/users/me/email/confirm", json={"code": "654321", "email": "moved@example.com"}, headers=headers, max_queries=8)
+    assert response.json()["email"] == "moved@example.com"
+
+
+def test_delete_account(api, throwaway_user):
+    _, headers = throwaway_user
+    api.delete("/users/me", json={"password": PASSWORD}, headers=headers, max_queries=12)
+
+
+def test_api_key_status(api, alice_headers):
+    assert api.get("/users/me/api-key", headers=alice_headers, max_queries=1).json() == {"has_api_key": True}
+
+
+def test_export_my_data(api, alice_headers):
+    response = api.get("/users/me/export", headers=alice_headers, max_queries=5, max_rows=400)
+    assert len(response.json()["recipes"]) >= RECIPES_PER_USER
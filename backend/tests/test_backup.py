@@ -0,0 +1,296 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+import backup
+
+
+def test_download_backup(api, admin_headers):
+    response = api.get("/admin/system/backup", headers=admin_headers, max_queries=1)
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert any(name.endswith(".db") or name.endswith(".sql") for name in names)
+
+
+def test_backup_job(api, admin_headers):
+    # Background tasks run before the TestClient returns
+    job = api.post("/admin/system/backup/jobs", headers=admin_headers, max_queries=1, status=202).json()
+    job = api.get(f"/admin/system/backup/jobs/{job['id']}", headers=admin_headers, max_queries=1).json()
+    assert job["status"] == "completed", job
+
+    assert api.get("/admin/system/backup/jobs", headers=admin_headers, max_queries=1).json()
+    download = f"/admin/system/backup/jobs/{job['id']}/download"
+    response = api.get(download, headers={"X-Download-Token": job["download_token"]}, max_queries=0)
+    assert len(response.content) == job["size"]
+    response = api.get(f"{download}?token={job['download_token']}", max_queries=0)
+    assert len(response.content) == job["size"]
+
+    api.get(download, max_queries=0, status=404)
+    api.get(f"{download}?token=wrong", max_queries=0, status=404)
+    api.get(f"{download}?token=br%C3%B6tchen", max_queries=0, status=404)
+
+
+def test_download_token_masked_in_access_log():
+    import logging
+    from logger import RedactTokenFilter
+
+    record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 0, '%s - "%s %s HTTP/%s" %d', ("127.0.0.1:5000", "GET", "/admin/system/backup/jobs/abc/download?token=s3cret&x=1", "1.1", 200), None)
+    RedactTokenFilter().filter(record)
+    assert "s3cret" not in record.getMessage() and "token=***&x=1" in record.getMessage()
+
+
+def test_snapshots(api, admin_headers):
+    api.post("/admin/system/snapshots", headers=admin_headers, max_queries=1)
+    snapshots = api.get("/admin/system/snapshots", headers=admin_headers, max_queries=1).json()
+    assert snapshots
+
+    assert api.get("/admin/system/snapshots/verify", headers=admin_headers, max_queries=1).json()["ok"] is True
+    download = f"/admin/system/snapshots/{snapshots[0]['id']}/download"
+    response = api.get(download, headers=admin_headers, max_queries=1)
+    assert zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    api.get("/admin/system/snapshots/20000101T000000Z/download", headers=admin_headers, max_queries=1, status=404)
+
+
+def test_snapshot_download_holds_the_repository_lock(api, admin_headers):
+    import backup_jobs
+    import backup_repository
+
+    api.post("/admin/system/snapshots", headers=admin_headers, max_queries=1)
+    snapshot_id = backup_repository.list_snapshots()[0]["id"]
+
+    # Retention can't run while the archive streams
+    archive = backup_repository.open_snapshot_archive(snapshot_id)
+    next(archive)
+    with pytest.raises(BlockingIOError):
+        backup_jobs.acquire_job_lock()
+    assert b"".join(archive)
+    backup_jobs.release_job_lock(backup_jobs.acquire_job_lock())
+
+    # And a download waits for a running job
+    lock_file = backup_jobs.acquire_job_lock()
+    try:
+        api.get(f"/admin/system/snapshots/{snapshot_id}/download", headers=admin_headers, max_queries=1, status=409)
+    finally:
+        backup_jobs.release_job_lock(lock_file)
+
+
+def test_restore_rejects_non_zip(api, admin_headers):
+    # Never restores: the upload is rejected before the job starts
+    api.post(
+        "/admin/system/restore",
+        files={"file": ("backup.txt", b"not a backup", "text/plain")},
+        headers=admin_headers,
+        max_queries=1,
+        status=400,
+    )
+
+
+def fake_pg_dump(tmp_path, monkeypatch, exit_code):
+    # Writes far more to stderr than a pipe buffer holds before producing any output
+    script = tmp_path / "pg_dump"
+    script.write_text(f"#!/bin/sh\nhead -c 1000000 /dev/zero | tr '\\\\0' 'w' >&2\necho 'CREATE TABLE bread ();'\nexit {exit_code}\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(backup, "DATABASE_URL", "postgresql://bakery@localhost/bakery")
+
+
+def test_pg_dump_with_large_stderr(tmp_path, monkeypatch):
+    fake_pg_dump(tmp_path, monkeypatch, exit_code=0)
+    with backup.open_database_dump() as (name, stream):
+        assert name == "database.sql"
+        assert stream.read() == b"CREATE TABLE bread ();\n"
+
+    fake_pg_dump(tmp_path, monkeypatch, exit_code=1)
+    with pytest.raises(Exception, match="Database backup failed"):
+        with backup.open_database_dump() as (name, stream):
+            stream.read()
+
+
+def test_snapshot_copies_only_new_uploads(api, admin_headers, monkeypatch):
+    import backup_repository
+
+    os.makedirs(backup.STATIC_UPLOADS_DIR, exist_ok=True)
+    with open(os.path.join(backup.STATIC_UPLOADS_DIR, "snapshot-test.txt"), "wb") as f:
+        f.write(b"proofing notes")
+    api.post("/admin/system/snapshots", headers=admin_headers, max_queries=1)
+
+    writes = []
+
+    def tracking_open(path, mode="r", *args, **kwargs):
+        if "w" in mode:
+            writes.append(path)
+        return open(path, mode, *args, **kwargs)
+
+    # Every upload is already in the blob store: nothing is copied again
+    monkeypatch.setattr(backup_repository, "open", tracking_open, raising=False)
+    blobs = [backup_repository._store_blob(file_path) for _, file_path in backup.iter_upload_files()]
+    assert blobs and not any(blob["new"] for blob in blobs)
+    assert writes == []
+
+
+def test_snapshot_waits_for_backup_jobs():
+    import backup_jobs
+    import backup_repository
+
+    # Held by a running backup or restore job
+    lock_file = backup_jobs.acquire_job_lock()
+    try:
+        with pytest.raises(BlockingIOError):
+            backup_repository.create_snapshot()
+    finally:
+        backup_jobs.release_job_lock(lock_file)
+
+
+class Completed:
+    def __init__(self, returncode=0, stdout="", stderr=""):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+LISTING = """;
+; Archive created at 2026-10-19 10:00:00 UTC
+215; 1259 16390 TABLE public recipes bakery
+3345; 0 16390 TABLE DATA public recipes bakery
+3346; 0 16402 TABLE DATA public chapters bakery
+"""
+
+
+@pytest.fixture
+def postgres_restore(monkeypatch):
+    """
+    Records what restore_postgres_directory would run against PostgreSQL.
+    """
+    calls = []
+    monkeypatch.setattr(backup, "DATABASE_URL", "postgresql://bakery@localhost/bakery")
+    monkeypatch.setattr(backup, "reset_postgres_schema", lambda: calls.append("reset"))
+
+    def run_restore_command(cmd, on_line=None):
+        calls.append(next(arg for arg in cmd if arg.startswith("--section=")))
+        if on_line:
+            on_line("pg_restore: processing data for table \"public.recipes\"")
+
+    monkeypatch.setattr(backup, "_run_restore_command", run_restore_command)
+    return calls
+
+
+@pytest.mark.parametrize("listing, error", [
+    (Completed(1, stderr="pg_restore: error: could not open input file \"toc.dat\""), "unreadable"),
+    (Completed(0, stdout=";\n; Archive created at 2026-10-19 10:00:00 UTC\n"), "no table data"),
+])
+def test_restore_postgres_directory_validates_before_dropping(postgres_restore, monkeypatch, listing, error):
+    monkeypatch.setattr(backup.subprocess, "run", lambda cmd, **kwargs: listing)
+    with pytest.raises(Exception, match=error):
+        backup.restore_postgres_directory("/tmp/database.dir", jobs=2)
+    assert postgres_restore == []
+
+
+def test_restore_postgres_directory_sections(postgres_restore, monkeypatch):
+    progress = []
+    monkeypatch.setattr(backup.subprocess, "run", lambda cmd, **kwargs: Completed(stdout=LISTING))
+    backup.restore_postgres_directory("/tmp/database.dir", jobs=2, progress=lambda percent, message: progress.append(percent))
+    assert postgres_restore == ["reset", "--section=pre-data", "--section=data", "--section=post-data"]
+    assert progress == [10, 20, 30, 55, 80]
+
+
+def test_dump_postgres_directory(monkeypatch):
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        return Completed(0 if len(commands) == 1 else 1, stderr=b"pg_dump: error: connection refused")
+
+    monkeypatch.setattr(backup, "DATABASE_URL", "postgresql://bakery@localhost/bakery")
+    monkeypatch.setattr(backup.subprocess, "run", run)
+    backup.dump_postgres_directory("/tmp/database.dir", jobs=3)
+    assert commands[0][:5] == ["pg_dump", "-Fd", "-j", "3", "-Z"] and commands[0][-3:] == ["-f", "/tmp/database.dir", "postgresql://bakery@localhost/bakery"]
+
+    with pytest.raises(Exception, match="Database backup failed"):
+        backup.dump_postgres_directory("/tmp/database.dir", jobs=3)
+
+
+def restore(client, headers, archive: bytes) -> dict:
+    # Called on the client directly: the restore job runs inside the request and its
+    # bootstrap() queries are not part of the endpoint's budget
+    response = client.post("/admin/system/restore", files={"file": ("backup.zip", archive, "application/zip")}, headers=headers)
+    assert response.status_code == 202, response.text
+    return client.get(f"/admin/system/backup/jobs/{response.json()['id']}", headers=headers).json()
+
+
+def test_sqlite_backup_restore_round_trip(api, client, admin_headers, alice_headers, db, user_of):
+    import models
+
+    recipe = models.Recipe(title="Restore marker", user_id=user_of("alice").id, type=models.RecipeCategory.baking, is_public=True)
+    db.add(recipe)
+    db.commit()
+    recipe_id = recipe.id
+    os.makedirs(backup.STATIC_UPLOADS_DIR, exist_ok=True)
+    marker = os.path.join(backup.STATIC_UPLOADS_DIR, "restore-marker.txt")
+    with open(marker, "wb") as f:
+        f.write(b"before")
+
+    archive = api.get("/admin/system/backup", headers=admin_headers, max_queries=1).content
+
+    # Changed after the backup
+    db.delete(recipe)
+    db.commit()
+    with open(marker, "wb") as f:
+        f.write(b"after")
+    added = os.path.join(backup.STATIC_UPLOADS_DIR, "added-after-backup.txt")
+    with open(added, "wb") as f:
+        f.write(b"new")
+
+    job = restore(client, admin_headers, archive)
+    assert job["status"] == "completed", job
+
+    db.expire_all()
+    assert db.query(models.Recipe).filter(models.Recipe.id == recipe_id).one().title == "Restore marker"
+    with open(marker, "rb") as f:
+        assert f.read() == b"before"
+    assert not os.path.exists(added)
+    assert not os.path.exists(f"{backup.STATIC_UPLOADS_DIR}.restore") and not os.path.exists(f"{backup.STATIC_UPLOADS_DIR}.old")
+
+    # The app keeps serving from the restored database
+    assert api.get(f"/recipes/{recipe_id}", headers=alice_headers, max_queries=4).json()["title"] == "Restore marker"
+    api.delete(f"/recipes/{recipe_id}", headers=alice_headers, max_queries=20)
+
+
+def corrupt_member(archive: bytes, name: str) -> bytes:
+    # Flips a byte of a stored member's data, so its CRC-32 no longer matches
+    info = zipfile.ZipFile(io.BytesIO(archive)).getinfo(name)
+    data = bytearray(archive)
+    header = info.header_offset
+    name_length = int.from_bytes(data[header + 26:header + 28], "little")
+    extra_length = int.from_bytes(data[header + 28:header + 30], "little")
+    data[header + 30 + name_length + extra_length] ^= 0xFF
+    return bytes(data)
+
+
+@pytest.mark.parametrize("damage, error", [
+    ("crc", "CRC"),
+    ("unsafe_path", "Unsafe path"),
+    ("no_database", "No database"),
+])
+def test_restore_rejects_damaged_archives_before_touching_data(client, admin_headers, alice_headers, api, damage, error):
+    os.makedirs(backup.STATIC_UPLOADS_DIR, exist_ok=True)
+    marker = os.path.join(backup.STATIC_UPLOADS_DIR, "restore-untouched.txt")
+    with open(marker, "wb") as f:
+        f.write(b"live")
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zipf:
+        if damage != "no_database":
+            zipf.writestr("database.db", b"SQLite format 3\x00" + b"\x00" * 4096)
+        zipf.writestr("uploads/restore-untouched.txt", b"from backup")
+        if damage == "unsafe_path":
+            zipf.writestr("uploads/../../escape.txt", b"outside")
+    archive = buffer.getvalue()
+    if damage == "crc":
+        archive = corrupt_member(archive, "database.db")
+
+    job = restore(client, admin_headers, archive)
+    assert job["status"] == "failed" and error in job["error"], job
+    with open(marker, "rb") as f:
+        assert f.read() == b"live"
+    api.get("/recipes?limit=1", headers=alice_headers, max_queries=8)
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import models
+from bootstrap import check_schema_version, current_revision, head_revision, migrate
+from conftest import WORK_DIR
+
+
+def sqlite_engine(name):
+    return create_engine(f"sqlite:///{os.path.join(WORK_DIR, name)}")
+
+
+def test_new_database_is_created_at_head():
+    engine = sqlite_engine("bootstrap-new.db")
+    with pytest.raises(RuntimeError):
+        check_schema_version(engine)
+
+    migrate(engine)
+    check_schema_version(engine)
+    assert set(models.Base.metadata.tables) <= set(inspect(engine).get_table_names())
+
+    # Running it again is a no-op
+    migrate(engine)
+    check_schema_version(engine)
+
+
+def test_legacy_database_is_upgraded():
+    # As created by create_all() of an old version, before email verification and languages
+    engine = sqlite_engine("bootstrap-legacy.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE roles (id VARCHAR PRIMARY KEY, name VARCHAR, permissions JSON)"))
+        conn.execute(text(
+            "CREATE TABLE users (id VARCHAR PRIMARY KEY, username VARCHAR, hashed_password VARCHAR, "
+            "token_version INTEGER, is_active BOOLEAN, role VARCHAR(5), role_id VARCHAR REFERENCES roles(id))"
+        ))
+        conn.execute(text("INSERT INTO users (id, username, hashed_password, token_version, is_active, role) VALUES ('1', 'old', 'x', 1, 1, 'user')"))
+
+    migrate(engine)
+
+    check_schema_version(engine)
+    inspector = inspect(engine)
+    assert set(models.Base.metadata.tables) <= set(inspector.get_table_names())
+    assert {c.name for c in models.User.__table__.columns} <= {c["name"] for c in inspector.get_columns("users")}
+    with engine.connect() as conn:
+        user = conn.execute(text("SELECT language, session_duration_minutes, is_verified, created_at FROM users")).one()
+    assert user.language == "en" and user.session_duration_minutes == 60 and user.is_verified and user.created_at
+
+
+def test_migrated_schema_matches_models():
+    from alembic.autogenerate import compare_metadata
+    from alembic.runtime.migration import MigrationContext
+
+    # Only "roles" exists, so the legacy revision creates every other table from its own copy
+    engine = sqlite_engine("bootstrap-compare.db")
+    models.Role.__table__.create(engine)
+    migrate(engine)
+
+    with engine.connect() as conn:
+        assert current_revision(conn) == head_revision()
+        assert compare_metadata(MigrationContext.configure(conn), models.Base.metadata) == []
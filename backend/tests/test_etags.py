@@ -0,0 +1,68 @@
+def revalidate(api, path, etag, headers=None, **budget):
+    return api.get(path, headers={**(headers or {}), "If-None-Match": etag}, status=304, **budget)
+
+
+def test_recipe_detail(api, alice_headers, bob_headers, recipe_of):
+    recipe = recipe_of("alice", 1)
+    path = f"/recipes/{recipe.id}"
+    response = api.get(path, headers=alice_headers, max_queries=4)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    # Answered from the version alone: no recipe rows loaded, no body
+    response = revalidate(api, path, etag, alice_headers, max_queries=2, max_rows=2)
+    assert response.content == b"" and response.headers["etag"].lstrip("W/") == etag.lstrip("W/")
+
+    # The detail says whether the user favorited it, so the tag is per user
+    assert api.get(path, headers=bob_headers, max_queries=4).headers["etag"] != etag
+
+    api.post(f"/recipes/{recipe.id}/rate", json={"score": 4}, headers=bob_headers, max_queries=7)
+    assert api.get(path, headers={**alice_headers, "If-None-Match": etag}, max_queries=4).headers["etag"] != etag
+
+
+def test_recipe_detail_after_removing_chapters(api, alice_headers):
+    payload = {
+        "title": "Focaccia",
+        "yield_amount": 1,
+        "type": "baking",
+        "chapters": [{"name": "Dough", "order_index": 0, "ingredients": [], "steps": [{"order_index": 0, "description": "Mix", "duration_min": 5, "type": "active"}]}],
+    }
+    recipe_id = api.post("/recipes/", json=payload, headers=alice_headers, max_queries=10, max_rows=10).json()["id"]
+    path = f"/recipes/{recipe_id}"
+    etag = api.get(path, headers=alice_headers, max_queries=4).headers["etag"]
+
+    # Only the chapters change; they are removed with bulk deletes the flush doesn't see
+    api.put(path, json={**payload, "chapters": []}, headers=alice_headers, max_queries=14, max_rows=10)
+    response = api.get(path, headers={**alice_headers, "If-None-Match": etag}, max_queries=4)
+    assert response.json()["chapters"] == [] and response.headers["etag"] != etag
+
+    api.delete(path, headers=alice_headers, max_queries=20, max_rows=10)
+
+
+def test_catalogs(api, admin_headers, alice_headers):
+    units = api.get("/admin/units", headers=alice_headers, max_queries=3, max_rows=100)
+    ingredients = api.get("/admin/ingredients", headers=alice_headers, max_queries=3, max_rows=400)
+    revalidate(api, "/admin/units", units.headers["etag"], alice_headers, max_queries=2, max_rows=2)
+    revalidate(api, "/admin/ingredients", ingredients.headers["etag"], alice_headers, max_queries=2, max_rows=2)
+
+    # Ingredients embed their default unit, so a unit change invalidates both lists
+    name = {"en": {"singular": "crate", "plural": "crates"}, "de": {"singular": "Kiste", "plural": "Kisten"}}
+    unit_id = api.post("/admin/units", json={"name": name}, headers=admin_headers, max_queries=5, max_rows=100).json()["id"]
+    api.get("/admin/units", headers={**alice_headers, "If-None-Match": units.headers["etag"]}, max_queries=3, max_rows=100)
+    api.get("/admin/ingredients", headers={**alice_headers, "If-None-Match": ingredients.headers["etag"]}, max_queries=3, max_rows=400)
+    api.delete(f"/admin/units/{unit_id}", headers=admin_headers, max_queries=5)
+
+
+def test_public_settings_and_changelog(api, admin_headers):
+    settings = api.get("/settings/public", max_queries=2)
+    config = api.get("/system/config", max_queries=2)
+    assert settings.headers["cache-control"] == "public, no-cache"
+    revalidate(api, "/settings/public", settings.headers["etag"], max_queries=1)
+    revalidate(api, "/system/config", config.headers["etag"], max_queries=1)
+
+    api.put("/admin/settings", json={"settings": {"app_name": "Bakehouse"}}, headers=admin_headers, max_queries=8, max_rows=20)
+    response = api.get("/settings/public", headers={"If-None-Match": settings.headers["etag"]}, max_queries=2)
+    assert response.json()["app_name"] == "Bakehouse"
+
+    changelog = api.get("/system/changelog", max_queries=0)
+    revalidate(api, "/system/changelog", changelog.headers["etag"], max_queries=0)
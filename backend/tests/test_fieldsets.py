@@ -0,0 +1,75 @@
+from fieldsets import RecipeFieldset
+
+
+def test_recipe_detail_fields(api, alice_headers, recipe_of):
+    recipe = recipe_of("alice", 1)
+    path = f"/recipes/{recipe.id}"
+    full = api.get(path, headers=alice_headers, max_queries=3, max_rows=30)
+
+    # What the planner needs: step durations, without ingredients, ratings or favorites
+    planner = api.get(path, params={"fields": "title,reference_temperature", "include": "chapters.steps"},
+                      headers=alice_headers, max_queries=3, max_rows=12)
+    data = planner.json()
+    assert set(data) == {"id", "title", "reference_temperature", "chapters"}
+    assert all(set(chapter) == {"id", "recipe_id", "name", "order_index", "steps"} for chapter in data["chapters"])
+    assert [step["duration_min"] for chapter in data["chapters"] for step in chapter["steps"]] == [
+        step["duration_min"] for chapter in full.json()["chapters"] for step in chapter["steps"]]
+    # Another representation, another tag
+    assert planner.headers["etag"] != full.headers["etag"]
+    api.get(path, params={"fields": "title,reference_temperature", "include": "chapters.steps"},
+            headers={**alice_headers, "If-None-Match": planner.headers["etag"]}, max_queries=2, status=304)
+
+    data = api.get(path, params={"fields": "image_srcset,author"}, headers=alice_headers, max_queries=3).json()
+    assert set(data) == {"id", "image_srcset", "author"} and data["author"] == "alice"
+
+    data = api.get(path, params={"include": "ingredient_overview"}, headers=alice_headers, max_queries=3).json()
+    assert "chapters" not in data and data["ingredient_overview"] and data["title"] == recipe.title
+
+    api.get(path, params={"fields": "title,password"}, headers=alice_headers, max_queries=2, status=400)
+    api.get(path, params={"include": "chapters.ratings"}, headers=alice_headers, max_queries=2, status=400)
+
+
+def test_recipe_list_fields(api, alice_headers):
+    params = {"tab": "my_recipes", "limit": 15}
+    full = api.get("/recipes", params=params, headers=alice_headers, max_queries=8, max_rows=300).json()
+
+    # No collections: just the count and the recipes
+    page = api.get("/recipes", params={**params, "fields": "id,title"}, headers=alice_headers, max_queries=3, max_rows=20).json()
+    assert page["total"] == full["total"]
+    assert page["items"] == [{"id": item["id"], "title": item["title"]} for item in full["items"]]
+
+    page = api.get("/recipes", params={**params, "fields": "title", "include": "chapters.steps"},
+                   headers=alice_headers, max_queries=5, max_rows=150).json()
+    assert all(set(chapter) == {"id", "recipe_id", "name", "order_index", "steps"} for item in page["items"] for chapter in item["chapters"])
+
+    # The overview is only computed for the detail
+    api.get("/recipes", params={**params, "include": "ingredient_overview"}, headers=alice_headers, max_queries=2, status=400)
+    api.get("/recipes", params={**params, "fields": "title,ingredient_overview"}, headers=alice_headers, max_queries=2, status=400)
+
+    # Sorting by rating loads the ratings even if they aren't returned
+    page = api.get("/recipes", params={**params, "fields": "id", "sort_by": "rating"}, headers=alice_headers, max_queries=4).json()
+    assert all(set(item) == {"id"} for item in page["items"])
+
+
+def test_fieldset_parsing():
+    assert RecipeFieldset().full and RecipeFieldset().key == ""
+
+    fieldset = RecipeFieldset("title, chapters", None)
+    assert fieldset.fields == {"id", "title", "chapters"}
+    assert fieldset.chapter_collections == {"ingredients", "steps"}
+
+    fieldset = RecipeFieldset(None, "chapters.steps")
+    assert "chapters" in fieldset.fields and "ingredient_overview" not in fieldset.fields and "author" in fieldset.fields
+    assert fieldset.chapter_collections == {"steps"}
+    assert RecipeFieldset("title", "chapters").key != RecipeFieldset("title", "chapters.steps").key
+
+
+def test_fieldset_models_are_cached_per_normalized_fieldset():
+    from fieldsets import _adapters
+
+    adapter = RecipeFieldset("title,reference_temperature", "chapters.steps").adapter()
+    misses = _adapters.cache_info().misses
+    # Same fieldset, spelled differently
+    assert RecipeFieldset(" reference_temperature,title,title,id ", "chapters.steps,chapters.steps").adapter() is adapter
+    assert _adapters.cache_info().misses == misses
+
@@ -0,0 +1,87 @@
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+import models
+from conftest import WORK_DIR
+from generate_dataset import clear, generate
+
+TABLES = [models.User, models.Recipe, models.Chapter, models.Ingredient, models.Step,
+          models.Rating, models.Favorite, models.UserSession, models.Schedule]
+
+
+def generated_database(name, seed):
+    engine = create_engine(f"sqlite:///{os.path.join(WORK_DIR, name)}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(models.Role.__table__.insert(), [{"id": "user-role", "name": "User", "permissions": []}])
+        counts = generate(conn, users=20, recipes=60, seed=seed, reference_date=date(2025, 1, 1), batch_size=50)
+    return engine, counts
+
+
+def dump(engine):
+    with engine.connect() as conn:
+        return {
+            # bcrypt salts the (shared) password hash randomly
+            model.__tablename__: conn.execute(
+                select(*[c for c in model.__table__.columns if c.name != "hashed_password"])
+                .order_by(*model.__table__.primary_key.columns)
+            ).all()
+            for model in TABLES
+        }
+
+
+def test_same_seed_gives_same_dataset():
+    first, counts = generated_database("generated-a.db", seed=7)
+    second, _ = generated_database("generated-b.db", seed=7)
+    other, _ = generated_database("generated-c.db", seed=8)
+
+    assert counts["users"] == 20 and counts["recipes"] == 60
+    assert counts["chapters"] >= 60 and counts["ingredients"] >= 2 * counts["chapters"]
+    assert dump(first) == dump(second)
+    assert dump(first)["recipes"] != dump(other)["recipes"]
+
+
+def test_refuses_to_generate_twice_and_clears():
+    engine, counts = generated_database("generated-d.db", seed=1)
+    with engine.begin() as conn:
+        with pytest.raises(RuntimeError):
+            generate(conn, users=1, recipes=1)
+        assert clear(conn) == counts["users"]
+        for model in TABLES:
+            assert conn.execute(select(func.count()).select_from(model)).scalar() == 0
+
+
+def test_clear_keeps_real_users_and_unlinks_their_rows():
+    engine, counts = generated_database("generated-e.db", seed=2)
+    users = models.User.__table__
+    with engine.begin() as conn:
+        generated = dict(conn.execute(select(users.c.username, users.c.id)).all())
+        target = conn.execute(select(models.Recipe.id).where(models.Recipe.user_id == generated["loadtest000000"])).scalars().first()
+        # Real accounts that start with the prefix, or match it with "_" as a LIKE wildcard
+        conn.execute(users.insert(), [
+            {"id": "real-1", "username": "loadtester", "email": "tester@example.com", "version": 1},
+            {"id": "real-2", "username": "loadXtest000001", "email": "other@example.com", "version": 1},
+        ])
+        conn.execute(models.Recipe.__table__.insert(), [{"id": "11111111-1111-1111-1111-111111111111", "user_id": "real-1", "title": "Mine"}])
+        conn.execute(models.Chapter.__table__.insert(), [{"id": "22222222-2222-2222-2222-222222222222",
+                                                          "recipe_id": "11111111-1111-1111-1111-111111111111", "name": "Main"}])
+        conn.execute(models.Ingredient.__table__.insert(), [{"chapter_id": "22222222-2222-2222-2222-222222222222",
+                                                             "name": {"en": "Starter"}, "amount": 100, "linked_recipe_id": target}])
+        conn.execute(models.ImportJob.__table__.insert(), [
+            {"id": "job-real", "user_id": "real-1", "recipe_id": target},
+            {"id": "job-generated", "user_id": generated["loadtest000001"], "recipe_id": None},
+        ])
+        conn.execute(models.VerificationToken.__table__.insert(), [{"token": "token", "user_id": generated["loadtest000002"]}])
+
+    with engine.begin() as conn:
+        assert clear(conn, batch_size=7) == counts["users"]
+        assert clear(conn, "load_test") == 0
+    with engine.connect() as conn:
+        assert sorted(conn.execute(select(users.c.username)).scalars()) == ["loadXtest000001", "loadtester"]
+        assert conn.execute(select(models.Recipe.title, models.Recipe.version)).all() == [("Mine", 2)]
+        assert conn.execute(select(models.Ingredient.linked_recipe_id)).scalars().all() == [None]
+        assert conn.execute(select(models.ImportJob.id, models.ImportJob.recipe_id)).all() == [("job-real", None)]
+        assert conn.execute(select(func.count()).select_from(models.VerificationToken)).scalar() == 0
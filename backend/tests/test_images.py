@@ -0,0 +1,112 @@
+import socket
+
+import pytest
+
+import images
+
+PUBLIC_ADDRESS = "93.184.216.34"
+
+
+def fake_getaddrinfo(hosts):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (hosts.get(host, host), port))]
+    return getaddrinfo
+
+
+class RedirectResponse:
+    is_redirect = True
+
+    def __init__(self, location):
+        self.headers = {"Location": location}
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/image.jpg",
+    "http://10.0.0.5/image.jpg",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/image.jpg",
+    "http://[::ffff:127.0.0.1]/image.jpg",
+    "file:///etc/passwd",
+])
+def test_check_public_url_rejects_non_public_targets(url):
+    with pytest.raises(ValueError):
+        images.check_public_url(url)
+
+
+def test_check_public_url_resolves_hostnames(monkeypatch):
+    monkeypatch.setattr(images.socket, "getaddrinfo", fake_getaddrinfo({"cdn.example.com": PUBLIC_ADDRESS, "internal.example.com": "192.168.1.10"}))
+    images.check_public_url("https://cdn.example.com/bread.jpg")
+    with pytest.raises(ValueError):
+        images.check_public_url("https://internal.example.com/bread.jpg")
+
+
+def test_download_image_checks_redirect_targets(monkeypatch):
+    import requests
+
+    requested = []
+
+    def get(url, **kwargs):
+        assert kwargs["allow_redirects"] is False
+        requested.append(url)
+        return RedirectResponse("http://169.254.169.254/latest/meta-data/")
+
+    monkeypatch.setattr(images.socket, "getaddrinfo", fake_getaddrinfo({"cdn.example.com": PUBLIC_ADDRESS}))
+    monkeypatch.setattr(requests, "get", get)
+    with pytest.raises(ValueError, match="non-public"):
+        images.download_image("https://cdn.example.com/bread.jpg")
+    assert requested == ["https://cdn.example.com/bread.jpg"]
+
+
+def make_image(width, height):
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 150, 100)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("width, expected", [
+    (2000, ["thumb 160w", "card 480w", "hero 1200w"]),
+    (800, ["thumb 160w", "card 480w", "hero 800w"]),
+    (300, ["thumb 160w", "card 300w"]),
+    (100, ["thumb 100w"]),
+])
+def test_srcset_uses_real_rendition_widths(width, expected):
+    content_hash = f"srcset{width:026d}"
+    urls = images.generate_renditions(make_image(width, width // 2), content_hash)
+
+    srcset = images.rendition_srcset(f"https://bakery.example.com{urls['hero']}")
+    prefix = f"https://bakery.example.com/static/uploads/{content_hash}"
+    assert srcset == ", ".join(f"{prefix}_{name}.webp {descriptor}" for name, descriptor in (e.split() for e in expected))
+
+
+def test_srcset_ignores_other_urls():
+    assert images.rendition_srcset(None) is None
+    assert images.rendition_srcset("https://example.com/bread_hero.webp") is None
+    # A rendition URL whose files don't exist (yet) gets no srcset
+    assert images.rendition_srcset("/static/uploads/0123456789abcdef_hero.webp") is None
+
+
+def test_reimport_keeps_renditions_alive(monkeypatch, db):
+    import os
+    import time
+    from uploads import UPLOAD_DIR, collect_garbage
+
+    monkeypatch.setattr(images, "download_image", lambda url: make_image(640, 480))
+    hero_url = images.ingest_remote_image_sync("https://cdn.example.com/bread.jpg")
+    key = hero_url.rsplit("/", 1)[1].split("_")[0]
+    names = sorted(name for name in os.listdir(UPLOAD_DIR) if name.startswith(key))
+    assert len(names) == 2 * len(images.RENDITIONS)
+
+    # Imported once and left unreferenced past the grace period, then previewed again
+    aged = time.time() - 2 * 3600
+    for name in names:
+        os.utime(os.path.join(UPLOAD_DIR, name), (aged, aged))
+    assert images.ingest_remote_image_sync("https://cdn.example.com/bread.jpg") == hero_url
+
+    collect_garbage(db, grace_seconds=3600)
+    assert sorted(name for name in os.listdir(UPLOAD_DIR) if name.startswith(key)) == names
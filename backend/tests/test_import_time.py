@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from conftest import WORK_DIR
+from import_profile import IMPORT_BUDGET_MS, LAZY_MODULES, check_budget, loaded_lazy_modules, profile_import
+
+
+def test_import_main_loads_no_lazy_modules():
+    profile = profile_import("main", runs=1, cwd=WORK_DIR)
+
+    assert loaded_lazy_modules(profile) == []
+
+
+# Wall-clock time depends on the machine and its load: only checked when a budget is set
+@pytest.mark.skipif(not os.getenv("IMPORT_BUDGET_MS"), reason="set IMPORT_BUDGET_MS to check the import time budget")
+def test_import_main_is_within_budget():
+    profile = profile_import("main", runs=2, cwd=WORK_DIR)
+
+    assert check_budget(profile, IMPORT_BUDGET_MS) == []
+
+
+def test_eagerly_imported_lazy_module_fails_the_check():
+    profile = profile_import("smtplib", runs=1, cwd=WORK_DIR)
+
+    assert "smtplib" in LAZY_MODULES
+    assert loaded_lazy_modules(profile) == ["smtplib"]
+    assert len(check_budget(profile, float("inf"))) == 1
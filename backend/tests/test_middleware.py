@@ -0,0 +1,169 @@
+import os
+import gzip
+import asyncio
+import zlib
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+import bench_middleware
+from middleware import CompressionMiddleware, negotiate_encoding
+from static_files import IMMUTABLE_CACHE_CONTROL, STATIC_CACHE_CONTROL, precompress_file
+
+
+def test_headers_on_every_response(client):
+    response = client.get("/system/version", headers={"X-Request-ID": "probe-1"})
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["x-frame-options"] == "DENY"
+    assert response.headers["x-request-id"] == "probe-1"
+    assert "server-timing" not in response.headers
+
+
+def test_metrics_middleware_is_outermost():
+    import main
+    from metrics import MetricsMiddleware
+
+    # user_middleware lists the outermost middleware first
+    assert main.app.user_middleware[0].cls is MetricsMiddleware
+
+
+def test_server_timing_only_in_debug_mode(client):
+    import logging
+    from logger import logger
+
+    level = logger.level
+    logger.setLevel(logging.DEBUG)
+    try:
+        response = client.get("/system/version")
+    finally:
+        logger.setLevel(level)
+    assert response.headers["server-timing"].startswith("app;dur=")
+
+
+def test_large_json_is_compressed(client, alice_headers):
+    response = client.get("/recipes?limit=20", headers={**alice_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json()["items"]
+
+    response = client.get("/recipes?limit=20", headers={**alice_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_brotli_is_preferred(client, alice_headers):
+    pytest.importorskip("brotli")
+    response = client.get("/recipes?limit=20", headers={**alice_headers, "Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json()["items"]
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert negotiate_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("identity", ("br", "gzip")) is None
+
+
+def test_static_files_are_served_precompressed(client):
+    svg = b'<svg xmlns="http://www.w3.org/2000/svg">' + b'<circle r="1"/>' * 200 + b"</svg>"
+    hashed = "0123456789abcdef0123456789abcdef.svg"
+    for name in (hashed, "logo.svg"):
+        with open(os.path.join("static", "uploads", name), "wb") as f:
+            f.write(svg)
+    written = precompress_file(os.path.join("static", "uploads", hashed))
+    assert os.path.join("static", "uploads", hashed + ".gz") in written
+
+    response = client.get(f"/static/uploads/{hashed}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "image/svg+xml"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.content == svg
+
+    response = client.get(f"/static/uploads/{hashed}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers and response.content == svg
+
+    # Revalidation works on the compressed representation, which has its own ETag
+    etag = client.get(f"/static/uploads/{hashed}", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    assert etag != response.headers["etag"]
+    response = client.get(f"/static/uploads/{hashed}", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/static/uploads/logo.svg", headers={"Accept-Encoding": "identity"})
+    assert response.headers["cache-control"] == STATIC_CACHE_CONTROL
+
+
+async def _stream():
+    for i in range(3):
+        yield f"line {i} ".encode() * 200
+
+
+def _asgi_messages(app, path):
+    messages = []
+
+    requested = []
+
+    async def receive():
+        if requested:
+            # Nothing more to read: wait like a client that stays connected
+            await asyncio.Event().wait()
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "root_path": "", "scheme": "http", "headers": [(b"accept-encoding", b"gzip")], "server": ("test", 80)}
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_streaming_responses_stay_streamed():
+    app = CompressionMiddleware(Starlette(routes=[
+        Route("/text", lambda request: StreamingResponse(_stream(), media_type="text/plain")),
+        Route("/zip", lambda request: StreamingResponse(_stream(), media_type="application/zip")),
+        Route("/small", lambda request: PlainTextResponse("ok")),
+    ]))
+
+    # Every chunk is flushed on its own and the chunks form one gzip stream
+    start, *chunks = _asgi_messages(app, "/text")
+    assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+    assert len([chunk for chunk in chunks if chunk["body"]]) >= 3
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(chunks[0]["body"]).startswith(b"line 0 ")
+    assert gzip.decompress(b"".join(chunk["body"] for chunk in chunks)) == b"".join(
+        f"line {i} ".encode() * 200 for i in range(3))
+
+    for path in ("/zip", "/small"):
+        start, *_ = _asgi_messages(app, path)
+        assert b"content-encoding" not in dict(start["headers"])
+
+
+def test_benchmark_stacks():
+    results = asyncio.run(bench_middleware.run("/recipes", requests=3, rounds=1, username="alice"))
+    assert set(results) == {"none", "before", "after"}
+
+
+def test_failed_statements_do_not_skew_query_timing(monkeypatch):
+    from sqlalchemy import create_engine, exc, text
+    import query_stats
+
+    engine = create_engine("sqlite://")
+    query_stats.instrument_queries(engine)
+    durations = []
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 0.000001)
+    monkeypatch.setattr(query_stats.logger, "warning", lambda message: durations.append(float(message.split("(")[1].split("ms")[0])))
+
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert "query_start" not in conn.info
+
+    # Only the successful statement is timed, against its own start
+    assert len(durations) == 1 and durations[0] < 1000
+
@@ -0,0 +1,167 @@
+import io
+
+from conftest import RECIPES_PER_USER, CHAPTERS_PER_RECIPE
+
+
+def recipe_payload(title="Sourdough", chapters=2):
+    return {
+        "title": title,
+        "yield_amount": 2,
+        "type": "baking",
+        "chapters": [
+            {
+                "name": f"Part {c}",
+                "order_index": c,
+                "ingredients": [
+                    {"name": {"en": "Flour", "de": "Mehl"}, "amount": 500, "unit": "g", "type": "flour"},
+                    {"name": {"en": "Water", "de": "Wasser"}, "amount": 350, "unit": "g", "type": "liquid"},
+                ],
+                "steps": [
+                    {"order_index": 0, "description": "Mix", "duration_min": 10, "type": "active"},
+                    {"order_index": 1, "description": "Rest", "duration_min": 60, "type": "passive"},
+                ],
+            }
+            for c in range(chapters)
+        ],
+    }
+
+
+def test_list_recipes(api, alice_headers):
+    response = api.get("/recipes?limit=12", headers=alice_headers, max_queries=8, max_rows=350)
+    page = response.json()
+    assert page["total"] == 2 * RECIPES_PER_USER
+    assert len(page["items"]) == 12
+    assert all(len(item["chapters"]) == CHAPTERS_PER_RECIPE for item in page["items"])
+
+
+def test_list_recipes_tabs_and_sorting(api, alice_headers):
+    response = api.get("/recipes?tab=my_recipes&sort_by=oldest", headers=alice_headers, max_queries=8, max_rows=350)
+    assert {item["author"] for item in response.json()["items"]} == {"alice"}
+
+    response = api.get("/recipes?tab=favorites&sort_by=rating", headers=alice_headers, max_queries=8, max_rows=350)
+    items = response.json()["items"]
+    assert items and all(item["is_favorited"] for item in items)
+
+    api.get("/recipes?tab=baking&sort_by=favorites", headers=alice_headers, max_queries=8, max_rows=350)
+    api.get("/recipes?search=Mehl&limit=5", headers=alice_headers, max_queries=8, max_rows=200)
+
+
+def test_list_recipes_requires_login_without_guest_access(api):
+    api.get("/recipes", max_queries=2, status=401)
+
+
+def test_read_recipe(api, alice_headers, recipe_of):
+    recipe = recipe_of("bob")
+    response = api.get(f"/recipes/{recipe.id}", headers=alice_headers, max_queries=4, max_rows=40)
+    body = response.json()
+    assert body["author"] == "bob"
+    assert body["is_favorited"] is True
+    assert body["ingredient_overview"]
+
+
+def test_read_missing_recipe(api, alice_headers):
+    api.get("/recipes/00000000-0000-0000-0000-000000000000", headers=alice_headers, max_queries=3, status=404)
+
+
+def inserted_rows(payload):
+    # Writes scale with the payload (one INSERT per row on SQLite), reads must not
+    return sum(1 + len(c["ingredients"]) + len(c["steps"]) for c in payload["chapters"])
+
+
+def test_create_update_delete_recipe(api, alice_headers):
+    payload = recipe_payload()
+    response = api.post("/recipes/", json=payload, headers=alice_headers, max_queries=7 + inserted_rows(payload), max_rows=30)
+    recipe_id = response.json()["id"]
+    assert len(response.json()["ingredient_overview"]) == 2
+
+    payload = recipe_payload("Rye", chapters=3)
+    response = api.put(f"/recipes/{recipe_id}", json=payload, headers=alice_headers, max_queries=13 + inserted_rows(payload), max_rows=40)
+    assert response.json()["title"] == "Rye"
+    assert len(response.json()["chapters"]) == 3
+
+    api.delete(f"/recipes/{recipe_id}", headers=alice_headers, max_queries=20, max_rows=40)
+
+
+def test_update_foreign_recipe_is_forbidden(api, viewer_headers, recipe_of):
+    recipe = recipe_of("alice")
+    api.put(f"/recipes/{recipe.id}", json=recipe_payload(), headers=viewer_headers, max_queries=3, status=403)
+
+
+def test_plan_recipe(api, alice_headers, recipe_of):
+    recipe = recipe_of("alice")
+    response = api.post(f"/recipes/{recipe.id}/plan?start_time=2024-06-01T08:00:00", headers=alice_headers, max_queries=5, max_rows=20)
+    assert len(response.json()) == 6
+
+
+def test_favorite_and_rate(api, bob_headers, recipe_of):
+    recipe = recipe_of("alice", 1)
+    assert api.post(f"/recipes/{recipe.id}/favorite", headers=bob_headers, max_queries=6).json() is True
+    assert api.post(f"/recipes/{recipe.id}/favorite", headers=bob_headers, max_queries=6).json() is False
+    average = api.post(f"/recipes/{recipe.id}/rate", json={"score": 1}, headers=bob_headers, max_queries=6).json()
+    assert average == 2.0
+
+
+def test_check_url(api, alice_headers):
+    response = api.post("/recipes/check-url", json={"url": "https://example.com/alice/3"}, headers=alice_headers, max_queries=3)
+    assert response.json()["exists"] is True
+
+
+def test_import_url_of_existing_recipe(api, alice_headers):
+    # Duplicates are detected before scraping, so this needs no network access
+    api.post("/import/url", json={"url": "https://example.com/alice/3"}, headers=alice_headers, max_queries=3, status=409)
+
+
+def test_import_image_requires_file(api, alice_headers):
+    api.post("/import/image", headers=alice_headers, max_queries=2, status=422)
+
+
+def test_upload(api, alice_headers):
+    from PIL import Image
+
+    image = io.BytesIO()
+    Image.new("RGB", (64, 48), "orange").save(image, format="PNG")
+    response = api.post(
+        "/upload",
+        files={"file": ("bread.png", image.getvalue(), "image/png")},
+        headers=alice_headers,
+        max_queries=2,
+    )
+    assert "/static/uploads/" in response.json()["original_url"]
+
+
+def test_reupload_keeps_renditions_alive(api, alice_headers, db):
+    import os
+    import time
+    from PIL import Image
+    from uploads import UPLOAD_DIR, collect_garbage
+
+    image = io.BytesIO()
+    Image.new("RGB", (64, 48), "purple").save(image, format="PNG")
+
+    def upload():
+        return api.post("/upload", files={"file": ("bread.png", image.getvalue(), "image/png")}, headers=alice_headers, max_queries=2).json()
+
+    key = upload()["original_url"].rsplit("/", 1)[1].split(".")[0]
+    names = [name for name in os.listdir(UPLOAD_DIR) if name.startswith(key)]
+    assert len(names) > 1
+
+    # Past the grace period, then the same bytes are uploaded again (e.g. for a new recipe)
+    aged = time.time() - 2 * 3600
+    for name in names:
+        os.utime(os.path.join(UPLOAD_DIR, name), (aged, aged))
+    hero_url = upload()["url"]
+
+    collect_garbage(db, grace_seconds=3600)
+    assert sorted(name for name in os.listdir(UPLOAD_DIR) if name.startswith(key)) == sorted(names)
+    assert api.client.get(hero_url.split("testserver", 1)[1]).status_code == 200
+
+
+def test_calculate_schedule(api, alice_headers, recipe_of):
+    recipe = recipe_of("alice")
+    response = api.post(
+        f"/schedule/calculate?recipe_id={recipe.id}&target_time=2024-06-01T18:00:00",
+        headers=alice_headers,
+        max_queries=5,
+        max_rows=20,
+    )
+    assert len(response.json()["steps"]) == CHAPTERS_PER_RECIPE * 3
@@ -0,0 +1,22 @@
+import pytest
+
+import main
+from conftest import covered_routes
+
+
+def test_every_route_has_a_query_budget():
+    """
+    Every API route is called by at least one test with query and row bounds. Runs last
+    (see conftest) and only makes sense together with the rest of the suite.
+    """
+    if not covered_routes:
+        pytest.skip("run together with the other tests")
+    routes = {
+        (method, route.path)
+        for route in main.app.routes
+        for method in getattr(route, "methods", None) or ()
+        if method != "HEAD"
+    }
+    documentation = {"/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc"}
+    missing = sorted(r for r in routes - covered_routes if r[1] not in documentation)
+    assert not missing, f"Routes without a budgeted test: {missing}"
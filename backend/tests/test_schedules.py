@@ -0,0 +1,44 @@
+from conftest import SCHEDULES_PER_USER
+
+
+def test_list_schedules(api, alice_headers):
+    response = api.get("/schedules", headers=alice_headers, max_queries=6, max_rows=250)
+    schedules = response.json()
+    assert len(schedules) == SCHEDULES_PER_USER
+    assert all(schedule["recipe"]["chapters"] for schedule in schedules)
+
+
+def test_list_schedules_in_range(api, alice_headers):
+    response = api.get(
+        "/schedules?start_date=2024-06-02T00:00:00Z&end_date=2024-06-04T00:00:00Z",
+        headers=alice_headers,
+        max_queries=6,
+        max_rows=100,
+    )
+    assert len(response.json()) == 3
+
+
+def test_create_update_delete_schedule(api, alice_headers, recipe_of):
+    recipe = recipe_of("alice", 2)
+    payload = {
+        "recipe_id": str(recipe.id),
+        "target_time": "2024-07-01T18:00:00",
+        "start_time": "2024-07-01T12:00:00",
+        "title": "Sunday bread",
+    }
+    response = api.post("/schedules", json=payload, headers=alice_headers, max_queries=12, max_rows=40)
+    schedule_id = response.json()["id"]
+    assert response.json()["recipe"]["title"] == recipe.title
+
+    payload["title"] = "Monday bread"
+    response = api.put(f"/schedules/{schedule_id}", json=payload, headers=alice_headers, max_queries=12, max_rows=40)
+    assert response.json()["title"] == "Monday bread"
+
+    api.delete(f"/schedules/{schedule_id}", headers=alice_headers, max_queries=5)
+
+
+def test_schedules_of_other_users_are_hidden(api, bob_headers, db):
+    import models
+
+    schedule = db.query(models.Schedule).first()
+    api.delete(f"/schedules/{schedule.id}", headers=bob_headers, max_queries=3, status=404)
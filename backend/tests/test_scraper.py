@@ -0,0 +1,186 @@
+import asyncio
+
+import scraper
+
+RECIPE_HTML = '<html><script type="application/ld+json">{"@type": "Recipe", "name": "Bread"}</script></html>'
+SHELL_HTML = '<html><body><div id="root"></div></body></html>'
+RENDERED_HTML = "<html><body>" + "Knead the dough and let it rise. " * 30 + "</body></html>"
+
+
+class StubPage:
+    def __init__(self, context):
+        self.context = context
+
+    def set_default_timeout(self, timeout_ms):
+        pass
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        browser = self.context.browser
+        browser.open_pages += 1
+        browser.max_open_pages = max(browser.max_open_pages, browser.open_pages)
+        try:
+            if browser.gate is not None:
+                await browser.gate.wait()
+            else:
+                await asyncio.sleep(0.01)
+        finally:
+            browser.open_pages -= 1
+        if not browser.is_connected():
+            raise RuntimeError("Target page, context or browser has been closed")
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    async def content(self):
+        return RENDERED_HTML
+
+    async def close(self):
+        pass
+
+
+class StubContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        return StubPage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class StubBrowser:
+    """
+    Stands in for a remote Chromium: counts the contexts it hands out and the pages loading
+    at the same time. A browser crash is simulated by setting `connected` to False.
+    """
+
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+        self.open_pages = 0
+        self.max_open_pages = 0
+        self.gate = None
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, user_agent=None):
+        context = StubContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class StubChromium:
+    def __init__(self):
+        self.browsers = []
+
+    async def connect_over_cdp(self, endpoint):
+        browser = StubBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+class StubPlaywright:
+    def __init__(self):
+        self.chromium = StubChromium()
+
+    async def stop(self):
+        pass
+
+
+def make_pool(size=2):
+    pool = scraper.BrowserPool("ws://renderer.invalid", size=size, page_timeout_ms=2000)
+    pool._playwright = StubPlaywright()
+    return pool
+
+
+def test_has_recipe_content():
+    assert scraper.has_recipe_content(scraper.html_to_text(RECIPE_HTML))
+    assert scraper.has_recipe_content(scraper.html_to_text(RENDERED_HTML))
+    assert not scraper.has_recipe_content(scraper.html_to_text(SHELL_HTML))
+    assert not scraper.has_recipe_content("")
+
+
+def test_scrape_renders_only_without_static_recipe_content(monkeypatch):
+    rendered = []
+
+    async def render_html(url):
+        rendered.append(url)
+        return RENDERED_HTML
+
+    monkeypatch.setattr(scraper, "render_html", render_html)
+    monkeypatch.setattr(scraper, "get_browser_pool", lambda: object())
+
+    async def static_recipe(url):
+        return RECIPE_HTML
+
+    monkeypatch.setattr(scraper, "fetch_html", static_recipe)
+    assert "JSON-LD" in asyncio.run(scraper.scrape_url("https://example.com/recipe"))
+    assert rendered == []
+
+    async def static_shell(url):
+        return SHELL_HTML
+
+    monkeypatch.setattr(scraper, "fetch_html", static_shell)
+    assert "Knead the dough" in asyncio.run(scraper.scrape_url("https://example.com/app"))
+    assert rendered == ["https://example.com/app"]
+
+    # Without a configured renderer the static result is returned as is
+    monkeypatch.setattr(scraper, "get_browser_pool", lambda: None)
+    assert asyncio.run(scraper.scrape_url("https://example.com/app")) == ""
+    assert len(rendered) == 1
+
+
+def test_pool_reuses_a_bounded_number_of_contexts():
+    pool = make_pool(size=2)
+
+    async def run():
+        results = await asyncio.gather(*(pool.render(f"https://example.com/{n}") for n in range(6)))
+        return results, pool._contexts.qsize()
+
+    results, idle = asyncio.run(run())
+    browser, = pool._playwright.chromium.browsers
+    assert all("Knead the dough" in html for html in results)
+    assert len(browser.contexts) == 2
+    assert browser.max_open_pages == 2
+    assert idle == 2
+
+
+def test_pool_reconnects_after_browser_crash():
+    pool = make_pool(size=2)
+
+    async def run():
+        await pool.render("https://example.com/first")
+        old = pool._browser
+
+        # A render is in flight when the browser crashes
+        old.gate = asyncio.Event()
+        in_flight = asyncio.create_task(pool.render("https://example.com/in-flight"))
+        await asyncio.sleep(0)
+        old.connected = False
+
+        assert "Knead the dough" in await pool.render("https://example.com/after-crash")
+        new = pool._browser
+        assert new is not old
+
+        old.gate.set()
+        try:
+            await in_flight
+        except RuntimeError:
+            pass
+        return old, new, pool._contexts.qsize()
+
+    old, new, idle = asyncio.run(run())
+    assert len(pool._playwright.chromium.browsers) == 2
+    # The in-flight context of the crashed browser is closed and not put into the new pool
+    assert sum(context.closed for context in old.contexts) == 1
+    assert len(new.contexts) == 2
+    assert idle == 2
@@ -0,0 +1,65 @@
+import json
+import uuid
+from datetime import datetime
+
+import models
+import schemas
+import serialization
+import bench_serialization
+
+
+def test_dumps_without_jsonable_encoder(monkeypatch):
+    recipe_id = uuid.uuid4()
+    content = {
+        "id": recipe_id,
+        "created_at": datetime(2026, 1, 2, 3, 4, 5),
+        "type": models.RecipeCategory.baking,
+        "step": schemas.StepCreate(order_index=0, description="Knead", duration_min=10, type=list(models.StepType)[0]),
+        1: "non-string key",
+    }
+    expected = {
+        "id": str(recipe_id),
+        "created_at": "2026-01-02T03:04:05",
+        "type": "baking",
+        "step": {"order_index": 0, "description": "Knead", "duration_min": 10, "type": list(models.StepType)[0].value, "temperature": None},
+        "1": "non-string key",
+    }
+    assert json.loads(serialization.dumps(content)) == expected
+
+    # Without orjson the stdlib encoder produces the same JSON
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(serialization.dumps(content)) == expected
+    assert serialization.FastJSONResponse(content).headers["content-type"] == "application/json"
+
+
+def test_catalog_response_is_reused_per_etag():
+    loads = []
+
+    def load():
+        loads.append(True)
+        return [models.Unit(id=len(loads), name="gram")]
+
+    first = serialization.catalog_response(serialization.UNITS, '"test-units-1"', load)
+    assert serialization.catalog_response(serialization.UNITS, '"test-units-1"', load).body == first.body
+    assert len(loads) == 1
+    assert json.loads(first.body)[0]["name"] == {"en": {"singular": "gram", "plural": "gram"}, "de": {"singular": "gram", "plural": "gram"}}
+
+    serialization.catalog_response(serialization.UNITS, '"test-units-2"', load)
+    assert len(loads) == 2
+
+
+def test_responses_match_the_response_models(api, alice_headers, recipe_of):
+    recipe = recipe_of("alice", 1)
+    detail = api.get(f"/recipes/{recipe.id}", headers=alice_headers, max_queries=4).json()
+    assert schemas.Recipe.model_validate(detail).id == recipe.id
+    assert detail["author"] == "alice" and detail["ingredient_overview"]
+
+    page = api.get("/recipes", params={"tab": "my_recipes", "limit": 5}, headers=alice_headers, max_queries=8).json()
+    assert len(page["items"]) == 5 and page["total"] >= 5
+    assert schemas.RecipePage.model_validate(page).items[0].author == "alice"
+
+
+def test_benchmark():
+    results = bench_serialization.run(recipes=3, catalog_items=10, repeat=2)
+    assert set(results["recipe_page"]) == {"encoder", "adapter"}
+    assert set(results["catalog"]) == {"encoder", "adapter", "cached"}
@@ -0,0 +1,177 @@
+import main
+
+
+def test_root_and_public_endpoints(api):
+    api.get("/", max_queries=0)
+    assert api.get("/system/init-status", max_queries=1).json() == {"initialized": True}
+    api.get("/system/version", max_queries=0)
+    api.get("/system/changelog", max_queries=0)
+    api.get("/settings/public", max_queries=2)
+    api.get("/system/config", max_queries=2)
+    api.get("/admin/system/info", max_queries=2)
+
+
+def test_init_only_once(api):
+    payload = {"admin_username": "root", "admin_email": "root@example.com", "admin_password": "pw", "app_name": "Test"}
+    api.post("/system/init", json=payload, max_queries=1, status=400)
+
+
+def test_health_and_readiness(api, monkeypatch):
+    import asyncio
+    import health
+
+    monkeypatch.setitem(health._cache, "result", None)
+    api.get("/healthz", max_queries=0)
+
+    # The database and the AI key are checked once, then served from the cache
+    body = api.get("/readyz", max_queries=2).json()
+    assert body["ready"] and set(body["checks"]) == {"database", "scraper", "ai", "worker"}
+    assert body["checks"]["database"]["status"] == "online"
+    # Startup hooks don't run in the tests, so there is no heartbeat
+    assert body["status"] == "degraded" and body["checks"]["worker"]["status"] == "offline"
+    assert api.get("/readyz", max_queries=0).json() == body
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    monkeypatch.setitem(health._cache, "result", None)
+    monkeypatch.setattr(health, "HEALTH_CHECK_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setitem(health.CHECKS, "database", hanging)
+    body = api.get("/readyz", max_queries=1, status=503).json()
+    assert body["status"] == "unavailable" and "timed out" in body["checks"]["database"]["detail"]
+
+
+def test_hung_blocking_check_uses_one_thread(monkeypatch):
+    import asyncio
+    import threading
+    import health
+
+    release = threading.Event()
+    calls = []
+
+    def hung_database():
+        calls.append(1)
+        release.wait(5)
+        return "online", None
+
+    monkeypatch.setattr(health, "HEALTH_CHECK_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setitem(health.CHECKS, "database", hung_database)
+
+    async def probe_three_times():
+        try:
+            return [await health.readiness(force=True) for _ in range(3)]
+        finally:
+            release.set()
+
+    results = asyncio.run(probe_three_times())
+    assert all("timed out" in result["checks"]["database"]["detail"] for result in results)
+    # Later probes wait for the call that is still running instead of starting more threads
+    assert len(calls) == 1
+
+
+def test_worker_check_reports_event_loop_lag(monkeypatch):
+    import asyncio
+    import time
+    import health
+
+    monkeypatch.setattr(health, "_last_heartbeat", time.monotonic())
+    assert asyncio.run(health.check_worker()) == ("online", None)
+
+    monkeypatch.setattr(health, "_loop_lag", 3.0)
+    status, detail = asyncio.run(health.check_worker())
+    assert status == "offline" and "lagged 3.0s" in detail
+
+
+def test_metrics(api):
+    response = api.get("/metrics", max_queries=1)
+    assert b"http_requests_total" in response.content
+
+
+def test_settings(api, admin_headers):
+    response = api.put(
+        "/admin/settings",
+        json={"settings": {"app_name": "Bakery", "gemini_api_key": "abcdefgh"}},
+        headers=admin_headers,
+        max_queries=8,
+        max_rows=20,
+    )
+    assert response.json()["gemini_api_key"] == "abc****"
+    api.get("/admin/settings", headers=admin_headers, max_queries=2, max_rows=20)
+    api.get("/system/settings", headers=admin_headers, max_queries=3)
+
+
+def test_update_check_and_status(api, admin_headers, monkeypatch):
+    # PROJECT_ROOT is not a git checkout in the tests: the check reports an error instead of fetching
+    assert "error" in api.get("/system/check-update", headers=admin_headers, max_queries=2).json()
+    api.post("/admin/system/check-update", headers=admin_headers, max_queries=1)
+    api.get("/system/update-status", headers=admin_headers, max_queries=1)
+
+    # Never run the real update script: only the "already running" path
+    monkeypatch.setitem(main.update_process_state, "status", "running")
+    api.post("/system/update", headers=admin_headers, max_queries=1, status=400)
+
+
+def test_logs(api, admin_headers):
+    main.logger.info("test log record")
+    response = api.get("/admin/logs?lines=20&source=file", headers=admin_headers, max_queries=1)
+    assert "entries" in response.json()
+    # The stream itself never ends; an invalid filter is rejected before it starts
+    api.get("/admin/logs/stream?level=LOUD", headers=admin_headers, max_queries=1, status=400)
+
+
+def test_logs_from_memory_include_other_processes():
+    import time
+    from datetime import datetime
+    import logger
+    from log_reader import tail
+
+    def wait_for(message):
+        for _ in range(100):
+            if any(record["message"] == message for record in logger.ring_buffer.records):
+                return
+            time.sleep(0.01)
+        raise AssertionError(f"{message!r} was not logged")
+
+    logger.logger.info("written by this worker")
+    wait_for("written by this worker")
+    page = tail(5)
+    assert page["source"] == "memory" and page["entries"][-1]["message"] == "written by this worker"
+
+    # Another worker (or the scheduler) appends to the same file
+    with open(logger.LOG_FILE, "a") as f:
+        f.write(f"{datetime.now():%Y-%m-%d %H:%M:%S},000 - bakencook - INFO - written by another process\n")
+    page = tail(5)
+    assert page.get("source") != "memory" and page["entries"][-1]["message"] == "written by another process"
+
+    # Records of this worker after the foreign line are not contiguous with the older ones
+    logger.logger.info("written by this worker again")
+    wait_for("written by this worker again")
+    messages = [entry["message"] for entry in tail(5)["entries"]]
+    assert messages[-2:] == ["written by another process", "written by this worker again"]
+
+
+def test_email_test_without_reachable_server(api, admin_headers):
+    payload = {
+        "smtp_server": "127.0.0.1",
+        "smtp_port": 1,
+        "smtp_user": "user",
+        "smtp_password": "password",
+        "sender_email": "bakery@example.com",
+    }
+    api.post("/admin/system/email/test", json=payload, headers=admin_headers, max_queries=3, status=500)
+
+
+def test_cleanups(api, admin_headers):
+    api.delete("/auth/sessions/cleanup", headers=admin_headers, max_queries=2)
+    api.delete("/admin/system/uploads/cleanup", headers=admin_headers, max_queries=6)
+
+
+def test_automation(api, user_of):
+    from conftest import API_KEY, PASSWORD
+
+    credentials = {"auth": ("alice", PASSWORD), "headers": {"X-API-Key": API_KEY}}
+    api.post("/api/automation/import", json={"url": "https://example.com/new"}, max_queries=2, status=400, **credentials)
+
+    job = user_of("alice").import_jobs[0]
+    response = api.get(f"/api/automation/status/{job.id}", max_queries=2, **credentials)
+    assert response.json()["status"] == "completed"
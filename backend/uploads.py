@@ -0,0 +1,277 @@
+import os
+import re
+import time
+import hashlib
+import uuid
+import asyncio
+from typing import Optional, Set
+from fastapi import HTTPException, Request
+from sqlalchemy.orm import Session
+import models
+from logger import logger
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # older python-multipart releases
+    from multipart.multipart import MultipartParser, parse_options_header
+
+UPLOAD_DIR = "static/uploads"
+
+# Length of the hex sha256 prefix used as file key for uploads and image renditions
+CONTENT_KEY_LENGTH = 32
+
+# Unreferenced files younger than this are kept (e.g. uploaded but recipe not saved yet)
+UPLOAD_GC_GRACE_SECONDS = int(os.getenv("UPLOAD_GC_GRACE_HOURS", "24")) * 3600
+UPLOAD_GC_INTERVAL_SECONDS = int(os.getenv("UPLOAD_GC_INTERVAL_HOURS", "24")) * 3600
+
+# The key is the file name up to the first "_" (rendition suffix) or "." (extension)
+_UPLOAD_KEY_RE = re.compile(r"/static/uploads/([^/_.?#]+)")
+
+
+def content_key(hasher) -> str:
+    return hasher.hexdigest()[:CONTENT_KEY_LENGTH]
+
+
+def file_key(file_name: str) -> str:
+    return re.split(r"[_.]", file_name, maxsplit=1)[0]
+
+
+# Allowed upload types, detected from the leading bytes rather than the file name
+MIME_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/heic": ".heic",
+    "image/x-icon": ".ico",
+    "image/svg+xml": ".svg",
+}
+SNIFF_BYTES = 512
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+# Allowance for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"avif", b"avis"):
+            return "image/avif"
+        if brand in (b"heic", b"heix", b"mif1", b"msf1"):
+            return "image/heic"
+    if head.startswith(b"\x00\x00\x01\x00"):
+        return "image/x-icon"
+    text = head.lstrip(b"\xef\xbb\xbf").lstrip().lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return "image/svg+xml"
+    return None
+
+
+class StoredUpload:
+    def __init__(self, file_name: str, content_type: str, size: int, original_name: Optional[str]):
+        self.file_name = file_name
+        self.key = file_key(file_name)
+        self.content_type = content_type
+        self.size = size
+        self.original_name = original_name
+
+
+def _finalize_upload(tmp_path: str, key: str, extension: str) -> str:
+    file_name = f"{key}{extension}"
+    file_path = os.path.join(UPLOAD_DIR, file_name)
+    if os.path.exists(file_path):
+        # Already stored; refresh mtime so the GC grace period restarts
+        os.utime(file_path)
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, file_path)
+
+    # .br/.gz siblings of text uploads (SVG, icons) for PrecompressedStaticFiles
+    from static_files import precompress_file
+    precompress_file(file_path)
+    return file_name
+
+
+async def iter_file_field(request: Request, field_name: str = "file", info: Optional[dict] = None):
+    """
+    Async generator over the bytes of one file field of a multipart request, parsed
+    incrementally from the request stream. info["filename"] is set once the part headers
+    are parsed. Raises HTTPException 400 if the request is not multipart or has no such file.
+    """
+    info = {} if info is None else info
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data")
+
+    # Parser callbacks only collect data; the caller does all I/O between chunks
+    state = {"headers": {}, "header_field": b"", "header_value": b"", "in_file": False, "done": False}
+    pending = []
+
+    def on_part_begin():
+        state["headers"] = {}
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        is_target = disposition.get(b"name") == field_name.encode() and b"filename" in disposition
+        state["in_file"] = is_target and not state["done"]
+        if state["in_file"]:
+            info["filename"] = disposition[b"filename"].decode("utf-8", "replace")
+
+    def on_part_data(data, start, end):
+        if state["in_file"]:
+            pending.append(data[start:end])
+
+    def on_part_end():
+        if state["in_file"]:
+            state["in_file"] = False
+            state["done"] = True
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    received = False
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if pending:
+            data = b"".join(pending)
+            pending.clear()
+            received = True
+            yield data
+    parser.finalize()
+
+    if not state["done"] or not received:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+
+
+async def receive_upload(request: Request, field_name: str = "file", max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Streams a multipart upload straight from the request body into the content-addressed store.
+    The body is never spooled as a whole: the MIME type is sniffed from the first bytes, the size
+    limit is enforced per chunk, the hash is computed on the fly and disk writes run in a thread.
+    Identical content is stored once. Raises HTTPException (400/413/415) on invalid uploads.
+    """
+    if max_bytes is None:
+        max_bytes = UPLOAD_MAX_BYTES
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"File too large (max {max_bytes // (1024 * 1024)} MB)")
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    loop = asyncio.get_event_loop()
+    tmp_path = os.path.join(UPLOAD_DIR, f".{uuid.uuid4()}.tmp")
+    hasher = hashlib.sha256()
+    info = {}
+    size = 0
+    head = b""
+    mime_type = None
+    buffer = await loop.run_in_executor(None, open, tmp_path, "wb")
+    try:
+        async for data in iter_file_field(request, field_name, info):
+            size += len(data)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File too large (max {max_bytes // (1024 * 1024)} MB)")
+
+            if mime_type is None:
+                head += data[:SNIFF_BYTES - len(head)]
+                if len(head) >= SNIFF_BYTES:
+                    mime_type = sniff_mime_type(head)
+                    if mime_type is None:
+                        raise HTTPException(status_code=415, detail="Unsupported file type")
+
+            hasher.update(data)
+            await loop.run_in_executor(None, buffer.write, data)
+
+        if mime_type is None:
+            mime_type = sniff_mime_type(head)
+            if mime_type is None:
+                raise HTTPException(status_code=415, detail="Unsupported file type")
+
+        await loop.run_in_executor(None, buffer.close)
+        file_name = await loop.run_in_executor(None, _finalize_upload, tmp_path, content_key(hasher), MIME_EXTENSIONS[mime_type])
+        return StoredUpload(file_name, mime_type, size, info.get("filename"))
+    finally:
+        if not buffer.closed:
+            buffer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def referenced_keys(db: Session) -> Set[str]:
+    """
+    Mark phase: every upload key referenced by a recipe image or a system setting (favicon).
+    """
+    keys = set()
+    values = [url for (url,) in db.query(models.Recipe.image_url).filter(models.Recipe.image_url.isnot(None))]
+    values += [value for (value,) in db.query(models.SystemSetting.value).filter(models.SystemSetting.value.like("%/static/uploads/%"))]
+    for value in values:
+        keys.update(_UPLOAD_KEY_RE.findall(value))
+    return keys
+
+
+def collect_garbage(db: Session, grace_seconds: Optional[int] = None) -> dict:
+    """
+    Mark-and-sweep over static/uploads: deletes files (originals and renditions) whose key
+    is no longer referenced and that are older than the grace period. Liveness is decided
+    per key, by the newest file of that key: re-uploading identical bytes only touches the
+    original, but keeps its renditions alive too.
+    """
+    if grace_seconds is None:
+        grace_seconds = UPLOAD_GC_GRACE_SECONDS
+
+    stats = {"deleted": 0, "freed_bytes": 0, "kept": 0}
+    if not os.path.isdir(UPLOAD_DIR):
+        return stats
+
+    keys = referenced_keys(db)
+    cutoff = time.time() - grace_seconds
+
+    files_by_key = {}
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            if entry.is_file():
+                files_by_key.setdefault(file_key(entry.name.lstrip(".")), []).append((entry, entry.stat()))
+
+    for key, files in files_by_key.items():
+        if key in keys or max(st.st_mtime for _, st in files) > cutoff:
+            stats["kept"] += len(files)
+            continue
+        for entry, st in files:
+            try:
+                os.remove(entry.path)
+                stats["deleted"] += 1
+                stats["freed_bytes"] += st.st_size
+            except OSError as e:
+                logger.warning(f"Upload GC could not delete {entry.name}: {e}")
+
+    logger.info(f"Upload GC: deleted {stats['deleted']} files ({stats['freed_bytes']} bytes), kept {stats['kept']}")
+    return stats
@@ -550,33 +550,162 @@ function Switch({ checked, onChange }: { checked: boolean; onChange: () => void
     );
 }
 
+interface LogEntry {
+    offset: number;
+    timestamp: string | null;
+    level: string | null;
+    text: string;
+}
+
+interface LogPage {
+    entries: LogEntry[];
+    cursor: string | null;
+}
+
+const LOG_LEVEL_COLORS: Record<string, string> = {
+    WARNING: 'text-yellow-400',
+    ERROR: 'text-red-400',
+    CRITICAL: 'text-red-500 font-bold',
+    DEBUG: 'text-gray-400',
+};
+
+// Reads the server-sent log stream with fetch, since EventSource can't send the auth header
+async function streamLogs(params: Record<string, string>, onEntry: (entry: LogEntry) => void, signal: AbortSignal) {
+    const query = new URLSearchParams(params).toString();
+    const response = await fetch(`${api.defaults.baseURL}/admin/logs/stream?${query}`, {
+        headers: { Authorization: String(api.defaults.headers.common['Authorization'] || '') },
+        signal,
+    });
+    if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop() || '';
+        for (const event of events) {
+            const data = event.split('\n').find((line) => line.startsWith('data: '));
+            if (data) onEntry(JSON.parse(data.slice(6)));
+        }
+    }
+}
+
 function LogViewerModal({ onClose }: { onClose: () => void }) {
     const { t } = useTranslation();
-    const { data, isLoading, refetch } = useQuery({
-        queryKey: ['systemLogs'],
-        queryFn: async () => {
-            const res = await api.get('/admin/logs');
-            return res.data;
+    const [level, setLevel] = useState('');
+    const [search, setSearch] = useState('');
+    const [query, setQuery] = useState('');
+    const [entries, setEntries] = useState<LogEntry[]>([]);
+    const [cursor, setCursor] = useState<string | null>(null);
+    const [isLoading, setIsLoading] = useState(false);
+    const [live, setLive] = useState(false);
+    const scrollRef = useRef<HTMLDivElement>(null);
+
+    const filters = () => {
+        const params: Record<string, string> = {};
+        if (level) params.level = level;
+        if (query) params.q = query;
+        return params;
+    };
+
+    const loadPage = async (before: string | null) => {
+        setIsLoading(true);
+        try {
+            const { data } = await api.get<LogPage>('/admin/logs', {
+                params: { lines: 200, ...filters(), ...(before ? { cursor: before } : {}) }
+            });
+            setEntries((current) => before ? [...data.entries, ...current] : data.entries);
+            setCursor(data.cursor);
+            if (!before) {
+                setTimeout(() => scrollRef.current?.scrollTo({ top: scrollRef.current.scrollHeight }), 0);
+            }
+        } catch (error: any) {
+            toast.error(error.response?.data?.detail || t('admin.logs_failed', 'Failed to load logs'));
+        } finally {
+            setIsLoading(false);
         }
-    });
+    };
+
+    useEffect(() => {
+        loadPage(null);
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [level, query]);
+
+    useEffect(() => {
+        if (!live) return;
+        const controller = new AbortController();
+        streamLogs(filters(), (entry) => {
+            setEntries((current) => [...current, entry]);
+            const el = scrollRef.current;
+            if (el && el.scrollHeight - el.scrollTop - el.clientHeight < 50) {
+                setTimeout(() => el.scrollTo({ top: el.scrollHeight }), 0);
+            }
+        }, controller.signal).catch((error) => {
+            if (error.name !== 'AbortError') {
+                console.error(error);
+                setLive(false);
+            }
+        });
+        return () => controller.abort();
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [live, level, query]);
 
     return (
         <Modal title={t('admin.system_logs', 'System Logs')} onClose={onClose}>
             <div className="space-y-4 w-[1000px] max-w-[95vw]">
-                <div className="bg-black/90 text-green-400 font-mono text-xs p-4 rounded-lg h-[600px] overflow-y-auto whitespace-pre-wrap break-all">
-                    {isLoading ? (
+                <div className="flex flex-wrap items-center gap-2">
+                    <select
+                        value={level}
+                        onChange={(e) => setLevel(e.target.value)}
+                        className="px-3 py-1.5 text-sm border rounded bg-background"
+                    >
+                        <option value="">{t('admin.logs_all_levels', 'All levels')}</option>
+                        <option value="DEBUG">DEBUG</option>
+                        <option value="INFO">INFO</option>
+                        <option value="WARNING">WARNING</option>
+                        <option value="ERROR">ERROR</option>
+                    </select>
+                    <input
+                        value={search}
+                        onChange={(e) => setSearch(e.target.value)}
+                        onKeyDown={(e) => e.key === 'Enter' && setQuery(search)}
+                        placeholder={t('admin.logs_search', 'Search…')}
+                        className="flex-1 min-w-[200px] px-3 py-1.5 text-sm border rounded bg-background"
+                    />
+                    <label className="flex items-center gap-2 text-sm">
+                        <input type="checkbox" checked={live} onChange={(e) => setLive(e.target.checked)} />
+                        {t('admin.logs_live', 'Live')}
+                    </label>
+                </div>
+                <div ref={scrollRef} className="bg-black/90 text-green-400 font-mono text-xs p-4 rounded-lg h-[600px] overflow-y-auto whitespace-pre-wrap break-all">
+                    {cursor && (
+                        <button
+                            onClick={() => loadPage(cursor)}
+                            disabled={isLoading}
+                            className="mb-2 text-gray-400 hover:text-white underline"
+                        >
+                            {t('admin.logs_load_older', 'Load older entries')}
+                        </button>
+                    )}
+                    {isLoading && entries.length === 0 ? (
                         <div className="flex items-center justify-center h-full">
                             <RefreshCw className="h-6 w-6 animate-spin text-white" />
                         </div>
+                    ) : entries.length > 0 ? (
+                        entries.map((entry) => (
+                            <div key={entry.offset} className={cn("break-words", entry.level && LOG_LEVEL_COLORS[entry.level])}>{entry.text}</div>
+                        ))
                     ) : (
-                        data?.logs?.map((line: string, i: number) => (
-                            <div key={i} className="break-words">{line}</div>
-                        )) || <div className="text-gray-500 italic">No logs found</div>
+                        <div className="text-gray-500 italic">No logs found</div>
                     )}
                 </div>
                 <div className="flex justify-end gap-2">
                     <button
-                        onClick={() => refetch()}
+                        onClick={() => loadPage(null)}
                         className="flex items-center gap-2 px-3 py-1.5 text-sm font-medium border rounded hover:bg-accent"
                     >
                         <RefreshCw className="h-3 w-3" />
@@ -594,6 +723,19 @@ function LogViewerModal({ onClose }: { onClose: () => void }) {
     );
 }
 
+interface BackupJob {
+    id: string;
+    kind: 'backup' | 'restore';
+    status: 'pending' | 'running' | 'completed' | 'failed';
+    progress: number;
+    message?: string | null;
+    error?: string | null;
+    file?: string;
+    size?: number;
+    sha256?: string;
+    download_token?: string;
+}
+
 function BackupSettings() {
     const { t } = useTranslation();
     const [isRestoring, setIsRestoring] = useState(false);
@@ -601,36 +743,55 @@ function BackupSettings() {
     const [selectedFile, setSelectedFile] = useState<File | null>(null);
     const fileInputRef = useRef<HTMLInputElement>(null);
 
+    const [backupProgress, setBackupProgress] = useState<number | null>(null);
+    const [restoreStatus, setRestoreStatus] = useState<string | null>(null);
+
+    // Backup and restore run as background jobs on the server; poll until they finish
+    const waitForJob = async (jobId: string, onProgress: (job: BackupJob) => void, tolerateErrors = false): Promise<BackupJob> => {
+        // Consecutive failed polls tolerated while the database is replaced (about a minute)
+        const maxFailures = 60;
+        let failures = 0;
+        while (true) {
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            try {
+                const { data } = await api.get<BackupJob>(`/admin/system/backup/jobs/${jobId}`);
+                failures = 0;
+                onProgress(data);
+                if (data.status === 'completed' || data.status === 'failed') return data;
+            } catch (error: any) {
+                // The database is being replaced during a restore, so requests may fail briefly.
+                // A missing session or job won't come back: the restored data may not contain them.
+                const status = error.response?.status;
+                if (!tolerateErrors || status === 401 || status === 404) throw error;
+                failures += 1;
+                if (failures >= maxFailures) {
+                    throw new Error(t('admin.job_status_unavailable', 'The server did not report the job status. Reload the page to check the result.'));
+                }
+            }
+        }
+    };
+
     const handleDownloadBackup = async () => {
+        setBackupProgress(0);
         try {
-            const response = await api.get('/admin/system/backup', {
-                responseType: 'blob'
-            });
+            const { data: started } = await api.post<BackupJob>('/admin/system/backup/jobs');
+            const job = await waitForJob(started.id, (j) => setBackupProgress(j.progress));
+            if (job.status === 'failed') throw new Error(job.error || 'Backup failed');
 
-            // Create download link
-            const url = window.URL.createObjectURL(new Blob([response.data]));
+            // Direct link: the browser downloads (and can resume) the archive itself
             const link = document.createElement('a');
-            link.href = url;
-
-            // Get filename from header or generate default
-            const contentDisposition = response.headers['content-disposition'];
-            let filename = `backup_${new Date().toISOString().slice(0, 10)}.zip`;
-            if (contentDisposition) {
-                const filenameMatch = contentDisposition.match(/filename="?(.+)"?/);
-                if (filenameMatch.length === 2)
-                    filename = filenameMatch[1];
-            }
-
-            link.setAttribute('download', filename);
+            link.href = `${api.defaults.baseURL}/admin/system/backup/jobs/${job.id}/download?token=${encodeURIComponent(job.download_token || '')}`;
+            link.setAttribute('download', job.file || 'backup.zip');
             document.body.appendChild(link);
             link.click();
             link.remove();
-            window.URL.revokeObjectURL(url);
 
             toast.success(t('admin.backup_download_started', 'Backup download started'));
-        } catch (error) {
+        } catch (error: any) {
             console.error(error);
-            toast.error(t('admin.backup_failed', 'Failed to download backup'));
+            toast.error(error.response?.data?.detail || t('admin.backup_failed', 'Failed to download backup'));
+        } finally {
+            setBackupProgress(null);
         }
     };
 
@@ -642,17 +803,25 @@ function BackupSettings() {
         formData.append('file', selectedFile);
 
         try {
-            await api.post('/admin/system/restore', formData, {
+            const { data: started } = await api.post<BackupJob>('/admin/system/restore', formData, {
                 headers: {
                     'Content-Type': 'multipart/form-data'
+                },
+                onUploadProgress: (event) => {
+                    const percent = event.total ? Math.round((event.loaded / event.total) * 100) : 0;
+                    setRestoreStatus(`${t('admin.restore_uploading', 'Uploading')} ${percent}%`);
                 }
             });
+            const job = await waitForJob(started.id, (j) => setRestoreStatus(`${j.message || ''} ${j.progress}%`), true);
+            if (job.status === 'failed') throw new Error(job.error || 'Restore failed');
+
             toast.success(t('admin.restore_success', 'System restored successfully. Reloading...'));
             setTimeout(() => window.location.reload(), 2000);
         } catch (error: any) {
             console.error(error);
-            toast.error(error.response?.data?.detail || t('admin.restore_failed', 'Restore failed'));
+            toast.error(error.response?.data?.detail || error.message || t('admin.restore_failed', 'Restore failed'));
             setIsRestoring(false);
+            setRestoreStatus(null);
         }
     };
 
@@ -671,10 +840,13 @@ function BackupSettings() {
                 </div>
                 <button
                     onClick={handleDownloadBackup}
-                    className="bg-primary text-primary-foreground px-4 py-2 rounded-md hover:bg-primary/90 flex items-center gap-2 text-sm font-medium"
+                    disabled={backupProgress !== null}
+                    className="bg-primary text-primary-foreground px-4 py-2 rounded-md hover:bg-primary/90 disabled:opacity-50 flex items-center gap-2 text-sm font-medium"
                 >
-                    <Download className="h-4 w-4" />
-                    {t('admin.download_backup', 'Download Backup')}
+                    {backupProgress !== null ? <RefreshCw className="h-4 w-4 animate-spin" /> : <Download className="h-4 w-4" />}
+                    {backupProgress !== null
+                        ? `${t('admin.backup_creating', 'Creating backup')} ${backupProgress}%`
+                        : t('admin.download_backup', 'Download Backup')}
                 </button>
             </div>
 
@@ -714,6 +886,9 @@ function BackupSettings() {
                         {t('admin.restore', 'Restore')}
                     </button>
                 </div>
+                {restoreStatus && (
+                    <div className="text-sm text-muted-foreground">{restoreStatus}</div>
+                )}
             </div>
 
             {showRestoreConfirm && (
@@ -37,8 +37,10 @@ export function FaviconPicker({ value, onChange }: FaviconPickerProps) {
         setIsUploading(true);
         try {
             const res = await api.post('/upload', formData);
-            onChange(res.data.url);
-            setUrlInput(res.data.url);
+            // Favicons keep the original file, not a resized rendition
+            const url = res.data.original_url || res.data.url;
+            onChange(url);
+            setUrlInput(url);
             setMode('presets');
         } catch (err) {
             console.error(err);
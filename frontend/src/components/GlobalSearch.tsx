@@ -4,7 +4,7 @@ import { Search, Loader2 } from 'lucide-react';
 import { useQuery } from '@tanstack/react-query';
 import { api, Recipe } from '../lib/api';
 import { useTranslation } from 'react-i18next';
-import { cn } from '../lib/utils';
+import { cn, imageVariant } from '../lib/utils';
 import { useSystemSettings } from '../hooks/useSystemSettings';
 
 export function GlobalSearch() {
@@ -132,7 +132,7 @@ export function GlobalSearch() {
                             onMouseEnter={() => setSelectedIndex(idx)}
                         >
                             {recipe.image_url ? (
-                                <img src={recipe.image_url} alt="" className="w-10 h-10 rounded object-cover bg-muted" />
+                                <img src={imageVariant(recipe.image_url, 'thumb')} alt="" className="w-10 h-10 rounded object-cover bg-muted" />
                             ) : (
                                 <div className="w-10 h-10 rounded bg-secondary flex items-center justify-center">
                                     <Search className="w-5 h-5 opacity-50" />
@@ -185,6 +185,7 @@ i18n
                     "admin.backup_failed": "Failed to download backup",
                     "admin.restore_success": "System restored successfully. Reloading...",
                     "admin.restore_failed": "Restore failed",
+                    "admin.job_status_unavailable": "The server did not report the job status. Reload the page to check the result.",
                     "common.refresh": "Refresh",
                     "admin.sender_email": "Sender Email",
                     "admin.favicon_picker.click_to_upload": "Click to upload image",
@@ -816,6 +817,7 @@ i18n
                         backup_failed: "Backup-Download fehlgeschlagen",
                         restore_success: "System erfolgreich wiederhergestellt. Seite wird neu geladen...",
                         restore_failed: "Wiederherstellung fehlgeschlagen",
+                        job_status_unavailable: "Der Server meldet keinen Auftragsstatus. Laden Sie die Seite neu, um das Ergebnis zu prüfen.",
                     },
                     "edit.recipe_exists": "Rezept existiert bereits!",
                     "edit.redirecting_in": "Weiterleitung zum Rezept in {{seconds}}s...",
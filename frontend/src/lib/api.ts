@@ -74,6 +74,7 @@ export interface Recipe {
     title: string;
     source_url?: string;
     image_url?: string;
+    image_srcset?: string;
     created_type: 'manual' | 'ai_import';
     type: 'baking' | 'cooking';
     is_public: boolean;
@@ -4,3 +4,12 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs: ClassValue[]) {
     return twMerge(clsx(inputs))
 }
+
+export type ImageRendition = 'thumb' | 'card' | 'hero'
+
+// Locally stored recipe images are saved as <hash>_<rendition>.webp (see backend/images.py).
+// Picks the requested size for those; any other URL is returned unchanged.
+export function imageVariant(url: string | undefined, rendition: ImageRendition): string | undefined {
+    if (!url) return url
+    return url.replace(/_(thumb|card|hero)\.(webp|jpg)$/, `_${rendition}.$2`)
+}
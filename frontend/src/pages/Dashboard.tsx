@@ -7,6 +7,7 @@ import { useTranslation } from 'react-i18next';
 import { Button } from '../components/ui/Button';
 import { Pagination } from '../components/Pagination';
 import { GlassTabs } from '../components/ui/GlassTabs';
+import { imageVariant } from '../lib/utils';
 
 export default function Dashboard() {
     const { t } = useTranslation();
@@ -136,7 +137,7 @@ export default function Dashboard() {
                             <div className="glass-card rounded-xl overflow-hidden h-full flex flex-col">
                                 <div className="h-48 bg-muted relative overflow-hidden">
                                     {recipe.image_url ? (
-                                        <img src={recipe.image_url} alt={recipe.title} className="w-full h-full object-cover transition-transform group-hover:scale-105" />
+                                        <img src={imageVariant(recipe.image_url, 'card')} srcSet={recipe.image_srcset} sizes="(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw" alt={recipe.title} loading="lazy" className="w-full h-full object-cover transition-transform group-hover:scale-105" />
                                     ) : (
                                         <div className="w-full h-full flex items-center justify-center text-muted-foreground bg-secondary/20">
                                             <ChefHat className="h-12 w-12 opacity-20" />
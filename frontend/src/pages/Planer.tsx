@@ -78,9 +78,12 @@ export default function Planer() {
 
     // Queries
     const { data: recipes } = useQuery<Recipe[]>({
-        queryKey: ['recipes'],
+        queryKey: ['recipes', 'planner'],
         queryFn: async () => {
-            const res = await api.get('/recipes');
+            // Only what the planner uses: step durations for the event length
+            const res = await api.get('/recipes', {
+                params: { fields: 'title,type,reference_temperature', include: 'chapters.steps' }
+            });
             return res.data.items || res.data;
         },
     });
@@ -137,7 +137,7 @@ export default function RecipeDetail() {
                     const [ingRes, unitRes, recipeRes] = await Promise.all([
                         api.get('/admin/ingredients'),
                         api.get('/admin/units'),
-                        api.get('/recipes?limit=1000')
+                        api.get('/recipes', { params: { limit: 1000, fields: 'title' } })
                     ]);
                     setAvailableIngredients(Array.isArray(ingRes.data) ? ingRes.data : []);
                     setAvailableUnits(Array.isArray(unitRes.data) ? unitRes.data : []);
@@ -441,6 +441,8 @@ export default function RecipeDetail() {
                 {(isEditing ? (imageFile ? URL.createObjectURL(imageFile) : editedRecipe?.image_url) : recipe.image_url) ? (
                     <img
                         src={isEditing ? (imageFile ? URL.createObjectURL(imageFile) : editedRecipe?.image_url) : recipe.image_url}
+                        srcSet={isEditing ? undefined : recipe.image_srcset}
+                        sizes="100vw"
                         alt={recipe.title}
                         className="w-full h-full object-cover transition-transform duration-700 group-hover:scale-105"
                     />
@@ -94,7 +94,7 @@ export default function RecipeEdit() {
                 const [ingRes, unitRes, recipeRes] = await Promise.all([
                     api.get('/admin/ingredients'),
                     api.get('/admin/units'),
-                    api.get('/recipes?limit=1000')
+                    api.get('/recipes', { params: { limit: 1000, fields: 'title' } })
                 ]);
                 setAvailableIngredients(ingRes.data);
                 setAvailableUnits(unitRes.data);
@@ -139,6 +139,7 @@ Group=$USER_NAME
 WorkingDirectory=$BACKEND_DIR
 EnvironmentFile=$PROJECT_DIR/.env
 Environment="PATH=$BACKEND_DIR/venv/bin:/usr/bin"
+ExecStartPre=$BACKEND_DIR/venv/bin/python bootstrap.py
 ExecStart=$BACKEND_DIR/venv/bin/uvicorn main:app --host 127.0.0.1 --port 8000
 Restart=always
 
@@ -163,6 +164,8 @@ log "Building Frontend..."
 rm -rf dist
 export VITE_API_URL="/api"
 npm run build
+# Precompressed siblings for nginx gzip_static
+find dist -type f \( -name '*.js' -o -name '*.css' -o -name '*.html' -o -name '*.svg' -o -name '*.json' \) -exec gzip -9 -k -f {} +
 
 # 5. Nginx Setup
 log "Configuring Nginx..."
@@ -175,9 +178,17 @@ server {
     location / {
         root $FRONTEND_DIR/dist;
         index index.html;
+        gzip_static on;
         try_files \$uri \$uri/ /index.html;
     }
 
+    # Build output with content hashes in the file names
+    location /assets/ {
+        root $FRONTEND_DIR/dist;
+        gzip_static on;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
+
     # Backend API
     location /api/ {
         proxy_pass http://127.0.0.1:8000/;
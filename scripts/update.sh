@@ -79,8 +79,7 @@ if [ -n "$BACKEND_SERVICE_NAME" ]; then
 fi
 # Check if alembic is initialized
 if [ -f "alembic.ini" ]; then
-    # If this is the first run, we might need to stamp the DB if it already exists
-    # But for now, let's just upgrade
+    # Migrates (or stamps a database that predates Alembic) and seeds, under an advisory lock
     echo "Upgrading database..."
     
     # Check if running in Docker and restart backend to clear locks
@@ -91,7 +90,8 @@ if [ -f "alembic.ini" ]; then
         sleep 5
     fi
 
-    python3 -m alembic upgrade head
+    python3 bootstrap.py
+    python3 static_files.py static
 fi
 
 # 4. Update Frontend
@@ -103,6 +103,8 @@ else
     if command -v npm &> /dev/null; then
         npm install
         npm run build
+        # Served by nginx with gzip_static
+        find dist -type f \( -name '*.js' -o -name '*.css' -o -name '*.html' -o -name '*.svg' -o -name '*.json' \) -exec gzip -9 -k -f {} +
     else
         echo "Warning: npm not found. Skipping frontend update."
     fi